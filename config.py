@@ -19,17 +19,72 @@ OBSTACLES_IMAGES_DIR = os.path.join(IMAGES_DIR, "obstacles")
 BACKGROUNDS_IMAGES_DIR = os.path.join(IMAGES_DIR, "backgrounds")
 UI_IMAGES_DIR = os.path.join(IMAGES_DIR, "ui")
 
+# 存档目录
+SAVES_DIR = os.path.join(BASE_DIR, "saves")
+
 # 窗口设置
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
 WINDOW_TITLE = "植物大战僵尸风格贪吃蛇"
 FPS = 60
+IDLE_FPS = 10  # 没有需要全帧率的动画时（菜单、暂停、游戏结束画面）的帧率，0表示只在有输入时才刷新
+MAX_DELTA_TIME = 0.25  # 单帧时间增量上限（秒），避免长时间空闲或暂停后画面跳变
 
 # 游戏设置
 GRID_SIZE = 30
 GRID_WIDTH = WINDOW_WIDTH // GRID_SIZE
 GRID_HEIGHT = WINDOW_HEIGHT // GRID_SIZE
 GAME_SPEED = 10  # 较低的值表示较慢的蛇移动速度
+SIMULATION_RATE = 60  # 游戏模拟每秒的固定步数（与帧率无关，回放按步重现整局游戏）
+
+# 世界大小（格子数），可以大于窗口，超出窗口的部分由摄像机跟随蛇头滚动显示
+WORLD_WIDTH = GRID_WIDTH
+WORLD_HEIGHT = GRID_HEIGHT
+
+# 背景分块缓存设置
+BACKGROUND_CHUNK_SIZE = 16  # 每个背景区块的边长（格子数）
+BACKGROUND_CACHE_BUDGET = 32 * 1024 * 1024  # 背景区块缓存的内存上限（字节）
+
+# 自动存档设置（游戏进行中定期在后台线程写入，断电后下次启动自动恢复）
+AUTOSAVE = {
+    "enabled": True,
+    "interval": 5.0,  # 存档间隔（秒）
+    "filename": "autosave.sav",
+    "compression_level": 6  # zlib压缩级别
+}
+
+# 排行榜设置（SQLite数据库，保存在存档目录中）
+LEADERBOARD = {
+    "filename": "leaderboard.db",
+    "batch_size": 256,  # 每个事务最多插入的成绩数
+    "top_count": 5  # 默认查询的前几名数量
+}
+
+# 对战服务器设置（python -m server 启动）
+SERVER = {
+    "host": "127.0.0.1",
+    "port": 9527,
+    "tick_rate": 10,  # 每秒tick数
+    "board_width": 40,  # 对战棋盘大小（格子数）
+    "board_height": 30,
+    "max_players_per_room": 8,
+    "food_count": 5,  # 棋盘上同时存在的食物数量
+    "respawn_ticks": 20,  # 死亡后复活等待的tick数
+    "max_write_buffer": 256 * 1024,  # 单个连接未发送数据的上限（字节），超过时断开
+    "keyframe_interval": 100,  # 每隔多少tick广播一次关键帧
+    "input_queue_size": 8  # 每个玩家最多缓存的方向指令数（包括客户端提前发送的）
+}
+
+# 联机客户端预测设置
+NETPLAY = {
+    "lead_ticks": 5,  # 本地预测领先最新权威状态的tick数，需要大于往返延迟对应的tick数
+    "history_size": 32  # 预测快照环形缓冲区大小（最多预测的tick数 + 1）
+}
+
+# 观战数据流设置
+SPECTATOR = {
+    "keyframe_interval": 50  # 每隔多少步发送一次关键帧
+}
 
 # 颜色设置 - 植物大战僵尸风格
 BLACK = (0, 0, 0)
@@ -49,34 +104,58 @@ DOWN = (0, 1)
 LEFT = (-1, 0)
 RIGHT = (1, 0)
 
+# 方向指令队列长度（蛇每移动一步消耗一个指令）
+INPUT_QUEUE_SIZE = 3
+
 # 食物设置
 FOOD_TYPES = {
     "sun": {
         "weight": 70,  # 生成权重
         "score": 10,   # 得分
         "effect": None, # 特殊效果
-        "image": "sun.png"  # 图像文件名
+        "image": "sun.png",  # 图像文件名
+        "color": PVZ_SUN_YELLOW,  # 特效颜色（没有图像时也用于绘制）
+        "renderer": "circle",  # 没有图像时的绘制方式（见entities/food_registry.py）
+        "hover_range": 3  # 悬浮范围（像素）
     },
     "sunflower": {
         "weight": 20,
         "score": 20,
         "effect": None,
-        "image": "sunflower.png"
+        "image": "sunflower.png",
+        "color": (255, 200, 0),
+        "renderer": "sunflower",
+        "hover_range": 5
     },
     "walnut": {
         "weight": 10,
         "score": 5,
         "effect": "shield",
-        "image": "walnut.png"
+        "image": "walnut.png",
+        "color": PVZ_BROWN,
+        "renderer": "walnut",
+        "hover_range": 2
     },
     "peashooter": {
         "weight": 15,
         "score": 15,
         "effect": "speed_up",
-        "image": "peashooter.png"
+        "image": "peashooter.png",
+        "color": PVZ_GREEN,
+        "renderer": "peashooter",
+        "hover_range": 4
     }
 }
 
+# 动画时钟设置（食物悬浮、僵尸摆臂等周期动画）
+ANIMATION = {
+    "sine_table_size": 256,  # 正弦查找表大小（2的幂），即一个周期内的相位数
+    "phase_speed": 3.0  # 角速度（弧度/秒，相当于60帧下每帧0.05弧度）
+}
+
+# 食物插件模块（导入时用entities.food_registry中的register_*注册新的食物类型、效果和绘制方式）
+FOOD_PLUGINS = []
+
 # 障碍物设置
 OBSTACLE_TYPES = {
     "zombie": {
@@ -109,10 +188,55 @@ SCENES = {
         "background": (100, 180, 255),
         "grid_colors": [PVZ_GREEN, PVZ_LIGHT_GREEN],
         "special_rules": "water_tiles",
+        "water_colors": [(70, 150, 230), (90, 170, 245)],
         "background_image": "pool_background.png"
     }
 }
 
+# 泳池场景水域设置（special_rules为"water_tiles"时生效）
+WATER_TILES = {
+    "lane_period": 6,      # 泳道周期（行数）
+    "water_lanes": (2, 3), # 每个周期内属于水域的行号
+    "move_cost": 1.5,      # 在水中移动的耗时倍数（越大越慢）
+    "ripple_tile": 16,     # 水波纹覆盖层的宽度（格子数），水波纹按这个宽度横向重复
+    "ripple_frames": 12    # 水波纹动画预渲染的帧数
+}
+
+# 夜晚场景光照设置（special_rules为"reduced_visibility"时生效）
+LIGHTING = {
+    "ambient": (35, 35, 70),  # 环境光颜色，越暗视野越差
+    "head_radius": 150,       # 蛇头周围的光照半径（像素）
+    "glow_foods": {           # 会发光的食物及其光照半径（像素）
+        "sun": 60,
+        "sunflower": 75
+    }
+}
+
+# 粒子特效设置
+PARTICLE_SETTINGS = {
+    "capacity": 10000,  # 最大粒子数（预分配）
+    "sprite_size": 6,   # 粒子图像大小（像素）
+    "fade_steps": 4     # 淡出阶段数，每个阶段预渲染一张图
+}
+
+# 粒子特效预设（速度单位为像素/秒，寿命单位为秒）
+PARTICLE_EFFECTS = {
+    "eat_food": {
+        "count": 24,
+        "speed": 120,
+        "life": 0.6,
+        "gravity": 200,
+        "color": PVZ_SUN_YELLOW
+    },
+    "explosion": {
+        "count": 400,
+        "speed": 360,
+        "life": 1.2,
+        "gravity": 150,
+        "color": PVZ_CHERRY_RED
+    }
+}
+
 # 音频设置
 SOUNDS = {
     "background_music": "simple_background.wav",
@@ -123,6 +247,41 @@ SOUNDS = {
     "zombie_groan": "zombie_groan.wav"
 }
 
+# 混音器和通道设置
+AUDIO = {
+    "mixer": {
+        "frequency": 44100,
+        "size": -16,
+        "channels": 2,
+        "buffer": 512  # 混音缓冲区（采样数），越小延迟越低，出现爆音时调大
+    },
+    "categories": {  # 每个类别预留的通道数
+        "ui": 2,
+        "gameplay": 8,
+        "ambient": 2
+    },
+    "free_channels": 4,  # 预留通道之外由pygame自动分配的通道数
+    "duck_volume": 0.4,  # 压低时背景音乐音量的倍数
+    "duck_time": 0.8  # 压低的持续时间（秒）
+}
+
+# 音效播放策略（未列出的音效使用audio_manager中的缺省策略）
+SOUND_POLICIES = {
+    "menu_click": {"category": "ui", "max_voices": 1, "cooldown": 0.05, "priority": 1},
+    "eat_food": {"category": "gameplay", "max_voices": 2, "cooldown": 0.06, "priority": 1},
+    "ability_activated": {"category": "gameplay", "max_voices": 1, "cooldown": 0.2, "priority": 2, "duck": True},
+    "game_over": {"category": "gameplay", "max_voices": 1, "cooldown": 1.0, "priority": 3, "duck": True},
+    "zombie_groan": {"category": "ambient", "max_voices": 1, "cooldown": 4.0, "priority": 0}
+}
+
+# 游戏事件对应的音效（同一帧内相同的音效只播放一次）
+EVENT_SOUNDS = {
+    "FoodEaten": "eat_food",
+    "AbilityStarted": "ability_activated",
+    "GameOver": "game_over",
+    "ZombieSpawned": "zombie_groan"
+}
+
 # 图像设置
 IMAGES = {
     # 蛇图像
@@ -158,6 +317,9 @@ ABILITIES = {
     }
 }
 
+# UI命中检测网格的格子边长（像素）
+UI_HIT_GRID_CELL = 64
+
 # 字体设置
 FONT_SIZES = {
     "small": 24,
@@ -168,16 +330,29 @@ FONT_SIZES = {
 # 游戏难度设置
 DIFFICULTY_LEVELS = {
     "easy": {
+        "name": "简单",  # 设置菜单中显示的名称
         "speed": 8,
         "obstacle_frequency": 0.002  # 降低障碍物生成频率
     },
     "medium": {
+        "name": "中等",
         "speed": 10,
-        "obstacle_frequency": 0.005  # 降低障碍物生成频率
+        "obstacle_frequency": 0.005,  # 降低障碍物生成频率
+        "zombie_ai": "hunt"  # 僵尸沿流场追击蛇头（默认随机游走）
     },
     "hard": {
+        "name": "困难",
         "speed": 12,
-        "obstacle_frequency": 0.01  # 降低障碍物生成频率
+        "obstacle_frequency": 0.01,  # 降低障碍物生成频率
+        "zombie_ai": "hunt"
+    },
+    "horde": {
+        "name": "尸潮",
+        "speed": 10,
+        "obstacle_frequency": 1.0,
+        "max_obstacles": 300,  # 最大障碍物数量（默认5）
+        "spawn_interval": 0.1,  # 两次生成之间的最短间隔（秒，默认3）
+        "zombie_ai": "hunt"
     }
 }
 
@@ -187,5 +362,8 @@ DEFAULT_SETTINGS = {
     "scene": "day",
     "music_volume": 0.7,
     "sfx_volume": 1.0,
-    "use_images": False  # 是否使用图像资源而不是绘制图形
+    "use_images": False,  # 是否使用图像资源而不是绘制图形
+    "world_width": WORLD_WIDTH,  # 世界宽度（格子数）
+    "world_height": WORLD_HEIGHT,  # 世界高度（格子数）
+    "player_name": "玩家"  # 排行榜中的玩家名称
 } 
\ No newline at end of file
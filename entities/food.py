@@ -1,96 +1,89 @@
 """
 食物实体
-包含各种类型的食物及其效果
+食物的属性、效果和外观都来自食物注册表（entities/food_registry.py），
+每个食物只在实体池中保存类型编号、位置和动画相位
 """
 
 import random
-import pygame
-import math
-from config import FOOD_TYPES, FOOD_IMAGES_DIR, PVZ_SUN_YELLOW, PVZ_GREEN, PVZ_BROWN
+from array import array
+from config import FOOD_IMAGES_DIR, GRID_WIDTH, GRID_HEIGHT
+from entities.food_registry import FOOD_REGISTRY
+from utils.animation_clock import AnimationClock
+from utils.entity_pool import EntityPool, SLOT_MASK
 
 class BaseFood:
     """
-    基础食物类
-    所有食物类型的父类
+    食物视图类
+    食物的数据保存在FoodManager的实体池中（按列存储），这个类只是通过句柄访问其中一个食物的轻量视图，
+    需要时才创建。所有类型共用，不同类型的差别只在注册表的数据中。
+    食物被移除后视图失效，再访问会抛出ReferenceError。
     """
     
-    def __init__(self, position=None, food_type="sun", game_engine=None):
-        """
-        初始化食物
-        
-        参数:
-            position: 食物位置 (x, y)，如果为None则随机生成
-            food_type: 食物类型
-            game_engine: 游戏引擎实例
-        """
-        self.game_engine = game_engine
-        self.food_type = food_type
-        self.position = position
-        self.grid_position = None  # 网格位置，将在spawn方法中设置
-        
-        # 确保food_type是字符串类型
-        if not isinstance(food_type, str):
-            print(f"警告: food_type不是字符串类型: {food_type}, 使用默认值'sun'")
-            self.food_type = "sun"
-        
-        try:
-            self.score = FOOD_TYPES[self.food_type]["score"]
-            self.effect = FOOD_TYPES[self.food_type]["effect"]
-            self.image_name = FOOD_TYPES[self.food_type]["image"]
-        except KeyError as e:
-            print(f"警告: 无法获取食物类型'{self.food_type}'的属性: {e}, 使用默认值")
-            self.score = 10
-            self.effect = None
-            self.image_name = None
-        
-        self.image = None
-        
-        # 动画参数
-        self.animation_offset = random.random() * math.pi * 2  # 随机初始偏移
-        self.animation_speed = 0.05
-        self.hover_range = 3  # 悬浮范围
-        
-        # 如果位置为None，则在spawn方法中生成随机位置
-        if position is not None:
-            self.grid_position = position
+    __slots__ = ("pool", "handle")
     
-    def spawn(self, grid_width, grid_height, avoid_positions=None):
+    def __init__(self, pool, handle):
         """
-        在随机位置生成食物
+        初始化食物视图
         
         参数:
-            grid_width: 网格宽度
-            grid_height: 网格高度
-            avoid_positions: 需要避开的位置列表
-            
-        返回:
-            bool: 是否成功生成
+            pool: 食物所在的实体池
+            handle: 食物句柄
         """
-        if avoid_positions is None:
-            avoid_positions = []
-        
-        # 尝试最多10次找到一个可用位置
-        for _ in range(10):
-            x = random.randint(0, grid_width - 1)
-            y = random.randint(0, grid_height - 1)
-            
-            # 检查位置是否可用
-            if (x, y) not in avoid_positions:
-                self.grid_position = (x, y)
-                return True
-        
-        # 如果尝试10次都失败，返回False
-        return False
+        self.pool = pool
+        self.handle = handle
     
-    def update(self, delta_time):
-        """
-        更新食物状态
-        
-        参数:
-            delta_time: 时间增量
-        """
-        # 更新动画
-        self.animation_offset = (self.animation_offset + self.animation_speed) % (math.pi * 2)
+    def _index(self):
+        """食物在实体池中的下标"""
+        index = self.pool.index(self.handle)
+        if index < 0:
+            raise ReferenceError("食物已被移除")
+        return index
+    
+    @property
+    def code(self):
+        """类型编号（注册表中各个表的下标）"""
+        return self.pool.columns["code"][self._index()]
+    
+    @property
+    def food_type(self):
+        """食物类型"""
+        return FOOD_REGISTRY.names[self.code]
+    
+    @property
+    def grid_position(self):
+        """网格位置 (x, y)"""
+        index = self._index()
+        columns = self.pool.columns
+        return columns["x"][index], columns["y"][index]
+    
+    @property
+    def phase(self):
+        """动画相位偏移（相位由FoodManager的动画时钟推进）"""
+        return self.pool.columns["phase"][self._index()]
+    
+    @phase.setter
+    def phase(self, value):
+        self.pool.columns["phase"][self._index()] = value
+    
+    @property
+    def score(self):
+        """得分"""
+        return FOOD_REGISTRY.scores[self.code]
+    
+    @property
+    def effect(self):
+        """特殊效果名，没有效果时为None"""
+        return FOOD_REGISTRY.effects[self.code]
+    
+    @property
+    def hover_range(self):
+        """悬浮范围"""
+        return FOOD_REGISTRY.hover_ranges[self.code]
+    
+    @property
+    def image_name(self):
+        """图像文件名"""
+        return FOOD_REGISTRY.images[self.code]
     
     def check_collision(self, snake_head_pos):
         """
@@ -114,229 +107,27 @@ class BaseFood:
         返回:
             int: 得分
         """
-        # 基础食物只增加分数，不应用特殊效果
-        return self.score
+        code = self.code
+        effect = FOOD_REGISTRY.effects[code]
+        if effect is not None and snake:
+            snake.add_ability(effect)
+        return FOOD_REGISTRY.scores[code]
     
-    def draw(self, surface, grid_size, use_images=True):
+    def _pixel_origin(self, grid_size, camera=None):
         """
-        绘制食物
+        计算食物所在格子左上角的屏幕像素坐标
         
         参数:
-            surface: 绘制表面
             grid_size: 网格大小
-            use_images: 是否使用图像
+            camera: 摄像机，可以为None
+            
+        返回:
+            tuple: 屏幕像素坐标 (px, py)
         """
-        if self.grid_position is None:
-            return
-        
-        # 计算实际像素位置
+        if camera is not None:
+            return camera.world_to_screen(self.grid_position)
         x, y = self.grid_position
-        pixel_x = x * grid_size
-        pixel_y = y * grid_size
-        
-        # 添加悬浮动画效果
-        hover_offset = int(math.sin(self.animation_offset) * self.hover_range)
-        pixel_y += hover_offset
-        
-        # 如果有图像并且设置使用图像，则绘制图像
-        if self.image is not None and use_images:
-            # 居中绘制图像
-            image_rect = self.image.get_rect(center=(pixel_x + grid_size // 2, pixel_y + grid_size // 2))
-            surface.blit(self.image, image_rect)
-        else:
-            # 否则绘制简单图形
-            color = PVZ_SUN_YELLOW  # 默认为阳光黄色
-            
-            # 根据食物类型选择不同颜色
-            if self.food_type == "sunflower":
-                color = (255, 200, 0)  # 向日葵黄色
-            elif self.food_type == "walnut":
-                color = PVZ_BROWN  # 坚果棕色
-            elif self.food_type == "peashooter":
-                color = PVZ_GREEN  # 豌豆射手绿色
-            
-            # 绘制圆形食物
-            pygame.draw.circle(
-                surface,
-                color,
-                (pixel_x + grid_size // 2, pixel_y + grid_size // 2),
-                grid_size // 3
-            )
-
-class SunflowerFood(BaseFood):
-    """
-    向日葵食物
-    提供更高的分数
-    """
-    
-    def __init__(self, position=None, food_type="sunflower", game_engine=None):
-        """初始化向日葵食物"""
-        super().__init__(position=position, food_type=food_type, game_engine=game_engine)
-        
-        # 向日葵特有参数
-        self.hover_range = 5  # 更大的悬浮范围
-    
-    def draw(self, surface, grid_size, use_images=True):
-        """绘制向日葵食物"""
-        if self.image is not None and use_images:
-            super().draw(surface, grid_size, use_images)
-        else:
-            if self.grid_position is None:
-                return
-            
-            # 计算实际像素位置
-            x, y = self.grid_position
-            pixel_x = x * grid_size
-            pixel_y = y * grid_size
-            
-            # 添加悬浮动画效果
-            hover_offset = int(math.sin(self.animation_offset) * self.hover_range)
-            pixel_y += hover_offset
-            
-            # 绘制向日葵
-            center_x = pixel_x + grid_size // 2
-            center_y = pixel_y + grid_size // 2
-            
-            # 绘制花盘
-            pygame.draw.circle(
-                surface,
-                (255, 200, 0),  # 向日葵黄色
-                (center_x, center_y),
-                grid_size // 3
-            )
-            
-            # 绘制花瓣
-            for i in range(8):
-                angle = i * math.pi / 4
-                petal_x = center_x + int(math.cos(angle) * grid_size // 2.5)
-                petal_y = center_y + int(math.sin(angle) * grid_size // 2.5)
-                
-                pygame.draw.circle(
-                    surface,
-                    (255, 220, 0),  # 花瓣黄色
-                    (petal_x, petal_y),
-                    grid_size // 6
-                )
-
-class WalnutFood(BaseFood):
-    """
-    坚果食物
-    提供护盾效果
-    """
-    
-    def __init__(self, position=None, food_type="walnut", game_engine=None):
-        """初始化坚果食物"""
-        super().__init__(position=position, food_type=food_type, game_engine=game_engine)
-        
-        # 坚果特有参数
-        self.hover_range = 2  # 较小的悬浮范围
-    
-    def apply_effect(self, snake):
-        """应用坚果效果 - 提供护盾"""
-        if snake:
-            snake.add_ability("shield")
-        return self.score
-    
-    def draw(self, surface, grid_size, use_images=True):
-        """绘制坚果食物"""
-        if self.image is not None and use_images:
-            super().draw(surface, grid_size, use_images)
-        else:
-            if not self.grid_position:
-                return
-                
-            # 计算实际像素位置
-            x, y = self.grid_position
-            pixel_x = x * grid_size
-            pixel_y = y * grid_size
-            
-            # 添加悬浮动画效果
-            hover_offset = int(math.sin(self.animation_offset) * self.hover_range)
-            pixel_y += hover_offset
-            
-            # 绘制坚果
-            center_x = pixel_x + grid_size // 2
-            center_y = pixel_y + grid_size // 2
-            
-            # 绘制坚果主体
-            pygame.draw.ellipse(
-                surface,
-                PVZ_BROWN,  # 坚果棕色
-                pygame.Rect(
-                    center_x - grid_size // 3,
-                    center_y - grid_size // 2.5,
-                    grid_size // 1.5,
-                    grid_size // 1.25
-                )
-            )
-            
-            # 绘制坚果脸部
-            pygame.draw.ellipse(
-                surface,
-                (220, 200, 180),  # 浅棕色
-                pygame.Rect(
-                    center_x - grid_size // 4,
-                    center_y - grid_size // 3,
-                    grid_size // 2,
-                    grid_size // 2
-                )
-            )
-
-class PeashooterFood(BaseFood):
-    """
-    豌豆射手食物
-    提供速度提升效果
-    """
-    
-    def __init__(self, position=None, food_type="peashooter", game_engine=None):
-        """初始化豌豆射手食物"""
-        super().__init__(position=position, food_type=food_type, game_engine=game_engine)
-        
-        # 豌豆射手特有参数
-        self.hover_range = 4
-    
-    def apply_effect(self, snake):
-        """应用豌豆射手效果 - 提供速度提升"""
-        if snake:
-            snake.add_ability("speed_up")
-        return self.score
-    
-    def draw(self, surface, grid_size, use_images=True):
-        """绘制豌豆射手食物"""
-        if self.image is not None and use_images:
-            super().draw(surface, grid_size, use_images)
-        else:
-            if self.grid_position is None:
-                return
-            
-            # 计算实际像素位置
-            x, y = self.grid_position
-            pixel_x = x * grid_size
-            pixel_y = y * grid_size
-            
-            # 添加悬浮动画效果
-            hover_offset = int(math.sin(self.animation_offset) * self.hover_range)
-            pixel_y += hover_offset
-            
-            # 绘制豌豆射手
-            center_x = pixel_x + grid_size // 2
-            center_y = pixel_y + grid_size // 2
-            
-            # 绘制头部
-            pygame.draw.circle(
-                surface,
-                PVZ_GREEN,  # 豌豆射手绿色
-                (center_x, center_y),
-                grid_size // 3
-            )
-            
-            # 绘制豌豆
-            pygame.draw.circle(
-                surface,
-                (100, 200, 100),  # 浅绿色
-                (center_x + grid_size // 3, center_y),
-                grid_size // 5
-            )
+        return x * grid_size, y * grid_size
 
 class FoodManager:
     """
@@ -352,18 +143,60 @@ class FoodManager:
             game_engine: 游戏引擎实例
         """
         self.game_engine = game_engine
-        self.foods = []  # 当前场景中的食物列表
         self.food_images = {}  # 食物图像 {food_type: image}
-        self.grid_width = 0
-        self.grid_height = 0
         
-        # 食物类型映射
-        self.food_classes = {
-            "sun": BaseFood,
-            "sunflower": SunflowerFood,
-            "walnut": WalnutFood,
-            "peashooter": PeashooterFood
-        }
+        # 食物实体池：每个食物只占类型编号、动画相位和坐标四个数组元素
+        self.pool = EntityPool({"code": "H", "phase": "H", "x": "i", "y": "i"})
+        
+        # 每个格子上食物的槽位号+1（0表示没有食物），蛇头吃食物时O(1)查找；
+        # 同一格子上叠放的食物只索引一个，stacked记录没有被索引的数量
+        self.cells = None
+        self.stacked = 0
+        self.set_grid_size(GRID_WIDTH, GRID_HEIGHT)
+        
+        # 所有食物共用的动画时钟
+        self.clock = AnimationClock()
+        
+        # 生成位置和类型使用的随机数生成器（游戏场景和对战模拟换成自己的，保证可以重现）
+        self.rng = random
+        
+        # 预渲染的精灵（按类型编号索引），网格大小或图像变化时重新生成
+        self.sprites = None
+        self.sprites_key = None
+    
+    @property
+    def foods(self):
+        """
+        当前场景中所有食物的视图列表（每次调用都新建视图；批量读取类型和位置用items）
+        
+        返回:
+            list: BaseFood视图
+        """
+        pool = self.pool
+        return [BaseFood(pool, pool.handle(index)) for index in range(len(pool))]
+    
+    def items(self):
+        """
+        所有食物的类型和位置（直接从实体池的列读取）
+        
+        返回:
+            list: [(食物类型, (x, y))]
+        """
+        columns = self.pool.columns
+        names = FOOD_REGISTRY.names
+        return [
+            (names[code], (x, y))
+            for code, x, y in zip(columns["code"], columns["x"], columns["y"])
+        ]
+    
+    def count(self):
+        """
+        获取食物数量
+        
+        返回:
+            int: 食物数量
+        """
+        return len(self.pool)
     
     def load_images(self, resource_loader):
         """
@@ -382,11 +215,12 @@ class FoodManager:
         food_images_dir = FOOD_IMAGES_DIR
         
         # 加载每种食物的图像
-        for food_type, food_info in FOOD_TYPES.items():
-            image_name = food_info["image"]
+        for food_type, image_name in zip(FOOD_REGISTRY.names, FOOD_REGISTRY.images):
             if image_name:
-                image_path = f"{food_images_dir}/{image_name}"
-                self.food_images[food_type] = resource_loader.load_image(image_path)
+                image = resource_loader.load_image(f"{food_images_dir}/{image_name}")
+                if image is not None:
+                    self.food_images[food_type] = image
+        self.sprites = None
     
     def set_grid_size(self, width, height):
         """
@@ -396,8 +230,10 @@ class FoodManager:
             width: 网格宽度
             height: 网格高度
         """
+        self.clear()
         self.grid_width = width
         self.grid_height = height
+        self.cells = array("i", [0]) * (width * height)
     
     def spawn_food(self, food_type=None, position=None, avoid_positions=None):
         """
@@ -417,54 +253,117 @@ class FoodManager:
         
         print(f"尝试生成食物类型: {food_type}")
         
-        # 创建食物实例
-        food_class = self.food_classes.get(food_type, BaseFood)
-        # 注意参数顺序：position, food_type, game_engine
-        food = food_class(position=position, food_type=food_type, game_engine=self.game_engine)
+        code = self._type_code(food_type)
+        phase = self.clock.random_phase()
         
         # 如果没有指定位置，随机生成位置
         if position is None:
-            # 获取蛇身体位置列表
-            snake_positions = []
-            if avoid_positions:
-                snake_positions = avoid_positions
-            
-            # 尝试生成食物
-            if not food.spawn(self.grid_width, self.grid_height, snake_positions):
+            position = self._random_position(avoid_positions)
+            if position is None:
                 print(f"无法生成食物: 找不到合适的位置")
                 return None  # 如果无法生成食物，返回None
         
-        # 设置食物图像
-        if food.food_type in self.food_images:
-            food.image = self.food_images[food.food_type]
-        
-        # 添加到食物列表
-        self.foods.append(food)
+        # 添加到实体池
+        food = self._add(code, phase, position)
         
-        print(f"成功生成食物: {food.food_type}, 位置: {food.grid_position}")
+        print(f"成功生成食物: {food.food_type}, 位置: {position}")
         return food
     
-    def _random_food_type(self):
+    def add_food(self, food_type, position):
         """
-        根据权重随机选择食物类型
+        在指定位置直接添加食物（用于恢复存档，不做位置检查）
         
+        参数:
+            food_type: 食物类型
+            position: 食物位置 (x, y)
+            
         返回:
-            str: 食物类型
+            BaseFood: 添加的食物实体
+        """
+        return self._add(self._type_code(food_type), self.clock.random_phase(), position)
+    
+    def _type_code(self, food_type):
+        """
+        获取食物类型编号（未知类型使用阳光）
+        
+        参数:
+            food_type: 食物类型
+            
+        返回:
+            int: 类型编号
+        """
+        code = FOOD_REGISTRY.codes.get(food_type) if isinstance(food_type, str) else None
+        if code is None:
+            print(f"警告: 未知的食物类型'{food_type}', 使用默认值'sun'")
+            code = FOOD_REGISTRY.codes["sun"]
+        return code
+    
+    def _random_position(self, avoid_positions=None):
+        """
+        随机找一个可用的格子
+        
+        参数:
+            avoid_positions: 需要避开的位置列表
+            
+        返回:
+            tuple: 格子坐标，尝试10次都失败时返回None
         """
-        # 计算总权重
-        total_weight = sum(food_info["weight"] for food_info in FOOD_TYPES.values())
+        if avoid_positions is None:
+            avoid_positions = []
         
-        # 随机选择
-        r = random.uniform(0, total_weight)
-        current_weight = 0
+        # 尝试最多10次找到一个可用位置
+        for _ in range(10):
+            x = self.rng.randint(0, self.grid_width - 1)
+            y = self.rng.randint(0, self.grid_height - 1)
+            
+            # 检查位置是否可用
+            if (x, y) not in avoid_positions:
+                return (x, y)
+        return None
+    
+    def _add(self, code, phase, position):
+        """
+        把食物放入实体池
         
-        for food_type, food_info in FOOD_TYPES.items():
-            current_weight += food_info["weight"]
-            if r <= current_weight:
-                return food_type
+        参数:
+            code: 类型编号
+            phase: 动画相位偏移
+            position: 格子坐标
+            
+        返回:
+            BaseFood: 食物视图
+        """
+        x, y = position
+        pool = self.pool
+        handle = pool.add(code=code, phase=phase, x=x, y=y)
+        cell = y * self.grid_width + x
+        if self.cells[cell]:
+            self.stacked += 1
+        else:
+            self.cells[cell] = (handle & SLOT_MASK) + 1
+        return BaseFood(pool, handle)
+    
+    def has_food(self, cell):
+        """
+        格子上是否有食物
+        
+        参数:
+            cell: 格子坐标 (x, y)
+            
+        返回:
+            bool: 是否有食物
+        """
+        x, y = cell
+        return self.cells[y * self.grid_width + x] != 0
+    
+    def _random_food_type(self):
+        """
+        根据权重随机选择食物类型
         
-        # 默认返回阳光
-        return "sun"
+        返回:
+            str: 食物类型
+        """
+        return FOOD_REGISTRY.random_type(self.rng)
     
     def update(self, delta_time):
         """
@@ -473,8 +372,7 @@ class FoodManager:
         参数:
             delta_time: 时间增量
         """
-        for food in self.foods:
-            food.update(delta_time)
+        self.clock.advance(delta_time)
     
     def check_collisions(self, snake_head_pos):
         """
@@ -486,10 +384,12 @@ class FoodManager:
         返回:
             BaseFood: 碰撞的食物，如果没有碰撞则返回None
         """
-        for food in self.foods:
-            if food.check_collision(snake_head_pos):
-                return food
-        return None
+        x, y = snake_head_pos
+        slot = self.cells[y * self.grid_width + x] - 1
+        if slot < 0:
+            return None
+        pool = self.pool
+        return BaseFood(pool, pool.handle(pool.indices[slot]))
     
     def remove_food(self, food):
         """
@@ -498,22 +398,88 @@ class FoodManager:
         参数:
             food: 要移除的食物
         """
-        if food in self.foods:
-            self.foods.remove(food)
+        pool = self.pool
+        handle = food.handle
+        index = pool.index(handle)
+        if index < 0:
+            return
+        xs, ys = pool.columns["x"], pool.columns["y"]
+        x, y = xs[index], ys[index]
+        pool.remove(handle)
+        
+        cell = y * self.grid_width + x
+        if self.cells[cell] != (handle & SLOT_MASK) + 1:
+            self.stacked -= 1
+            return
+        self.cells[cell] = 0
+        
+        # 同一格子上还有叠放的食物时，索引其中一个（很少发生）
+        if self.stacked:
+            for other_index in range(len(pool)):
+                if xs[other_index] == x and ys[other_index] == y:
+                    self.cells[cell] = pool.slots[other_index] + 1
+                    self.stacked -= 1
+                    break
     
     def clear(self):
         """清空所有食物"""
-        self.foods.clear()
+        pool = self.pool
+        if self.cells is not None:
+            width = self.grid_width
+            for x, y in zip(pool.columns["x"], pool.columns["y"]):
+                self.cells[y * width + x] = 0
+        pool.clear()
+        self.stacked = 0
     
-    def draw(self, surface, grid_size):
+    def draw(self, surface, grid_size, camera=None):
         """
         绘制所有食物
         
         参数:
             surface: 绘制表面
             grid_size: 网格大小
+            camera: 摄像机，如果提供则跳过视口外的食物
         """
         use_images = self.game_engine.config.DEFAULT_SETTINGS.get("use_images", True) if self.game_engine else True
+        sprites = self.get_sprites(grid_size, use_images)
+        
+        # 直接遍历实体池的列，不经过视图对象
+        columns = self.pool.columns
+        codes, phases, xs, ys = columns["code"], columns["phase"], columns["x"], columns["y"]
+        
+        # 悬浮动画只影响精灵的y坐标，偏移从每种类型的偏移表中按相位查出
+        clock = self.clock
+        hover_tables = [clock.offset_table(hover_range) for hover_range in FOOD_REGISTRY.hover_ranges]
+        clock_phase, mask = clock.phase, clock.mask
+        
+        blits = []
+        for index in range(len(codes)):
+            if camera is not None:
+                cell = (xs[index], ys[index])
+                if not camera.is_visible(cell):
+                    continue
+                pixel_x, pixel_y = camera.world_to_screen(cell)
+            else:
+                pixel_x, pixel_y = xs[index] * grid_size, ys[index] * grid_size
+            code = codes[index]
+            sprite, offset_x, offset_y = sprites[code]
+            hover_offset = hover_tables[code][(clock_phase + phases[index]) & mask]
+            blits.append((sprite, (pixel_x + offset_x, pixel_y + offset_y + hover_offset)))
+        surface.blits(blits, False)
+    
+    def get_sprites(self, grid_size, use_images=True):
+        """
+        获取预渲染的食物精灵（只在网格大小或是否使用图像变化时重新生成）
         
-        for food in self.foods:
-            food.draw(surface, grid_size, use_images) 
\ No newline at end of file
+        参数:
+            grid_size: 网格大小
+            use_images: 是否使用图像
+            
+        返回:
+            list: 按类型编号索引的 (精灵, x偏移, y偏移)
+        """
+        key = (grid_size, use_images)
+        if self.sprites is None or self.sprites_key != key:
+            self.sprites = FOOD_REGISTRY.render_sprites(grid_size, self.food_images if use_images else None)
+            self.sprites_key = key
+        return self.sprites 
\ No newline at end of file
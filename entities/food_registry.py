@@ -0,0 +1,249 @@
+"""
+食物注册表
+食物类型、效果和绘制方式都在配置（FOOD_TYPES）或插件模块（FOOD_PLUGINS）中声明，
+加载时编译成按类型编号索引的平坦表和预渲染的精灵，新增食物类型不需要修改代码
+"""
+
+import importlib
+import math
+import random
+from bisect import bisect_left
+import pygame
+from config import FOOD_TYPES, FOOD_PLUGINS
+
+# 效果表 {效果名: 函数(snake)}
+EFFECTS = {}
+
+# 绘制方式表 {绘制方式名: 函数(surface, center, grid_size, color)}
+RENDERERS = {}
+
+# 预渲染精灵的透明色（绘制方式不要使用这个颜色）
+SPRITE_COLORKEY = (255, 0, 255)
+
+# 食物类型缺省的属性
+FOOD_DEFAULTS = {
+    "weight": 0,
+    "score": 10,
+    "effect": None,
+    "image": None,
+    "color": (255, 255, 0),
+    "renderer": "circle",
+    "hover_range": 3
+}
+
+
+def register_effect(name):
+    """
+    注册食物效果的装饰器
+
+    参数:
+        name: 效果名（FOOD_TYPES中的effect）
+
+    返回:
+        function: 装饰器，被装饰的函数接收蛇实体
+    """
+    def decorator(function):
+        EFFECTS[name] = function
+        return function
+    return decorator
+
+
+def register_renderer(name):
+    """
+    注册食物绘制方式的装饰器（只在预渲染精灵时调用一次）
+
+    参数:
+        name: 绘制方式名（FOOD_TYPES中的renderer）
+
+    返回:
+        function: 装饰器，被装饰的函数接收(surface, center, grid_size, color)
+    """
+    def decorator(function):
+        RENDERERS[name] = function
+        return function
+    return decorator
+
+
+def register_food_type(name, **info):
+    """
+    注册食物类型（供插件模块在导入时调用，未给出的属性使用FOOD_DEFAULTS）
+
+    参数:
+        name: 食物类型名
+        **info: 食物属性（weight、score、effect、image、color、renderer、hover_range）
+    """
+    FOOD_TYPES[name] = {**FOOD_DEFAULTS, **info}
+
+
+@register_effect("shield")
+def _shield(snake):
+    """护盾"""
+    snake.activate_shield()
+
+
+@register_effect("speed_up")
+def _speed_up(snake):
+    """速度提升"""
+    snake.activate_speed_boost()
+
+
+@register_renderer("circle")
+def _draw_circle(surface, center, grid_size, color):
+    """圆形（阳光）"""
+    pygame.draw.circle(surface, color, center, grid_size // 3)
+
+
+@register_renderer("sunflower")
+def _draw_sunflower(surface, center, grid_size, color):
+    """向日葵：花盘和八片花瓣"""
+    center_x, center_y = center
+    pygame.draw.circle(surface, color, center, grid_size // 3)
+    for i in range(8):
+        angle = i * math.pi / 4
+        petal_x = center_x + int(math.cos(angle) * grid_size // 2.5)
+        petal_y = center_y + int(math.sin(angle) * grid_size // 2.5)
+        pygame.draw.circle(surface, (255, 220, 0), (petal_x, petal_y), grid_size // 6)
+
+
+@register_renderer("walnut")
+def _draw_walnut(surface, center, grid_size, color):
+    """坚果：主体和脸部"""
+    center_x, center_y = center
+    pygame.draw.ellipse(
+        surface,
+        color,
+        pygame.Rect(
+            center_x - grid_size // 3,
+            center_y - grid_size // 2.5,
+            grid_size // 1.5,
+            grid_size // 1.25
+        )
+    )
+    pygame.draw.ellipse(
+        surface,
+        (220, 200, 180),  # 浅棕色
+        pygame.Rect(
+            center_x - grid_size // 4,
+            center_y - grid_size // 3,
+            grid_size // 2,
+            grid_size // 2
+        )
+    )
+
+
+@register_renderer("peashooter")
+def _draw_peashooter(surface, center, grid_size, color):
+    """豌豆射手：头部和豌豆"""
+    center_x, center_y = center
+    pygame.draw.circle(surface, color, center, grid_size // 3)
+    pygame.draw.circle(surface, (100, 200, 100), (center_x + grid_size // 3, center_y), grid_size // 5)
+
+
+def load_plugins(modules=None):
+    """
+    导入插件模块（插件在导入时调用register_*注册食物类型、效果和绘制方式）
+
+    参数:
+        modules: 模块名列表，如果为None则使用配置中的FOOD_PLUGINS
+    """
+    for module_name in modules if modules is not None else FOOD_PLUGINS:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"警告: 无法加载食物插件 {module_name}: {e}")
+
+
+class FoodRegistry:
+    """
+    编译后的食物注册表类
+    每种食物类型对应一个编号，得分、效果名、悬浮范围、绘制方式等都按编号存成平坦的表，
+    精灵按网格大小预渲染一次，之后每个食物每帧只需要查一次表、blit一次。
+    """
+
+    def __init__(self, food_types=None):
+        """
+        编译食物注册表
+
+        参数:
+            food_types: {食物类型: 属性}，如果为None则使用FOOD_TYPES
+        """
+        if food_types is None:
+            food_types = FOOD_TYPES
+        infos = [{**FOOD_DEFAULTS, **info} for info in food_types.values()]
+
+        self.names = tuple(food_types)
+        self.codes = {name: code for code, name in enumerate(self.names)}
+        self.scores = [info["score"] for info in infos]
+        self.effects = [info["effect"] for info in infos]
+        self.images = [info["image"] for info in infos]
+        self.colors = [info["color"] for info in infos]
+        self.hover_ranges = [info["hover_range"] for info in infos]
+        self.renderers = []
+        for name, info in zip(self.names, infos):
+            if info["effect"] is not None and info["effect"] not in EFFECTS:
+                print(f"警告: 食物类型'{name}'的效果'{info['effect']}'未注册")
+            renderer = RENDERERS.get(info["renderer"])
+            if renderer is None:
+                print(f"警告: 食物类型'{name}'的绘制方式'{info['renderer']}'未注册, 使用圆形")
+                renderer = RENDERERS["circle"]
+            self.renderers.append(renderer)
+
+        # 累计权重，用于按权重随机选择
+        self.cumulative_weights = []
+        total_weight = 0
+        for info in infos:
+            total_weight += info["weight"]
+            self.cumulative_weights.append(total_weight)
+        self.total_weight = total_weight
+
+    def random_type(self, rng=random):
+        """
+        根据权重随机选择食物类型
+
+        参数:
+            rng: 随机数生成器，默认使用全局的random
+
+        返回:
+            str: 食物类型
+        """
+        r = rng.uniform(0, self.total_weight)
+        code = bisect_left(self.cumulative_weights, r)
+        return self.names[code] if code < len(self.names) else "sun"
+
+    def render_sprites(self, grid_size, images=None):
+        """
+        预渲染每种食物的精灵
+
+        参数:
+            grid_size: 网格大小
+            images: {食物类型: 图像}，有图像的类型直接使用图像，其余用绘制方式画出来
+
+        返回:
+            list: 按编号索引的 (精灵, 相对格子左上角的x偏移, y偏移)
+        """
+        images = images or {}
+        sprites = []
+        for code, name in enumerate(self.names):
+            image = images.get(name)
+            if image is not None:
+                width, height = image.get_size()
+                sprites.append((image, grid_size // 2 - width // 2, grid_size // 2 - height // 2))
+                continue
+            
+            # 绘制的图形会超出格子（例如向日葵的花瓣），先画在两倍大小的表面上再裁剪；
+            # 图形都是不透明的，用RLE压缩的透明色比逐像素alpha混合快
+            canvas = pygame.Surface((grid_size * 2, grid_size * 2))
+            canvas.fill(SPRITE_COLORKEY)
+            canvas.set_colorkey(SPRITE_COLORKEY)
+            self.renderers[code](canvas, (grid_size, grid_size), grid_size, self.colors[code])
+            bounds = canvas.get_bounding_rect()
+            sprite = canvas.subsurface(bounds).copy()
+            sprite.set_colorkey(SPRITE_COLORKEY, pygame.RLEACCEL)
+            sprites.append((sprite, bounds.x - grid_size // 2, bounds.y - grid_size // 2))
+        return sprites
+
+
+# 先加载插件，再编译注册表（存档和联机协议中的食物类型编号也来自这里）
+load_plugins()
+FOOD_REGISTRY = FoodRegistry()
+FOOD_TYPE_NAMES = FOOD_REGISTRY.names
@@ -5,35 +5,51 @@
 
 import pygame
 import random
-import math
 from config import (
     GRID_SIZE, GRID_WIDTH, GRID_HEIGHT, OBSTACLE_TYPES,
-    PVZ_GREEN, PVZ_DARK_GREEN, DIFFICULTY_LEVELS, OBSTACLES_IMAGES_DIR
+    PVZ_GREEN, PVZ_DARK_GREEN, DIFFICULTY_LEVELS, DEFAULT_SETTINGS, OBSTACLES_IMAGES_DIR
 )
+from utils.animation_clock import AnimationClock
+from utils.flow_field import FlowField
+
+class _BlockedCells:
+    """
+    多个格子集合的并集（只支持in运算，不复制集合）
+    """
+    
+    def __init__(self, *groups):
+        self.groups = [group for group in groups if group]
+    
+    def __contains__(self, cell):
+        return any(cell in group for group in self.groups)
 
 class BaseObstacle:
     """
     基础障碍物类
-    所有障碍物类型的父类
+    所有障碍物类型的父类（使用__slots__，尸潮模式下会同时存在几百个障碍物）
     """
     
+    __slots__ = ("position", "speed", "damage", "image", "grid_width", "grid_height", "phase")
+    
     def __init__(self):
         """初始化障碍物"""
         self.position = (0, 0)  # 障碍物位置
         self.speed = 0  # 移动速度
         self.damage = 1  # 造成的伤害
         self.image = None  # 障碍物图像
+        self.grid_width = GRID_WIDTH  # 世界宽度（格子数），由管理器设置
+        self.grid_height = GRID_HEIGHT  # 世界高度（格子数），由管理器设置
         
-        # 动画参数
-        self.animation_offset = random.random() * math.pi * 2  # 随机初始偏移
-        self.animation_speed = 0.05
+        # 动画相位偏移（由ObstacleManager的动画时钟推进）
+        self.phase = 0
     
-    def spawn(self, avoid_positions=None):
+    def spawn(self, avoid_positions=None, rng=random):
         """
         在随机位置生成障碍物
         
         参数:
             avoid_positions: 需要避开的位置列表
+            rng: 随机数生成器，默认使用全局的random
             
         返回:
             bool: 是否成功生成
@@ -43,8 +59,8 @@ class BaseObstacle:
         
         # 尝试最多10次找到一个可用位置
         for _ in range(10):
-            x = random.randint(0, GRID_WIDTH - 1)
-            y = random.randint(0, GRID_HEIGHT - 1)
+            x = rng.randint(0, self.grid_width - 1)
+            y = rng.randint(0, self.grid_height - 1)
             
             # 检查位置是否可用
             if (x, y) not in avoid_positions:
@@ -54,18 +70,35 @@ class BaseObstacle:
         # 如果尝试10次都失败，返回False
         return False
     
-    def update(self, delta_time, avoid_positions=None):
+    def update(self, delta_time, avoid_positions=None, flow_field=None, rng=random):
         """
         更新障碍物状态
         
         参数:
             delta_time: 时间增量
             avoid_positions: 需要避开的位置列表
+            flow_field: 追击蛇头用的流场，为None时不追击
+            rng: 随机数生成器，默认使用全局的random
+        """
+        # 动画相位由管理器的动画时钟统一推进，静止的障碍物没有需要更新的状态
+    
+    def _pixel_origin(self, grid_size, camera=None):
+        """
+        计算障碍物所在格子左上角的屏幕像素坐标
+        
+        参数:
+            grid_size: 网格大小
+            camera: 摄像机，可以为None
+            
+        返回:
+            tuple: 屏幕像素坐标 (px, py)
         """
-        # 更新动画
-        self.animation_offset = (self.animation_offset + self.animation_speed) % (math.pi * 2)
+        if camera is not None:
+            return camera.world_to_screen(self.position)
+        x, y = self.position
+        return x * grid_size, y * grid_size
     
-    def draw(self, surface, grid_size, use_images=True):
+    def draw(self, surface, grid_size, use_images=True, camera=None, wobble=0.0):
         """
         绘制障碍物
         
@@ -73,14 +106,14 @@ class BaseObstacle:
             surface: 绘制表面
             grid_size: 网格大小
             use_images: 是否使用图像
+            camera: 摄像机，如果为None则按窗口坐标绘制
+            wobble: 摆动动画的偏移（像素），由管理器的动画时钟批量计算
         """
         if not self.position:
             return
             
         # 计算实际像素位置
-        x, y = self.position
-        pixel_x = x * grid_size
-        pixel_y = y * grid_size
+        pixel_x, pixel_y = self._pixel_origin(grid_size, camera)
         
         # 如果有图像并且设置使用图像，则绘制图像
         if self.image is not None and use_images:
@@ -102,13 +135,15 @@ class TombstoneObstacle(BaseObstacle):
     静止不动的障碍物
     """
     
+    __slots__ = ()
+    
     def __init__(self):
         """初始化墓碑障碍物"""
         super().__init__()
         self.speed = OBSTACLE_TYPES["tombstone"]["speed"]
         self.damage = OBSTACLE_TYPES["tombstone"]["damage"]
     
-    def draw(self, surface, grid_size, use_images=True):
+    def draw(self, surface, grid_size, use_images=True, camera=None, wobble=0.0):
         """
         绘制墓碑障碍物
         
@@ -116,17 +151,17 @@ class TombstoneObstacle(BaseObstacle):
             surface: 绘制表面
             grid_size: 网格大小
             use_images: 是否使用图像
+            camera: 摄像机，如果为None则按窗口坐标绘制
+            wobble: 摆动动画的偏移（像素），由管理器的动画时钟批量计算
         """
         if self.image is not None and use_images:
-            super().draw(surface, grid_size, use_images)
+            super().draw(surface, grid_size, use_images, camera, wobble)
         else:
             if not self.position:
                 return
                 
             # 计算实际像素位置
-            x, y = self.position
-            pixel_x = x * grid_size
-            pixel_y = y * grid_size
+            pixel_x, pixel_y = self._pixel_origin(grid_size, camera)
             
             # 绘制墓碑
             # 墓碑底座
@@ -178,24 +213,33 @@ class ZombieObstacle(BaseObstacle):
     会缓慢移动的障碍物
     """
     
-    def __init__(self):
-        """初始化僵尸障碍物"""
+    __slots__ = ("direction", "move_timer", "move_interval")
+    
+    def __init__(self, rng=random):
+        """
+        初始化僵尸障碍物
+        
+        参数:
+            rng: 随机数生成器，默认使用全局的random
+        """
         super().__init__()
         self.speed = OBSTACLE_TYPES["zombie"]["speed"]
         self.damage = OBSTACLE_TYPES["zombie"]["damage"]
-        self.direction = random.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])  # 随机初始方向
+        self.direction = rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])  # 随机初始方向
         self.move_timer = 0
         self.move_interval = 1.0 / self.speed if self.speed > 0 else float('inf')
     
-    def update(self, delta_time, avoid_positions=None):
+    def update(self, delta_time, avoid_positions=None, flow_field=None, rng=random):
         """
         更新僵尸障碍物状态
         
         参数:
             delta_time: 时间增量
             avoid_positions: 需要避开的位置列表
+            flow_field: 追击蛇头用的流场，为None时随机游走
+            rng: 随机数生成器，默认使用全局的random
         """
-        super().update(delta_time, avoid_positions)
+        super().update(delta_time, avoid_positions, flow_field, rng)
         
         # 如果速度为0，不移动
         if self.speed <= 0:
@@ -208,24 +252,32 @@ class ZombieObstacle(BaseObstacle):
         if self.move_timer >= self.move_interval:
             self.move_timer = 0
             
+            # 有流场时沿距离下降最快的方向追击蛇头
+            hunting = False
+            if flow_field is not None:
+                direction = flow_field.downhill(self.position, self.direction)
+                if direction is not None:
+                    self.direction = direction
+                    hunting = True
+            
             # 计算新位置
-            new_x = (self.position[0] + self.direction[0]) % GRID_WIDTH
-            new_y = (self.position[1] + self.direction[1]) % GRID_HEIGHT
+            new_x = (self.position[0] + self.direction[0]) % self.grid_width
+            new_y = (self.position[1] + self.direction[1]) % self.grid_height
             new_position = (new_x, new_y)
             
             # 检查新位置是否可用
             if avoid_positions and new_position in avoid_positions:
                 # 如果新位置不可用，改变方向
-                self.direction = random.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
+                self.direction = rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
             else:
                 # 更新位置
                 self.position = new_position
                 
-                # 有小概率改变方向
-                if random.random() < 0.1:
-                    self.direction = random.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
+                # 游走时有小概率改变方向
+                if not hunting and rng.random() < 0.1:
+                    self.direction = rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
     
-    def draw(self, surface, grid_size, use_images=True):
+    def draw(self, surface, grid_size, use_images=True, camera=None, wobble=0.0):
         """
         绘制僵尸障碍物
         
@@ -233,20 +285,17 @@ class ZombieObstacle(BaseObstacle):
             surface: 绘制表面
             grid_size: 网格大小
             use_images: 是否使用图像
+            camera: 摄像机，如果为None则按窗口坐标绘制
+            wobble: 摆动动画的偏移（像素），由管理器的动画时钟批量计算
         """
         if self.image is not None and use_images:
-            super().draw(surface, grid_size, use_images)
+            super().draw(surface, grid_size, use_images, camera, wobble)
         else:
             if not self.position:
                 return
                 
             # 计算实际像素位置
-            x, y = self.position
-            pixel_x = x * grid_size
-            pixel_y = y * grid_size
-            
-            # 添加动画效果
-            wobble = math.sin(self.animation_offset * 2) * 2
+            pixel_x, pixel_y = self._pixel_origin(grid_size, camera)
             
             # 绘制僵尸
             center_x = pixel_x + grid_size // 2
@@ -330,19 +379,42 @@ class ObstacleManager:
         self.grid_height = GRID_HEIGHT
         self.game_time = 0  # 游戏运行时间，用于延迟障碍物生成
         self.max_obstacles = 5  # 最大障碍物数量
+        self.spawn_interval = 3.0  # 两次生成之间的最短间隔（秒）
+        self.zombie_ai = "wander"  # 僵尸行为："wander"随机游走，"hunt"追击蛇头
+        self.flow_field = None  # 追击用的流场（所有僵尸共享）
+        self.clock = AnimationClock()  # 所有障碍物共用的动画时钟
+        self.rng = random  # 生成和游走使用的随机数生成器（游戏场景和对战模拟换成自己的，保证可以重现）
         
         # 加载障碍物图像
         self.load_images()
         
         # 获取游戏难度
         try:
-            self.difficulty = self.game_engine.settings.get("difficulty", "medium")
-            self.spawn_frequency = DIFFICULTY_LEVELS[self.difficulty]["obstacle_frequency"]
+            self.difficulty = self.game_engine.settings.get("difficulty", DEFAULT_SETTINGS["difficulty"])
+            level = DIFFICULTY_LEVELS[self.difficulty]
+            self.spawn_frequency = level["obstacle_frequency"]
+            self.max_obstacles = level.get("max_obstacles", self.max_obstacles)
+            self.spawn_interval = level.get("spawn_interval", self.spawn_interval)
+            self.zombie_ai = level.get("zombie_ai", self.zombie_ai)
         except Exception as e:
             print(f"初始化障碍物管理器时出错: {e}")
-            # 使用默认值
-            self.difficulty = "medium"
-            self.spawn_frequency = 0.02
+            # 使用默认难度（游戏场景按这里的难度记录排行榜成绩，两者保持一致）
+            self.difficulty = DEFAULT_SETTINGS["difficulty"]
+            self.spawn_frequency = DIFFICULTY_LEVELS[self.difficulty]["obstacle_frequency"]
+    
+    def set_grid_size(self, width, height):
+        """
+        设置网格大小
+        
+        参数:
+            width: 网格宽度
+            height: 网格高度
+        """
+        self.grid_width = width
+        self.grid_height = height
+        for obstacle in self.obstacles:
+            obstacle.grid_width = width
+            obstacle.grid_height = height
     
     def load_images(self):
         """加载障碍物图像"""
@@ -373,15 +445,18 @@ class ObstacleManager:
         """
         # 如果没有指定障碍物类型，随机选择
         if obstacle_type is None:
-            obstacle_type = random.choice(list(OBSTACLE_TYPES.keys()))
+            obstacle_type = self.rng.choice(list(OBSTACLE_TYPES.keys()))
         
         # 创建障碍物实例
         if obstacle_type == "zombie":
-            obstacle = ZombieObstacle()
+            obstacle = ZombieObstacle(self.rng)
         else:
             obstacle = TombstoneObstacle()
+        obstacle.phase = self.clock.random_phase()
         
         # 设置障碍物属性
+        obstacle.grid_width = self.grid_width
+        obstacle.grid_height = self.grid_height
         obstacle.speed = OBSTACLE_TYPES[obstacle_type]["speed"]
         obstacle.damage = OBSTACLE_TYPES[obstacle_type]["damage"]
         
@@ -392,18 +467,11 @@ class ObstacleManager:
         # 如果没有指定位置，随机生成位置
         if position is None:
             # 确保障碍物不会生成在蛇身上或其他障碍物上
-            existing_positions = []
-            
-            # 添加其他障碍物的位置
-            for existing_obstacle in self.obstacles:
-                existing_positions.append(existing_obstacle.position)
-            
-            # 添加需要避开的位置
-            if avoid_positions:
-                existing_positions.extend(avoid_positions)
+            # （avoid_positions可以是列表或占用网格，只做in判断，不复制）
+            existing_positions = {existing_obstacle.position for existing_obstacle in self.obstacles}
             
             # 尝试生成障碍物
-            if not obstacle.spawn(existing_positions):
+            if not obstacle.spawn(_BlockedCells(existing_positions, avoid_positions), self.rng):
                 return None  # 如果无法生成障碍物，返回None
         else:
             obstacle.position = position
@@ -413,76 +481,80 @@ class ObstacleManager:
         
         return obstacle
     
-    def update(self, delta_time, avoid_positions=None):
+    def update(self, delta_time, avoid_positions=None, targets=None):
         """
         更新所有障碍物
         
         参数:
             delta_time: 时间增量
             avoid_positions: 需要避开的位置列表
+            targets: 僵尸追击的目标格子（蛇头）列表，为None时僵尸随机游走
+            
+        返回:
+            BaseObstacle: 本次新生成的障碍物，没有生成时返回None
         """
         # 更新游戏时间
         self.game_time += delta_time
+        self.clock.advance(delta_time)
+        
+        # 追击模式下先更新共享的流场（蛇头没有移动时不会重新计算）
+        flow_field = None
+        if self.zombie_ai == "hunt" and targets:
+            flow_field = self._update_flow_field(targets)
         
         # 更新现有障碍物
         for obstacle in self.obstacles:
-            obstacle.update(delta_time, avoid_positions)
+            obstacle.update(delta_time, avoid_positions, flow_field, self.rng)
         
         # 障碍物生成计时器
         self.spawn_timer += delta_time
         
         # 只有在游戏开始10秒后才开始生成障碍物
         if self.game_time < 10.0:
-            return
+            return None
         
         # 限制障碍物的最大数量
         if len(self.obstacles) >= self.max_obstacles:
-            return
+            return None
         
         # 根据难度和计时器决定是否生成新的障碍物
-        if self.spawn_timer >= 3.0 and random.random() < self.spawn_frequency:
+        if self.spawn_timer >= self.spawn_interval and self.rng.random() < self.spawn_frequency:
             self.spawn_timer = 0
-            self.spawn_obstacle(avoid_positions=avoid_positions)
+            return self.spawn_obstacle(avoid_positions=avoid_positions)
+        return None
     
-    def check_collisions(self, snake):
+    def _update_flow_field(self, targets):
         """
-        检查蛇与障碍物的碰撞
+        更新追击用的流场（静止的障碍物作为墙）
         
         参数:
-            snake: 蛇对象
+            targets: 目标格子列表
             
         返回:
-            bool: 是否发生碰撞
+            FlowField: 流场
         """
-        try:
-            # 获取蛇头位置
-            if not snake or not hasattr(snake, 'positions') or not snake.positions:
-                return False
-                
-            head_pos = snake.positions[0]
-            
-            # 检查是否与任何障碍物碰撞
-            for obstacle in self.obstacles:
-                if head_pos == obstacle.position:
-                    # 如果蛇有护盾，不会碰撞
-                    if hasattr(snake, 'shield_active') and snake.shield_active:
-                        return False
-                    
-                    return True
-            
-            return False
-        except Exception as e:
-            print(f"检查障碍物碰撞时出错: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+        flow_field = self.flow_field
+        if flow_field is None or (flow_field.width, flow_field.height) != (self.grid_width, self.grid_height):
+            flow_field = self.flow_field = FlowField(self.grid_width, self.grid_height)
+        walls = [obstacle.position for obstacle in self.obstacles if obstacle.speed <= 0]
+        flow_field.update(targets, walls)
+        return flow_field
     
-    def draw(self, surface):
+    def draw(self, surface, camera=None):
         """
         绘制所有障碍物
         
         参数:
             surface: 渲染目标表面
+            camera: 摄像机，如果提供则跳过视口外的障碍物
         """
-        for obstacle in self.obstacles:
-            obstacle.draw(surface, GRID_SIZE, self.game_engine.settings.get("use_images", True)) 
\ No newline at end of file
+        use_images = self.game_engine.settings.get("use_images", True)
+        visible = [
+            obstacle for obstacle in self.obstacles
+            if camera is None or camera.is_visible(obstacle.position)
+        ]
+        
+        # 摆动动画（两倍频率，振幅2像素）一次查表算出
+        wobbles = self.clock.samples([obstacle.phase for obstacle in visible], 2, 2)
+        for obstacle, wobble in zip(visible, wobbles):
+            obstacle.draw(surface, GRID_SIZE, use_images, camera, wobble) 
\ No newline at end of file
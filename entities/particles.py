@@ -0,0 +1,227 @@
+"""
+粒子系统
+用预分配的NumPy数组保存粒子数据，批量更新和绘制吃食物、爆炸等特效
+"""
+
+import math
+import pygame
+from config import GRID_SIZE, PARTICLE_SETTINGS, PARTICLE_EFFECTS
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+class ParticleSystem:
+    """
+    粒子系统类
+    所有粒子的位置、速度、寿命和颜色都存放在固定容量的数组里，
+    用空闲列表分配槽位，每帧用向量运算一次性更新所有粒子，
+    绘制时从预渲染的小图缓存中取图，用一次blits批量绘制。
+    """
+
+    def __init__(self, capacity=None):
+        """
+        初始化粒子系统
+
+        参数:
+            capacity: 最大粒子数，如果为None则使用配置中的值
+        """
+        self.capacity = capacity or PARTICLE_SETTINGS["capacity"]
+        self.fade_steps = PARTICLE_SETTINGS["fade_steps"]
+        self.enabled = NUMPY_AVAILABLE
+
+        # 颜色表 {color: index} 和预渲染图缓存 [color_index][fade_step] -> Surface
+        self.color_indices = {}
+        self.sprites = []
+        self.sprite_size = PARTICLE_SETTINGS["sprite_size"]
+
+        if not self.enabled:
+            print("警告: 未安装numpy，粒子特效已禁用")
+            return
+
+        # 粒子数据（世界像素坐标）
+        self.position = np.zeros((self.capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((self.capacity, 2), dtype=np.float32)
+        self.life = np.zeros(self.capacity, dtype=np.float32)
+        self.max_life = np.ones(self.capacity, dtype=np.float32)
+        self.gravity = np.zeros(self.capacity, dtype=np.float32)
+        self.color = np.zeros(self.capacity, dtype=np.int16)
+        self.alive = np.zeros(self.capacity, dtype=bool)
+
+        # 空闲列表（栈），free[:free_count]为可用槽位
+        self.free = np.arange(self.capacity - 1, -1, -1, dtype=np.int32)
+        self.free_count = self.capacity
+
+    @property
+    def count(self):
+        """当前存活的粒子数"""
+        if not self.enabled:
+            return 0
+        return self.capacity - self.free_count
+
+    def _color_index(self, color):
+        """
+        获取颜色在颜色表中的下标，新颜色会预渲染各个淡出阶段的小图
+
+        参数:
+            color: RGB颜色
+
+        返回:
+            int: 颜色下标
+        """
+        color = tuple(color)
+        index = self.color_indices.get(color)
+        if index is not None:
+            return index
+
+        size = self.sprite_size
+        stages = []
+        for step in range(self.fade_steps):
+            alpha = int(255 * (step + 1) / self.fade_steps)
+            sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (*color, alpha), (size // 2, size // 2), size // 2)
+            stages.append(sprite)
+
+        index = len(self.sprites)
+        self.sprites.append(stages)
+        self.color_indices[color] = index
+        return index
+
+    def emit(self, x, y, effect, color=None):
+        """
+        在指定位置发射一组粒子
+
+        参数:
+            x: 世界像素x坐标
+            y: 世界像素y坐标
+            effect: 特效名称（config.PARTICLE_EFFECTS中的键）
+            color: 粒子颜色，如果为None则使用特效配置中的颜色
+
+        返回:
+            int: 实际发射的粒子数
+        """
+        if not self.enabled:
+            return 0
+
+        preset = PARTICLE_EFFECTS[effect]
+        count = min(preset["count"], self.free_count)
+        if count <= 0:
+            return 0
+
+        # 从空闲列表末尾取出槽位
+        self.free_count -= count
+        slots = self.free[self.free_count:self.free_count + count]
+
+        # 随机方向和速度
+        angles = np.random.uniform(0, 2 * math.pi, count)
+        speeds = np.random.uniform(preset["speed"] * 0.3, preset["speed"], count)
+
+        self.position[slots, 0] = x
+        self.position[slots, 1] = y
+        self.velocity[slots, 0] = np.cos(angles) * speeds
+        self.velocity[slots, 1] = np.sin(angles) * speeds
+        lives = np.random.uniform(preset["life"] * 0.5, preset["life"], count)
+        self.life[slots] = lives
+        self.max_life[slots] = lives
+        self.gravity[slots] = preset["gravity"]
+        self.color[slots] = self._color_index(color or preset["color"])
+        self.alive[slots] = True
+        return count
+
+    def emit_at_cell(self, cell, effect, color=None):
+        """
+        在格子中心发射一组粒子
+
+        参数:
+            cell: 网格坐标 (x, y)
+            effect: 特效名称
+            color: 粒子颜色，可以为None
+
+        返回:
+            int: 实际发射的粒子数
+        """
+        half = GRID_SIZE // 2
+        return self.emit(cell[0] * GRID_SIZE + half, cell[1] * GRID_SIZE + half, effect, color)
+
+    def update(self, delta_time):
+        """
+        更新所有粒子
+
+        参数:
+            delta_time: 时间增量（秒）
+        """
+        if not self.enabled or self.free_count == self.capacity:
+            return
+
+        alive = self.alive
+        self.velocity[alive, 1] += self.gravity[alive] * delta_time
+        self.position[alive] += self.velocity[alive] * delta_time
+        self.life[alive] -= delta_time
+
+        # 回收寿命耗尽的粒子
+        dead = np.flatnonzero(alive & (self.life <= 0))
+        if len(dead):
+            alive[dead] = False
+            self.free[self.free_count:self.free_count + len(dead)] = dead
+            self.free_count += len(dead)
+
+    def draw(self, surface, camera=None):
+        """
+        绘制所有粒子
+
+        参数:
+            surface: 渲染目标表面
+            camera: 摄像机，如果为None则按窗口坐标绘制
+        """
+        if not self.enabled or self.free_count == self.capacity:
+            return
+
+        slots = np.flatnonzero(self.alive)
+        half = self.sprite_size // 2
+        xs = self.position[slots, 0] - half
+        ys = self.position[slots, 1] - half
+
+        # 转换为屏幕坐标（环形世界折回视口附近）
+        if camera is not None:
+            xs = xs - camera.x
+            ys = ys - camera.y
+            if camera.scroll_x:
+                xs = np.mod(xs, camera.world_pixel_width)
+                xs[xs > camera.world_pixel_width - self.sprite_size] -= camera.world_pixel_width
+            if camera.scroll_y:
+                ys = np.mod(ys, camera.world_pixel_height)
+                ys[ys > camera.world_pixel_height - self.sprite_size] -= camera.world_pixel_height
+
+        # 剔除屏幕外的粒子
+        width, height = surface.get_size()
+        visible = (xs > -self.sprite_size) & (xs < width) & (ys > -self.sprite_size) & (ys < height)
+        slots = slots[visible]
+        if not len(slots):
+            return
+
+        # 按剩余寿命选择淡出阶段
+        stages = np.minimum(
+            (self.life[slots] / self.max_life[slots] * self.fade_steps).astype(np.int32),
+            self.fade_steps - 1
+        )
+
+        sprites = self.sprites
+        surface.blits([
+            (sprites[color][stage], (x, y))
+            for color, stage, x, y in zip(
+                self.color[slots].tolist(), stages.tolist(),
+                xs[visible].astype(np.int32).tolist(), ys[visible].astype(np.int32).tolist()
+            )
+        ], doreturn=False)
+
+    def clear(self):
+        """移除所有粒子"""
+        if not self.enabled:
+            return
+        self.alive[:] = False
+        self.free[:] = np.arange(self.capacity - 1, -1, -1, dtype=np.int32)
+        self.free_count = self.capacity
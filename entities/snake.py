@@ -10,6 +10,7 @@ from config import (
     UP, DOWN, LEFT, RIGHT,
     PVZ_GREEN, PVZ_DARK_GREEN, WHITE
 )
+from entities.food_registry import EFFECTS
 
 class Snake:
     """
@@ -17,23 +18,33 @@ class Snake:
     控制蛇的移动、生长和渲染
     """
     
-    def __init__(self, game_engine):
+    def __init__(self, game_engine, grid_width=GRID_WIDTH, grid_height=GRID_HEIGHT):
         """
         初始化蛇
         
         参数:
             game_engine: 游戏引擎实例
+            grid_width: 世界宽度（格子数）
+            grid_height: 世界高度（格子数）
         """
         self.game_engine = game_engine
         self.resource_loader = game_engine.resource_loader
         self.use_images = game_engine.settings.get("use_images", True)
+        self.grid_width = grid_width
+        self.grid_height = grid_height
         
         # 蛇的身体部分
-        self.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]  # 初始位置在中心
+        self.positions = [(grid_width // 2, grid_height // 2)]  # 初始位置在中心
         self.direction = RIGHT  # 初始方向向右
         self.next_direction = RIGHT  # 下一步的方向
         self.growth_pending = 0  # 待增长的长度
         
+        # 身体格子索引 {position: serial}，serial为该节加入时的编号，
+        # 节的下标 = 蛇头编号 - serial，用于O(1)的自碰撞检测和按格子剔除绘制
+        self._cell_serials = {}
+        self._head_serial = 0
+        self._rebuild_cell_index()
+        
         # 特殊能力
         self.shield_active = False  # 护盾是否激活
         self.shield_timer = 0  # 护盾持续时间
@@ -52,6 +63,9 @@ class Snake:
         self.shield_effect_image = None
         self.speed_effect_image = None
         
+        # 预渲染的能力光环图像 {(kind, head_radius): Surface}
+        self._aura_sprites = {}
+        
         # 加载图像
         self._load_images()
     
@@ -67,7 +81,8 @@ class Snake:
     
     def reset(self):
         """重置蛇到初始状态"""
-        self.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
+        self.positions = [(self.grid_width // 2, self.grid_height // 2)]
+        self._rebuild_cell_index()
         self.direction = RIGHT
         self.next_direction = RIGHT
         self.growth_pending = 0
@@ -77,6 +92,29 @@ class Snake:
         self.speed_boost_timer = 0
         self.speed_multiplier = 1.0
     
+    def _rebuild_cell_index(self):
+        """根据positions重建身体格子索引（直接替换positions后需要调用）"""
+        self._head_serial = len(self.positions) - 1
+        self._cell_serials = {
+            position: self._head_serial - i
+            for i, position in enumerate(self.positions)
+        }
+    
+    def segment_index(self, cell):
+        """
+        获取占据指定格子的身体节下标
+        
+        参数:
+            cell: 网格坐标 (x, y)
+            
+        返回:
+            int: 身体节下标（0为蛇头），如果格子未被占据返回None
+        """
+        serial = self._cell_serials.get(cell)
+        if serial is None:
+            return None
+        return self._head_serial - serial
+    
     def set_direction(self, direction):
         """
         设置蛇的移动方向
@@ -112,25 +150,36 @@ class Snake:
         
         # 计算新的头部位置
         new_head = (
-            (head_x + self.direction[0]) % GRID_WIDTH,
-            (head_y + self.direction[1]) % GRID_HEIGHT
+            (head_x + self.direction[0]) % self.grid_width,
+            (head_y + self.direction[1]) % self.grid_height
         )
         
         # 检查是否碰到自己
-        if len(self.positions) > 1 and new_head in self.positions:
+        if len(self.positions) > 1 and new_head in self._cell_serials:
             return True  # 碰撞
         
         # 添加新的头部
         self.positions.insert(0, new_head)
+        self._head_serial += 1
+        self._cell_serials[new_head] = self._head_serial
         
         # 如果有待增长的长度，减少一个单位
         if self.growth_pending > 0:
             self.growth_pending -= 1
         else:
             # 否则移除尾部
-            self.positions.pop()
+            tail = self.positions.pop()
+            if tail != new_head:
+                del self._cell_serials[tail]
         
-        # 更新特殊能力计时器
+        return False  # 没有碰撞
+    
+    def tick_abilities(self):
+        """
+        特殊能力计时器减少一步
+        
+        每步在判定碰撞之前调用，护盾在最后一步判定时已经失效。
+        """
         if self.shield_active:
             self.shield_timer -= 1
             if self.shield_timer <= 0:
@@ -141,8 +190,6 @@ class Snake:
             if self.speed_boost_timer <= 0:
                 self.speed_boost_active = False
                 self.speed_multiplier = 1.0
-        
-        return False  # 没有碰撞
     
     def activate_shield(self, duration=100):
         """
@@ -184,32 +231,81 @@ class Snake:
         """
         self.animation_time += delta_time
     
-    def draw(self, surface):
+    def draw(self, surface, camera=None):
         """
         在屏幕上绘制蛇
         
         参数:
             surface: 渲染目标表面
+            camera: 摄像机，如果为None则按窗口坐标绘制
         """
+        segments = self._visible_segments(camera)
         if self.use_images and self.head_image and self.body_image and self.tail_image:
-            self._draw_with_images(surface)
+            self._draw_with_images(surface, segments, camera)
         else:
-            self._draw_with_shapes(surface)
+            self._draw_with_shapes(surface, segments, camera)
+    
+    def _visible_segments(self, camera):
+        """
+        获取需要绘制的身体节
+        
+        蛇比可见区域短时遍历身体并剔除视口外的节；蛇比可见区域长时改为遍历
+        可见格子查索引，这样绘制开销只与视口大小有关，与蛇的长度无关。
+        
+        参数:
+            camera: 摄像机，可以为None
+            
+        返回:
+            list: (下标, 位置) 列表，按下标从蛇头到蛇尾排序
+        """
+        if camera is None or not camera.scrolling:
+            return list(enumerate(self.positions))
+        
+        if len(self.positions) <= camera.visible_cell_count():
+            return [
+                (i, position) for i, position in enumerate(self.positions)
+                if camera.is_visible(position)
+            ]
+        
+        segments = []
+        for cell in camera.visible_cells():
+            i = self.segment_index(cell)
+            if i is not None:
+                segments.append((i, cell))
+        segments.sort()
+        return segments
     
-    def _draw_with_images(self, surface):
+    def _segment_rect(self, position, camera):
+        """
+        计算身体节在屏幕上的矩形
+        
+        参数:
+            position: 网格坐标
+            camera: 摄像机，可以为None
+            
+        返回:
+            pygame.Rect: 屏幕矩形
+        """
+        if camera is not None:
+            return camera.cell_rect(position)
+        return pygame.Rect(
+            position[0] * GRID_SIZE,
+            position[1] * GRID_SIZE,
+            GRID_SIZE, GRID_SIZE
+        )
+    
+    def _draw_with_images(self, surface, segments, camera=None):
         """
         使用图像绘制蛇
         
         参数:
             surface: 渲染目标表面
+            segments: 需要绘制的 (下标, 位置) 列表
+            camera: 摄像机，可以为None
         """
-        for i, position in enumerate(self.positions):
+        for i, position in segments:
             # 计算蛇身体每一节的矩形位置
-            rect = pygame.Rect(
-                position[0] * GRID_SIZE,
-                position[1] * GRID_SIZE,
-                GRID_SIZE, GRID_SIZE
-            )
+            rect = self._segment_rect(position, camera)
             
             # 确定使用哪个图像
             if i == 0:  # 蛇头
@@ -322,20 +418,18 @@ class Snake:
                     image_rect = rotated_image.get_rect(center=rect.center)
                     surface.blit(rotated_image, image_rect)
     
-    def _draw_with_shapes(self, surface):
+    def _draw_with_shapes(self, surface, segments, camera=None):
         """
         使用基本图形绘制蛇
         
         参数:
             surface: 渲染目标表面
+            segments: 需要绘制的 (下标, 位置) 列表
+            camera: 摄像机，可以为None
         """
-        for i, position in enumerate(self.positions):
+        for i, position in segments:
             # 计算蛇身体每一节的矩形位置
-            rect = pygame.Rect(
-                position[0] * GRID_SIZE,
-                position[1] * GRID_SIZE,
-                GRID_SIZE, GRID_SIZE
-            )
+            rect = self._segment_rect(position, camera)
             
             # 绘制圆形豌豆身体
             center_x = rect.centerx
@@ -348,27 +442,14 @@ class Snake:
                 
                 # 如果有护盾，绘制护盾效果
                 if self.shield_active:
-                    shield_radius = head_radius + 4
-                    shield_color = (100, 200, 255, 150)  # 半透明蓝色
-                    shield_surface = pygame.Surface((shield_radius*2, shield_radius*2), pygame.SRCALPHA)
-                    pygame.draw.circle(shield_surface, shield_color, (shield_radius, shield_radius), shield_radius)
+                    shield_surface = self._get_aura_sprite("shield", head_radius)
+                    shield_radius = shield_surface.get_width() // 2
                     surface.blit(shield_surface, (center_x - shield_radius, center_y - shield_radius))
                 
                 # 如果有速度提升，绘制速度效果
                 if self.speed_boost_active:
-                    speed_radius = head_radius + 6
-                    speed_color = (255, 200, 0, 100)  # 半透明黄色
-                    speed_surface = pygame.Surface((speed_radius*2, speed_radius*2), pygame.SRCALPHA)
-                    
-                    # 绘制速度线条
-                    for angle in range(0, 360, 45):
-                        rad_angle = math.radians(angle)
-                        start_x = speed_radius + math.cos(rad_angle) * (head_radius + 2)
-                        start_y = speed_radius + math.sin(rad_angle) * (head_radius + 2)
-                        end_x = speed_radius + math.cos(rad_angle) * speed_radius
-                        end_y = speed_radius + math.sin(rad_angle) * speed_radius
-                        pygame.draw.line(speed_surface, speed_color, (start_x, start_y), (end_x, end_y), 2)
-                    
+                    speed_surface = self._get_aura_sprite("speed_up", head_radius)
+                    speed_radius = speed_surface.get_width() // 2
                     surface.blit(speed_surface, (center_x - speed_radius, center_y - speed_radius))
                 
                 # 绘制头部
@@ -404,18 +485,53 @@ class Snake:
                     detail_radius = body_radius // 2
                     pygame.draw.circle(surface, PVZ_DARK_GREEN, (center_x, center_y), detail_radius, 1)
     
+    def _get_aura_sprite(self, kind, head_radius):
+        """
+        获取能力光环图像（首次使用时渲染并缓存）
+        
+        参数:
+            kind: 光环类型，"shield"或"speed_up"
+            head_radius: 蛇头半径
+            
+        返回:
+            pygame.Surface: 光环图像
+        """
+        key = (kind, head_radius)
+        sprite = self._aura_sprites.get(key)
+        if sprite is not None:
+            return sprite
+        
+        if kind == "shield":
+            shield_radius = head_radius + 4
+            shield_color = (100, 200, 255, 150)  # 半透明蓝色
+            sprite = pygame.Surface((shield_radius*2, shield_radius*2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, shield_color, (shield_radius, shield_radius), shield_radius)
+        else:
+            speed_radius = head_radius + 6
+            speed_color = (255, 200, 0, 100)  # 半透明黄色
+            sprite = pygame.Surface((speed_radius*2, speed_radius*2), pygame.SRCALPHA)
+            
+            # 绘制速度线条
+            for angle in range(0, 360, 45):
+                rad_angle = math.radians(angle)
+                start_x = speed_radius + math.cos(rad_angle) * (head_radius + 2)
+                start_y = speed_radius + math.sin(rad_angle) * (head_radius + 2)
+                end_x = speed_radius + math.cos(rad_angle) * speed_radius
+                end_y = speed_radius + math.sin(rad_angle) * speed_radius
+                pygame.draw.line(sprite, speed_color, (start_x, start_y), (end_x, end_y), 2)
+        
+        self._aura_sprites[key] = sprite
+        return sprite
+    
     def add_ability(self, ability_name):
         """
         添加特殊能力
         
         参数:
-            ability_name: 能力名称，如"shield"或"speed_up"
-        """
-        if ability_name == "shield":
-            self.activate_shield()
-            print("激活护盾能力")
-        elif ability_name == "speed_up":
-            self.activate_speed_boost()
-            print("激活速度提升能力")
-        else:
-            print(f"未知能力: {ability_name}") 
\ No newline at end of file
+            ability_name: 能力名称，如"shield"或"speed_up"（在食物注册表的效果表中查找）
+        """
+        effect = EFFECTS.get(ability_name)
+        if effect is None:
+            print(f"未知能力: {ability_name}")
+            return
+        effect(self)
@@ -0,0 +1,185 @@
+"""
+水域地图
+泳池场景的水域格子，每局生成一次，决定蛇在水中的移动速度；
+水面上的波纹动画预渲染成一小组覆盖层图像
+"""
+
+import math
+import pygame
+from config import WATER_TILES, GRID_SIZE
+
+# 地块类型编码
+TILE_LAND = 0
+TILE_WATER = 1
+
+
+class WaterMap:
+    """
+    水域地图类
+    用一个bytearray保存每个格子的地块类型（一个格子一个字节），
+    并通过地块类型直接索引移动耗时倍数表。
+    """
+
+    def __init__(self, grid_width, grid_height, lane_period=None, water_lanes=None):
+        """
+        初始化水域地图
+
+        参数:
+            grid_width: 世界宽度（格子数）
+            grid_height: 世界高度（格子数）
+            lane_period: 泳道周期（行数），如果为None则使用配置中的值
+            water_lanes: 每个周期内属于水域的行号，如果为None则使用配置中的值
+        """
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.lane_period = lane_period or WATER_TILES["lane_period"]
+        self.water_lanes = tuple(water_lanes if water_lanes is not None else WATER_TILES["water_lanes"])
+
+        # 移动耗时倍数表，按地块类型编码索引
+        self.move_costs = (1.0, WATER_TILES["move_cost"])
+
+        # 地块数据，按行优先存储
+        self.tiles = bytearray(grid_width * grid_height)
+        self._generate()
+
+    def _generate(self):
+        """生成泳道式的水域（类似植物大战僵尸泳池的中间两路）"""
+        water_row = bytes([TILE_WATER]) * self.grid_width
+        for y in range(self.grid_height):
+            if y % self.lane_period in self.water_lanes:
+                start = y * self.grid_width
+                self.tiles[start:start + self.grid_width] = water_row
+
+    def tile_at(self, cell):
+        """
+        获取格子的地块类型
+
+        参数:
+            cell: 网格坐标 (x, y)
+
+        返回:
+            int: 地块类型编码
+        """
+        return self.tiles[cell[1] * self.grid_width + cell[0]]
+
+    def is_water(self, cell):
+        """
+        检查格子是否是水域
+
+        参数:
+            cell: 网格坐标 (x, y)
+
+        返回:
+            bool: 是否是水域
+        """
+        return self.tile_at(cell) == TILE_WATER
+
+    def move_cost(self, cell):
+        """
+        获取在格子上移动的耗时倍数
+
+        参数:
+            cell: 网格坐标 (x, y)
+
+        返回:
+            float: 耗时倍数，大于1表示移动更慢
+        """
+        return self.move_costs[self.tiles[cell[1] * self.grid_width + cell[0]]]
+
+
+class RippleOverlay:
+    """
+    水波纹覆盖层类
+    把一段水域行（ripple_tile个格子宽）上的波纹按动画相位预渲染成若干帧，
+    绘制时每个可见的水域行只需按覆盖层宽度分段blit几次，不再逐格绘制。
+    """
+
+    def __init__(self, water_map, seed=0, grid_size=GRID_SIZE, tile_width=None, frames=None):
+        """
+        初始化水波纹覆盖层
+
+        参数:
+            water_map: 水域地图
+            seed: 决定波纹位置的随机种子（通常与背景装饰相同）
+            grid_size: 格子大小（像素）
+            tile_width: 覆盖层宽度（格子数），如果为None则使用配置中的值
+            frames: 动画帧数，如果为None则使用配置中的值
+        """
+        self.water_map = water_map
+        self.grid_size = grid_size
+        self.tile_width = tile_width or WATER_TILES["ripple_tile"]
+        self.frame_count = frames or WATER_TILES["ripple_frames"]
+        self.frames = {}  # 预渲染的覆盖层 {泳道内的行号: [每一帧的Surface]}
+        self.set_seed(seed)
+
+    def set_seed(self, seed):
+        """
+        按新的种子重新渲染覆盖层（读档后背景种子改变时调用）
+
+        参数:
+            seed: 随机种子
+        """
+        self.seed = seed
+        self.frames = {
+            lane: [self._render_frame(lane, seed, frame) for frame in range(self.frame_count)]
+            for lane in self.water_map.water_lanes
+        }
+
+    def _render_frame(self, lane, seed, frame):
+        """
+        渲染一行覆盖层的一帧
+
+        参数:
+            lane: 泳道内的行号
+            seed: 随机种子
+            frame: 帧序号
+
+        返回:
+            pygame.Surface: 覆盖层图像（黑色为透明色）
+        """
+        grid_size = self.grid_size
+        size = grid_size // 2
+        offset = (grid_size - size) // 2
+        phase = frame * 2 * math.pi / self.frame_count
+
+        surface = pygame.Surface((self.tile_width * grid_size, grid_size))
+        surface.fill((0, 0, 0))
+        surface.set_colorkey((0, 0, 0))
+        for x in range(self.tile_width):
+            # 用格子坐标决定是否有水波纹，保证位置稳定不闪烁
+            if (x + lane) % 3 != 0 or (x * 7919 + lane * 104729 + seed) % 4 != 0:
+                continue
+            radius = max(1, round(3 + math.sin(phase + (x + lane) * 0.1) * 2))
+            center = (x * grid_size + offset + size // 2, offset + size // 2)
+            pygame.draw.circle(surface, (170, 215, 255), center, radius, 1)
+        return surface.convert()
+
+    def draw(self, surface, camera, animation_time):
+        """
+        绘制可见的水波纹
+
+        参数:
+            surface: 渲染目标表面
+            camera: 摄像机
+            animation_time: 动画时间（秒）
+        """
+        water_map = self.water_map
+        grid_size = self.grid_size
+        tile_width = self.tile_width
+        frame = int(animation_time * 2 / (2 * math.pi) * self.frame_count) % self.frame_count
+
+        columns = camera.visible_columns()
+        for y in camera.visible_rows():
+            frames = self.frames.get(y % water_map.lane_period)
+            if frames is None:
+                continue
+            overlay = frames[frame]
+
+            # 可见的列是连续的（在世界边缘折回），按覆盖层的重复宽度分段
+            index = 0
+            while index < len(columns):
+                x = columns[index]
+                count = min(tile_width - x % tile_width, water_map.grid_width - x, len(columns) - index)
+                area = pygame.Rect((x % tile_width) * grid_size, 0, count * grid_size, grid_size)
+                surface.blit(overlay, camera.world_to_screen((x, y)), area)
+                index += count
@@ -3,6 +3,7 @@
 负责管理游戏的主循环、场景切换和资源加载
 """
 
+import os
 import sys
 import pygame
 import time
@@ -10,6 +11,10 @@ from utils.resource_loader import ResourceLoader
 from utils.font_manager import FontManager, init_font_manager
 from scenes.scene_manager import SceneManager
 from ui.ui_manager import UIManager
+from utils.compositor import Compositor
+from utils.autosave import AutosaveWriter
+from utils.leaderboard import Leaderboard
+from utils.save_state import decode_state
 import config  # 导入配置模块
 
 class GameEngine:
@@ -22,7 +27,8 @@ class GameEngine:
         """初始化游戏引擎"""
         print("正在启动植物大战僵尸风格贪吃蛇游戏...")
         
-        # 初始化pygame
+        # 初始化pygame（混音器参数必须在pygame.init之前设置）
+        pygame.mixer.pre_init(**config.AUDIO["mixer"])
         pygame.init()
         print("Pygame已初始化")
         
@@ -43,6 +49,13 @@ class GameEngine:
         # 游戏设置
         self.settings = config.DEFAULT_SETTINGS.copy()
         
+        # 自动存档写入器（后台线程）
+        self.autosave = AutosaveWriter(os.path.join(config.SAVES_DIR, config.AUTOSAVE["filename"]))
+        
+        # 排行榜（后台线程批量写入）
+        os.makedirs(config.SAVES_DIR, exist_ok=True)
+        self.leaderboard = Leaderboard(os.path.join(config.SAVES_DIR, config.LEADERBOARD["filename"]))
+        
         # 加载资源
         self.resource_loader = ResourceLoader()
         self.resource_loader.set_game_engine(self)  # 设置游戏引擎引用
@@ -56,6 +69,12 @@ class GameEngine:
         # 初始化场景管理器
         self.scene_manager = SceneManager(self)
         
+        # 初始化画面合成器：场景层在下，UI层在上
+        # 暂停等模态期间场景层被冻结为快照，UI层仍然实时绘制
+        self.compositor = Compositor(self.window)
+        self.compositor.add_layer("scene", self.scene_manager.render)
+        self.compositor.add_layer("ui", self.ui_manager.render, freeze_when_modal=False)
+        
         # 加载音乐和音效
         self.resource_loader.load_sounds()
         
@@ -67,9 +86,9 @@ class GameEngine:
         
         try:
             while self.running:
-                # 计算时间增量
+                # 计算时间增量（限制上限，避免空闲或暂停后画面跳变）
                 current_time = time.time()
-                delta_time = current_time - last_time
+                delta_time = min(current_time - last_time, config.MAX_DELTA_TIME)
                 last_time = current_time
                 
                 # 处理事件
@@ -79,11 +98,17 @@ class GameEngine:
                 if not self.paused:
                     self.update(delta_time)
                 
+                # 恢复被压低的背景音乐（暂停时也要恢复）
+                self.resource_loader.audio.update()
+                
                 # 渲染游戏
                 self.render()
                 
-                # 控制帧率
-                self.clock.tick(config.FPS)
+                # 控制帧率：有动画时全帧率，否则等待输入或降到空闲帧率
+                if self.is_animating():
+                    self.clock.tick(config.FPS)
+                else:
+                    self.wait_idle()
         
         except Exception as e:
             print(f"游戏运行出错: {e}")
@@ -108,6 +133,34 @@ class GameEngine:
             print("按回车键退出...")
             input()
     
+    def is_animating(self):
+        """
+        当前画面是否需要全帧率刷新
+        
+        返回:
+            bool: 是否需要全帧率刷新
+        """
+        return not self.paused and self.scene_manager.is_animating()
+    
+    def wait_idle(self):
+        """
+        空闲等待：阻塞直到有输入事件或到达空闲帧间隔
+        收到的事件会放回事件队列，下一帧立即以全帧率处理
+        """
+        timeout = int(1000 / config.IDLE_FPS) if config.IDLE_FPS > 0 else 0
+        
+        # 背景音乐被压低时最晚在恢复时间醒来
+        duck_until = self.resource_loader.audio.duck_until
+        if duck_until:
+            remaining = max(int((duck_until - time.perf_counter()) * 1000) + 1, 1)
+            timeout = min(timeout, remaining) if timeout else remaining
+        event = pygame.event.wait(timeout)
+        if event.type != pygame.NOEVENT:
+            pygame.event.post(event)
+        
+        # 重置时钟，避免下一次tick把空闲时间算进去
+        self.clock.tick()
+    
     def handle_events(self):
         """处理游戏事件"""
         for event in pygame.event.get():
@@ -116,6 +169,11 @@ class GameEngine:
                 self.running = False
                 return
             
+            # 窗口被遮挡后重新显示，下一帧需要全部重绘
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.compositor.invalidate()
+                continue
+            
             # 按键事件
             if event.type == pygame.KEYDOWN:
                 # ESC键暂停/继续游戏
@@ -144,22 +202,26 @@ class GameEngine:
     
     def render(self):
         """渲染游戏"""
-        # 清空屏幕
-        self.window.fill((0, 0, 0))
+        # 收集场景和UI的变化区域（场景为None时整个画面都要重绘）
+        dirty_rects = self.scene_manager.take_dirty_rects()
+        ui_rects = self.ui_manager.take_dirty_rects()
+        if dirty_rects is not None:
+            dirty_rects = dirty_rects + ui_rects
         
-        # 渲染当前场景
-        self.scene_manager.render(self.window)
+        # 按图层合成画面（场景层、UI层、模态覆盖层）
+        dirty_rects = self.compositor.render(dirty_rects)
         
-        # 渲染UI
-        self.ui_manager.render(self.window)
-        
-        # 更新显示
-        pygame.display.flip()
+        # 更新显示：全部重绘时刷新整个屏幕，否则只更新变化的区域，没有变化时不更新
+        if dirty_rects is None:
+            pygame.display.flip()
+        elif dirty_rects:
+            pygame.display.update(dirty_rects)
     
     def toggle_pause(self):
         """切换游戏暂停状态"""
         self.paused = not self.paused
         self.ui_manager.on_pause_changed(self.paused)
+        self.scene_manager.on_pause_changed(self.paused)
     
     def change_scene(self, scene_name, **kwargs):
         """
@@ -169,10 +231,14 @@ class GameEngine:
             scene_name: 场景名称
             **kwargs: 传递给场景的参数
         """
+        # 切换场景时结束暂停，移除暂停覆盖层
+        if self.paused:
+            self.paused = False
+            self.compositor.clear_modal()
+        
         # 清除UI管理器的活动按钮，避免UI元素重叠
         if scene_name == "game":
-            self.ui_manager.active_buttons = []
-            self.ui_manager.active_group = None
+            self.ui_manager.clear_active_group()
         elif scene_name == "menu":
             self.ui_manager.set_active_group("main_menu")
         elif scene_name == "game_over":
@@ -183,8 +249,46 @@ class GameEngine:
     
     def cleanup(self):
         """清理游戏资源"""
+        # 写完尚未落盘的自动存档和排行榜成绩
+        self.autosave.stop()
+        self.leaderboard.close()
         pygame.quit()
     
+    def resume_autosave(self):
+        """
+        如果有自动存档，直接恢复到存档时的游戏
+        
+        返回:
+            bool: 是否恢复了存档
+        """
+        if not config.AUTOSAVE["enabled"]:
+            return False
+        
+        data = self.autosave.load()
+        if data is None:
+            return False
+        
+        try:
+            state = decode_state(data)
+        except ValueError as e:
+            print(f"自动存档无法恢复: {e}")
+            return False
+        if state.scene_type not in config.SCENES:
+            print(f"自动存档无法恢复: 未知场景 {state.scene_type}")
+            return False
+        if state.difficulty not in config.DIFFICULTY_LEVELS:
+            print(f"自动存档无法恢复: 未知难度 {state.difficulty}")
+            return False
+        
+        # 存档的场景、难度和世界大小决定了游戏场景的创建方式（难度也决定排行榜记录在哪一栏）
+        self.set_setting("difficulty", state.difficulty)
+        self.settings["scene"] = state.scene_type
+        self.settings["world_width"] = state.world_width
+        self.settings["world_height"] = state.world_height
+        self.change_scene("game", state=state)
+        print("已恢复自动存档")
+        return True
+    
     def restart(self):
         """重新开始游戏"""
         self.change_scene("game")
@@ -205,6 +309,8 @@ class GameEngine:
             self.resource_loader.set_music_volume(value)
         elif key == "sfx_volume":
             self.resource_loader.set_sfx_volume(value)
+        elif key == "difficulty":
+            self.ui_manager.on_difficulty_changed()
     
     def get_setting(self, key, default=None):
         """
@@ -223,8 +329,9 @@ def main():
     """游戏入口函数"""
     game = GameEngine()
     
-    # 启动场景管理器，进入主菜单场景
-    game.scene_manager.start()
+    # 有自动存档时恢复上次的游戏，否则进入主菜单场景
+    if not game.resume_autosave():
+        game.scene_manager.start()
     
     # 开始游戏主循环
     game.main_loop()
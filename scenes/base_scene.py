@@ -58,6 +58,31 @@ class Scene:
         """
         return False
     
+    def is_animating(self):
+        """
+        场景当前是否有需要全帧率刷新的动画
+        
+        返回False时游戏引擎会降到空闲帧率，等待输入再恢复全帧率，
+        所以画面静止或只有缓慢的装饰性动画（如浮动的阳光，空闲帧率下每帧
+        最多移动1像素）的场景应当返回False以节省CPU。
+        
+        返回:
+            bool: 是否需要全帧率刷新
+        """
+        return True
+    
+    def take_dirty_rects(self):
+        """
+        取出上次刷新后需要重绘的区域
+        
+        只有能判断自己哪些区域发生了变化的场景才需要覆盖这个方法，
+        返回空列表表示画面没有变化，这一帧不需要重绘。
+        
+        返回:
+            list: 屏幕区域列表，None表示需要重绘整个画面
+        """
+        return None
+    
     def on_pause_changed(self, paused):
         """
         游戏暂停状态变化时调用
@@ -9,7 +9,7 @@ import math
 from scenes.base_scene import Scene
 from config import (
     WINDOW_WIDTH, WINDOW_HEIGHT, BLACK, WHITE, 
-    PVZ_GREEN, PVZ_DARK_GREEN, PVZ_CHERRY_RED
+    PVZ_GREEN, PVZ_DARK_GREEN, PVZ_CHERRY_RED, PVZ_SUN_YELLOW, DEFAULT_SETTINGS
 )
 from ui.buttons import Button, WoodButton
 
@@ -23,8 +23,14 @@ class GameOverScene(Scene):
         """初始化游戏结束场景"""
         super().__init__(game_engine)
         
-        # 分数
+        # 分数和难度
         self.score = 0
+        self.difficulty = DEFAULT_SETTINGS["difficulty"]
+        
+        # 排行榜摘要（后台线程查询完成后由回调写入pending，update中取出后重新合成画面）
+        self.leaderboard_summary = None
+        self._pending_summary = None
+        self._summary_request = 0
         
         # 按钮状态
         self.buttons = {
@@ -46,14 +52,28 @@ class GameOverScene(Scene):
         self.animation_time = 0
         self.crack_positions = []
         
+        # 预渲染缓存
+        self.composed_surface = None  # 背景、坟墓和分数文本（每次进入场景时合成一次）
+        self.button_sprites = {}  # 按钮图像 {button_name: {state: Surface}}
+        self.dirty_rects = []  # 上次刷新屏幕后状态发生变化的区域
+        
     def enter(self, **kwargs):
         """
         进入游戏结束场景
         
         参数:
             score (int): 游戏得分
+            difficulty (str): 这局游戏的难度（与排行榜记录一致），如果没有则使用当前设置
         """
         self.score = kwargs.get('score', 0)
+        self.difficulty = kwargs.get('difficulty') or self.game_engine.settings.get(
+            "difficulty", DEFAULT_SETTINGS["difficulty"]
+        )
+        
+        # 异步查询排行榜，结果到达前不显示排名
+        self.leaderboard_summary = None
+        self._pending_summary = None
+        self._request_leaderboard_summary()
         
         # 生成坟墓裂纹位置
         self.crack_positions = []
@@ -65,26 +85,91 @@ class GameOverScene(Scene):
                 'angle': random.randint(0, 360)
             })
         
+        # 合成静态画面（坟墓、裂纹、骷髅和分数只绘制这一次）
+        self._compose()
+        
+        # 按钮图像与分数无关，只需创建一次
+        if not self.button_sprites:
+            self._create_button_sprites()
+        
         # 播放游戏结束音效
         try:
             self.resource_loader.play_sound("game_over")
         except:
             pass
     
+    def _request_leaderboard_summary(self):
+        """向排行榜请求本局成绩的摘要（不等待结果）"""
+        self._summary_request += 1
+        request = self._summary_request
+        
+        def on_summary(summary):
+            # 在排行榜线程中调用，只保存结果；过期请求的结果直接丢弃
+            if request == self._summary_request:
+                self._pending_summary = summary
+                # 唤醒空闲等待，让摘要尽快显示出来
+                pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+        
+        settings = self.game_engine.settings
+        self.game_engine.leaderboard.request_summary(
+            settings.get("player_name", "玩家"),
+            self.score,
+            self.difficulty,
+            settings.get("scene", "day"),
+            on_summary
+        )
+    
+    def _compose(self):
+        """把背景、坟墓和分数文本合成到一张缓存图像上"""
+        self.composed_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        
+        # 半透明黑色背景叠加在清空的黑色画面上，结果就是纯黑
+        self.composed_surface.fill(BLACK)
+        
+        # 绘制坟墓和游戏结束文本
+        self._draw_grave(self.composed_surface)
+        
+        # 整个画面都需要重绘
+        self.dirty_rects = [self.composed_surface.get_rect()]
+    
+    def _create_button_sprites(self):
+        """预渲染每个按钮在各个状态下的图像"""
+        self.button_sprites = {}
+        for button_name, button in self.buttons.items():
+            sprites = {}
+            for state in ('normal', 'hover', 'active'):
+                sprite = pygame.Surface(button['rect'].size, pygame.SRCALPHA)
+                self._draw_button(sprite, button_name, button['text'], sprite.get_rect(), state)
+                sprites[state] = sprite
+            self.button_sprites[button_name] = sprites
+    
+    def _set_button_state(self, button, key, value):
+        """
+        修改按钮状态，状态变化时记录需要重绘的区域
+        
+        参数:
+            button: 按钮状态字典
+            key: 状态键，'hover'或'active'
+            value: 新的状态值
+        """
+        if button[key] != value:
+            button[key] = value
+            self.dirty_rects.append(button['rect'])
+    
     def handle_event(self, event):
         """处理事件"""
         if event.type == pygame.MOUSEMOTION:
             # 鼠标移动，检查按钮悬停状态
             mouse_pos = pygame.mouse.get_pos()
             for button in self.buttons.values():
-                button['hover'] = button['rect'].collidepoint(mouse_pos)
+                self._set_button_state(button, 'hover', button['rect'].collidepoint(mouse_pos))
         
         elif event.type == pygame.MOUSEBUTTONDOWN:
             # 鼠标点击
             mouse_pos = pygame.mouse.get_pos()
             for button_name, button in self.buttons.items():
                 if button['rect'].collidepoint(mouse_pos):
-                    button['active'] = True
+                    self._set_button_state(button, 'active', True)
                     
                     # 播放点击音效
                     try:
@@ -103,7 +188,7 @@ class GameOverScene(Scene):
                     elif button_name == 'quit':
                         self.game_engine.running = False
                 
-                button['active'] = False
+                self._set_button_state(button, 'active', False)
         
         elif event.type == pygame.KEYDOWN:
             # 键盘事件
@@ -118,23 +203,41 @@ class GameOverScene(Scene):
         """更新场景"""
         # 更新动画时间
         self.animation_time += delta_time
+        
+        # 排行榜摘要到达后重新合成画面
+        summary = self._pending_summary
+        if summary is not None:
+            self._pending_summary = None
+            self.leaderboard_summary = summary
+            self._compose()
+    
+    def is_animating(self):
+        """画面是静态的，按钮状态变化由事件驱动"""
+        return False
+    
+    def take_dirty_rects(self):
+        """
+        取出上次刷新后状态发生变化的区域
+        
+        返回:
+            list: 屏幕区域列表
+        """
+        rects = self.dirty_rects
+        self.dirty_rects = []
+        return rects
     
     def render(self, surface):
         """渲染场景"""
-        # 绘制半透明的黑色背景
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill(BLACK)
-        surface.blit(overlay, (0, 0))
-        
-        # 绘制坟墓和游戏结束文本
-        self._draw_grave(surface)
+        # 绘制预先合成的背景、坟墓和分数
+        if self.composed_surface is None:
+            self._compose()
+        surface.blit(self.composed_surface, (0, 0))
         
         # 绘制按钮
         self._draw_buttons(surface)
     
     def _draw_grave(self, surface):
-        """绘制PvZ风格的坟墓"""
+        """绘制PvZ风格的坟墓（只在合成静态画面时调用）"""
         # 坟墓尺寸和位置
         grave_width = 240
         grave_height = 300
@@ -212,33 +315,67 @@ class GameOverScene(Scene):
         )
         score_rect = score_text.get_rect(center=(WINDOW_WIDTH // 2, grave_y + 180))
         surface.blit(score_text, score_rect)
+        
+        # 绘制排行榜摘要
+        if self.leaderboard_summary:
+            best = self.leaderboard_summary["best"] or 0
+            percentile = self.leaderboard_summary["percentile"]
+            rank_text = self.font_manager.render_text(
+                f"最高纪录: {best}  超过{percentile:.0f}%的成绩",
+                self.font_manager.small_font,
+                PVZ_SUN_YELLOW
+            )
+            rank_rect = rank_text.get_rect(center=(WINDOW_WIDTH // 2, grave_y + 215))
+            surface.blit(rank_text, rank_rect)
     
     def _draw_buttons(self, surface):
         """绘制按钮"""
+        if not self.button_sprites:
+            self._create_button_sprites()
+        
         for button_name, button in self.buttons.items():
-            # 根据按钮状态选择颜色
             if button['active']:
-                # 按下状态
-                color = (0, 100, 0) if button_name == 'restart' else (100, 0, 0)
-                border_color = (0, 60, 0) if button_name == 'restart' else (60, 0, 0)
+                state = 'active'
             elif button['hover']:
-                # 悬停状态
-                color = (0, 140, 0) if button_name == 'restart' else (140, 0, 0)
-                border_color = (0, 100, 0) if button_name == 'restart' else (100, 0, 0)
+                state = 'hover'
             else:
-                # 正常状态
-                color = PVZ_GREEN if button_name == 'restart' else PVZ_CHERRY_RED
-                border_color = PVZ_DARK_GREEN if button_name == 'restart' else (150, 0, 0)
-            
-            # 绘制按钮
-            pygame.draw.rect(surface, color, button['rect'], border_radius=10)
-            pygame.draw.rect(surface, border_color, button['rect'], 3, border_radius=10)
-            
-            # 绘制按钮文本
-            text = self.font_manager.render_text(
-                button['text'], 
-                self.font_manager.medium_font, 
-                WHITE
-            )
-            text_rect = text.get_rect(center=button['rect'].center)
-            surface.blit(text, text_rect) 
\ No newline at end of file
+                state = 'normal'
+            surface.blit(self.button_sprites[button_name][state], button['rect'])
+    
+    def _draw_button(self, surface, button_name, text, rect, state):
+        """
+        绘制一个按钮（只在预渲染按钮图像时调用）
+        
+        参数:
+            surface: 渲染目标表面
+            button_name: 按钮名称
+            text: 按钮文本
+            rect: 按钮矩形
+            state: 按钮状态，'normal'、'hover'或'active'
+        """
+        # 根据按钮状态选择颜色
+        if state == 'active':
+            # 按下状态
+            color = (0, 100, 0) if button_name == 'restart' else (100, 0, 0)
+            border_color = (0, 60, 0) if button_name == 'restart' else (60, 0, 0)
+        elif state == 'hover':
+            # 悬停状态
+            color = (0, 140, 0) if button_name == 'restart' else (140, 0, 0)
+            border_color = (0, 100, 0) if button_name == 'restart' else (100, 0, 0)
+        else:
+            # 正常状态
+            color = PVZ_GREEN if button_name == 'restart' else PVZ_CHERRY_RED
+            border_color = PVZ_DARK_GREEN if button_name == 'restart' else (150, 0, 0)
+        
+        # 绘制按钮
+        pygame.draw.rect(surface, color, rect, border_radius=10)
+        pygame.draw.rect(surface, border_color, rect, 3, border_radius=10)
+        
+        # 绘制按钮文本
+        text_surface = self.font_manager.render_text(
+            text, 
+            self.font_manager.medium_font, 
+            WHITE
+        )
+        text_rect = text_surface.get_rect(center=rect.center)
+        surface.blit(text_surface, text_rect)
@@ -6,16 +6,40 @@
 import pygame
 import random
 import math
+from collections import Counter
 from scenes.base_scene import Scene
 from entities.snake import Snake
 from entities.food import FoodManager
-from entities.obstacle import ObstacleManager
+from entities.obstacle import ObstacleManager, ZombieObstacle
+from entities.water import WaterMap, RippleOverlay
+from entities.particles import ParticleSystem
+from utils.camera import Camera
+from utils.background_cache import BackgroundChunkCache
+from utils.lighting import LightingLayer
+from utils.input_queue import InputQueue
+from utils.occupancy import OccupancyGrid, PLAYER_OWNER
+from utils.event_bus import EventBus, FoodEaten, AbilityStarted, AbilityEnded, Collision, ZombieSpawned, GameOver
+from utils.save_state import capture_state, encode_state, decode_state, apply_state, encode_replay
 from config import (
-    GRID_WIDTH, GRID_HEIGHT, GRID_SIZE, GAME_SPEED, SCENES,
+    GRID_SIZE, GAME_SPEED, SIMULATION_RATE, SCENES, WORLD_WIDTH, WORLD_HEIGHT, LIGHTING, FOOD_TYPES, AUTOSAVE, EVENT_SOUNDS,
     PVZ_GREEN, PVZ_LIGHT_GREEN, PVZ_SKY_BLUE, PVZ_SUN_YELLOW, WHITE, BACKGROUNDS_IMAGES_DIR,
     UP, DOWN, LEFT, RIGHT  # 添加方向常量的导入
 )
 
+# 方向键对应的移动方向
+DIRECTION_KEYS = {
+    pygame.K_UP: UP,
+    pygame.K_DOWN: DOWN,
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT
+}
+
+# 特殊能力（食物效果名）对应的蛇状态属性
+ABILITY_FLAGS = {
+    "shield": "shield_active",
+    "speed_up": "speed_boost_active"
+}
+
 class GameScene(Scene):
     """
     游戏场景类
@@ -31,10 +55,56 @@ class GameScene(Scene):
         self.food_manager = None
         self.obstacle_manager = None
         
+        # 世界大小和摄像机（世界可以大于窗口）
+        self.world_width = WORLD_WIDTH
+        self.world_height = WORLD_HEIGHT
+        self.camera = None
+        
+        # 背景区块缓存
+        self.background_cache = None
+        
+        # 光照层（仅夜晚场景使用）
+        self.lighting = None
+        
+        # 水域地图和水波纹覆盖层（仅泳池场景使用）
+        self.water_map = None
+        self.ripples = None
+        
         # 游戏状态
         self.score = 0
         self.move_timer = 0
         self.game_over = False
+        self.game_over_timer = 0  # 游戏结束后播放爆炸特效的计时器
+        self.game_over_delay = 1.0  # 游戏结束后多久切换到结束场景（秒）
+        
+        # 方向指令队列，以及已执行指令的记录 [(move_tick, InputCommand)]，供回放和联机使用
+        self.input_queue = InputQueue()
+        self.input_log = []
+        self.move_tick = 0  # 蛇已移动的步数
+        
+        # 固定步长模拟：帧时间累积到一步再推进，生成和移动只使用本局的随机数生成器，
+        # 所以开局状态加上每步执行的方向指令就能重现整局游戏
+        self.step_interval = 1.0 / SIMULATION_RATE
+        self.step_accumulator = 0
+        self.rng = random.Random()
+        
+        # 自动存档计时器
+        self.autosave_timer = 0
+        
+        # 开局状态快照，和input_log一起作为回放附在排行榜成绩上
+        self.initial_state = None
+        
+        # 粒子特效（预分配，多局之间复用）
+        self.particles = ParticleSystem()
+        
+        # 游戏事件总线：模拟中只记录事件，每帧结束后由音效、特效和界面批量处理
+        self.events = EventBus()
+        self.hud_abilities = set()  # 界面上显示为激活的特殊能力
+        self.events.subscribe("audio", self._play_event_sounds, [FoodEaten, AbilityStarted, ZombieSpawned, GameOver])
+        self.events.subscribe("particles", self._emit_event_particles, [FoodEaten, GameOver])
+        self.events.subscribe("hud", self._update_hud_abilities, [AbilityStarted, AbilityEnded])
+        self.events.subscribe("stats", self._record_stats)
+        self.stats = Counter()  # 本局的事件数量 {事件类型（碰撞按原因细分）: 数量}
         
         # 食物生成计时器
         self.food_spawn_timer = 0
@@ -56,28 +126,81 @@ class GameScene(Scene):
         进入游戏场景
         
         参数:
-            **kwargs: 可选参数
+            **kwargs: 可选参数，state为要恢复的GameState状态快照（恢复自动存档时使用）
         """
         # 重置游戏状态
         self.score = 0
         self.move_timer = 0
         self.game_over = False
+        self.game_over_timer = 0
         self.animation_time = 0
+        self.particles.clear()
+        self.events.clear()
+        self.hud_abilities.clear()
+        self.stats.clear()
+        self.input_queue.clear()
+        self.input_log = []
+        self.move_tick = 0
+        self.step_accumulator = 0
+        self.rng = random.Random()
+        self.autosave_timer = 0
         
         # 清除UI管理器的活动按钮
-        self.ui_manager.active_buttons = []
-        self.ui_manager.active_group = None
+        self.ui_manager.clear_active_group()
         
-        # 创建蛇
-        self.snake = Snake(self.game_engine)
+        # 读取场景设置
+        self.scene_type = self.game_engine.settings.get("scene", "day")
+        self.scene_config = SCENES[self.scene_type]
+        
+        # 读取世界大小并创建摄像机
+        self.world_width = self.game_engine.settings.get("world_width", WORLD_WIDTH)
+        self.world_height = self.game_engine.settings.get("world_height", WORLD_HEIGHT)
+        self.camera = Camera(
+            self.world_width, self.world_height,
+            self.window.get_width(), self.window.get_height()
+        )
+        
+        # 创建蛇，并放入占用网格（碰撞判定和生成食物、障碍物时避开蛇身都使用它）
+        self.snake = Snake(self.game_engine, self.world_width, self.world_height)
+        self.camera.follow(self.snake.positions[0])
+        self.occupancy = OccupancyGrid(self.world_width, self.world_height)
+        self.occupancy.add_snake(PLAYER_OWNER, self.snake.positions)
+        
+        # 泳池场景生成水域地图
+        if self.scene_config.get("special_rules") == "water_tiles":
+            self.water_map = WaterMap(self.world_width, self.world_height)
+        else:
+            self.water_map = None
+        
+        # 创建背景区块缓存（每局重新生成装饰，水面也一并烘焙进去）
+        self.background_cache = BackgroundChunkCache(
+            self.world_width, self.world_height,
+            self.scene_type, self.scene_config,
+            water_map=self.water_map
+        )
+        
+        # 水波纹覆盖层（位置与背景装饰使用同一个种子）
+        if self.water_map:
+            self.ripples = RippleOverlay(self.water_map, self.background_cache.seed)
+        else:
+            self.ripples = None
+        
+        # 夜晚场景视野受限，创建光照层
+        if self.scene_config.get("special_rules") == "reduced_visibility":
+            self.lighting = LightingLayer(self.window.get_width(), self.window.get_height())
+        else:
+            self.lighting = None
         
         # 创建食物管理器
         self.food_manager = FoodManager(self.game_engine)
-        self.food_manager.set_grid_size(GRID_WIDTH, GRID_HEIGHT)
+        self.food_manager.set_grid_size(self.world_width, self.world_height)
         self.food_manager.load_images(self.resource_loader)
+        self.food_manager.rng = self.rng
         
         # 创建障碍物管理器
         self.obstacle_manager = ObstacleManager(self.game_engine)
+        self.obstacle_manager.set_grid_size(self.world_width, self.world_height)
+        self.obstacle_manager.rng = self.rng
         
         # 加载背景图像
         if self.use_background_image:
@@ -88,9 +211,15 @@ class GameScene(Scene):
                     directory=BACKGROUNDS_IMAGES_DIR
                 )
         
-        # 生成初始食物（生成3个食物，确保游戏开始时有足够的食物）
-        for _ in range(3):
-            self.food_manager.spawn_food(avoid_positions=self.snake.positions)
+        state = kwargs.get("state")
+        if state:
+            # 恢复存档
+            apply_state(self, state)
+        else:
+            # 生成初始食物（生成3个食物，确保游戏开始时有足够的食物）
+            for _ in range(3):
+                self.food_manager.spawn_food(avoid_positions=self.occupancy)
+        self.initial_state = capture_state(self)
         
         # 播放背景音乐
         self.resource_loader.play_music()
@@ -99,6 +228,9 @@ class GameScene(Scene):
         """离开游戏场景"""
         # 停止背景音乐
         self.resource_loader.stop_music()
+        
+        # 离开本局后不再需要恢复
+        self.game_engine.autosave.discard()
     
     def handle_event(self, event):
         """
@@ -108,15 +240,10 @@ class GameScene(Scene):
             event: Pygame事件对象
         """
         if event.type == pygame.KEYDOWN:
-            # 方向键控制
-            if event.key == pygame.K_UP:
-                self.snake.set_direction(UP)
-            elif event.key == pygame.K_DOWN:
-                self.snake.set_direction(DOWN)
-            elif event.key == pygame.K_LEFT:
-                self.snake.set_direction(LEFT)
-            elif event.key == pygame.K_RIGHT:
-                self.snake.set_direction(RIGHT)
+            # 方向键控制：加入指令队列，蛇移动时再逐个执行
+            direction = DIRECTION_KEYS.get(event.key)
+            if direction and not self.game_over:
+                self.input_queue.push(direction, self.snake.direction, self.animation_time)
     
     def update(self, delta_time):
         """
@@ -125,53 +252,101 @@ class GameScene(Scene):
         参数:
             delta_time: 时间增量
         """
+        # 更新动画时间
+        self.animation_time += delta_time
+        
+        # 更新粒子特效
+        self.particles.update(delta_time)
+        
+        # 游戏结束后等待爆炸特效播放完再切换场景
         if self.game_over:
+            self.game_over_timer += delta_time
+            if self.game_over_timer >= self.game_over_delay:
+                self._show_game_over_scene()
             return
         
-        # 更新动画时间
-        self.animation_time += delta_time
+        # 定期自动存档：这里只复制状态，编码和写盘在后台线程进行
+        if AUTOSAVE["enabled"]:
+            self.autosave_timer += delta_time
+            if self.autosave_timer >= AUTOSAVE["interval"]:
+                self.autosave_timer = 0
+                self.game_engine.autosave.submit(capture_state(self))
         
-        # 更新蛇的状态
+        # 更新蛇和食物的动画
         self.snake.update(delta_time)
-        
-        # 更新食物动画
         self.food_manager.update(delta_time)
         
+        # 按固定步长推进模拟
+        self.step_accumulator += delta_time
+        while self.step_accumulator >= self.step_interval and not self.game_over:
+            self.step_accumulator -= self.step_interval
+            self.simulate_step()
+        if self.game_over:
+            self.on_game_over()
+        
+        # 本帧产生的事件交给音效、特效和界面批量处理
+        self.events.dispatch()
+    
+    def simulate_step(self):
+        """推进一步模拟（不直接播放音效和特效，只记录事件；回放也逐步调用它）"""
+        delta_time = self.step_interval
+        
         # 更新障碍物
-        self.obstacle_manager.update(delta_time, self.snake.positions)
+        spawned = self.obstacle_manager.update(delta_time, self.occupancy, (self.snake.positions[0],))
+        if isinstance(spawned, ZombieObstacle):
+            self.events.emit(ZombieSpawned(spawned.position))
         
         # 食物生成计时器
         self.food_spawn_timer += delta_time
         
         # 确保场景中始终有足够的食物
-        if len(self.food_manager.foods) < self.min_food_count and self.food_spawn_timer >= 2.0:
+        if self.food_manager.count() < self.min_food_count and self.food_spawn_timer >= 2.0:
             self.food_spawn_timer = 0
-            self.food_manager.spawn_food(avoid_positions=self.snake.positions)
+            self.food_manager.spawn_food(avoid_positions=self.occupancy)
         
         # 蛇移动计时器
         self.move_timer += delta_time
         move_interval = 1.0 / (GAME_SPEED * self.snake.get_speed())
         
+        # 在水中移动更慢
+        if self.water_map:
+            move_interval *= self.water_map.move_cost(self.snake.positions[0])
+        
         if self.move_timer >= move_interval:
             self.move_timer = 0
             
-            # 移动蛇
-            if self.snake.move():
+            # 每步执行一个方向指令
+            command = self.input_queue.pop()
+            if command:
+                self.snake.set_direction(command.direction)
+                self.input_log.append((self.move_tick, command))
+            self.move_tick += 1
+            
+            # 先推进能力计时，再在占用网格上一次判定自身和障碍物碰撞（有护盾时可以穿过障碍物），然后移动蛇
+            active = self._active_abilities()
+            self.snake.tick_abilities()
+            for ability in active - self._active_abilities():
+                self.events.emit(AbilityEnded(PLAYER_OWNER, ability))
+            self.occupancy.set_obstacles(self.obstacle_manager.obstacles)
+            shielded = (PLAYER_OWNER,) if self.snake.shield_active else ()
+            if self.occupancy.step({PLAYER_OWNER: self.snake}, shielded):
                 self.game_over = True
-                self.on_game_over()
+                self._emit_collision()
                 return
+            self.snake.move()
+            
+            # 摄像机跟随蛇头
+            self.camera.follow(self.snake.positions[0])
             
             # 检查食物碰撞
             food = self.food_manager.check_collisions(self.snake.positions[0])
             if food:
                 # 应用食物效果
-                self.score += food.apply_effect(self.snake)
-                
-                # 播放音效
-                try:
-                    self.resource_loader.play_sound("eat_food")
-                except Exception as e:
-                    print(f"播放音效失败: {e}")
+                score = food.apply_effect(self.snake)
+                self.score += score
+                self.events.emit(FoodEaten(PLAYER_OWNER, food.food_type, food.grid_position, score))
+                if food.effect in ABILITY_FLAGS:
+                    self.events.emit(AbilityStarted(PLAYER_OWNER, food.effect))
                 
                 # 移除食物
                 self.food_manager.remove_food(food)
@@ -180,18 +355,110 @@ class GameScene(Scene):
                 self.snake.grow()
                 
                 # 立即生成新的食物
-                self.food_manager.spawn_food(avoid_positions=self.snake.positions)
-            
-            # 检查障碍物碰撞
+                self.food_manager.spawn_food(avoid_positions=self.occupancy)
+    
+    def _active_abilities(self):
+        """
+        获取蛇当前激活的特殊能力
+        
+        返回:
+            set: 特殊能力名称集合
+        """
+        return {ability for ability, flag in ABILITY_FLAGS.items() if getattr(self.snake, flag)}
+    
+    def _emit_collision(self):
+        """记录致命碰撞和游戏结束事件"""
+        cell, cause = self.occupancy.collisions[PLAYER_OWNER]
+        self.events.emit(Collision(PLAYER_OWNER, cell, cause))
+        self.events.emit(GameOver(self.score, len(self.snake.positions), self.snake.positions[0]))
+    
+    def sync_abilities(self):
+        """按蛇的当前状态重建界面上的特殊能力（读档或同步观战状态之后调用）"""
+        self.events.clear()
+        self.hud_abilities = self._active_abilities()
+    
+    def _play_event_sounds(self, events):
+        """
+        音效订阅者：同一帧内相同的音效只播放一次
+        
+        参数:
+            events: 本帧的事件列表
+        """
+        for sound_name in {EVENT_SOUNDS.get(type(event).__name__) for event in events}:
+            if sound_name is None:
+                continue
             try:
-                if self.obstacle_manager and self.obstacle_manager.check_collisions(self.snake):
-                    self.game_over = True
-                    self.on_game_over()
-                    return
+                self.resource_loader.play_sound(sound_name)
             except Exception as e:
-                print(f"检查障碍物碰撞时出错: {e}")
-                import traceback
-                traceback.print_exc()
+                print(f"播放音效失败: {e}")
+    
+    def _emit_event_particles(self, events):
+        """
+        粒子特效订阅者
+        
+        参数:
+            events: 本帧的事件列表
+        """
+        for event in events:
+            if isinstance(event, FoodEaten):
+                # 吃食物特效
+                food_color = FOOD_TYPES.get(event.food_type, {}).get("color")
+                self.particles.emit_at_cell(event.position, "eat_food", food_color)
+            else:
+                # 在蛇头位置播放爆炸特效，让玩家看到游戏结束状态
+                self.particles.emit_at_cell(event.position, "explosion")
+    
+    def _update_hud_abilities(self, events):
+        """
+        界面订阅者：更新特殊能力的显示状态
+        
+        参数:
+            events: 本帧的事件列表
+        """
+        for event in events:
+            if isinstance(event, AbilityStarted):
+                self.hud_abilities.add(event.ability)
+            else:
+                self.hud_abilities.discard(event.ability)
+    
+    def _record_stats(self, events):
+        """
+        统计订阅者：累计本局的事件数量（需要时读取self.stats，订阅者开销见events.report()）
+        
+        参数:
+            events: 本帧的事件列表
+        """
+        for event in events:
+            self.stats[type(event).__name__] += 1
+            if isinstance(event, Collision):
+                self.stats[f"Collision.{event.cause}"] += 1
+    
+    def save_state(self):
+        """
+        把当前游戏状态保存为二进制存档
+        
+        返回:
+            bytes: 二进制存档
+        """
+        return encode_state(capture_state(self))
+    
+    def load_state(self, data):
+        """
+        从二进制存档恢复游戏状态（场景类型和世界大小必须与当前一致）
+        
+        参数:
+            data: 二进制存档
+        """
+        apply_state(self, decode_state(data))
+    
+    def is_animating(self):
+        """
+        游戏进行中始终需要全帧率刷新（暂停时由游戏引擎降到空闲帧率）
+        
+        返回:
+            bool: 是否需要全帧率刷新
+        """
+        return True
     
     def render(self, surface):
         """
@@ -204,13 +471,20 @@ class GameScene(Scene):
         self._draw_background(surface)
         
         # 绘制食物
-        self.food_manager.draw(surface, GRID_SIZE)
+        self.food_manager.draw(surface, GRID_SIZE, self.camera)
         
         # 绘制障碍物
-        self.obstacle_manager.draw(surface)
+        self.obstacle_manager.draw(surface, self.camera)
         
         # 绘制蛇
-        self.snake.draw(surface)
+        self.snake.draw(surface, self.camera)
+        
+        # 绘制粒子特效
+        self.particles.draw(surface, self.camera)
+        
+        # 绘制光照（夜晚场景）
+        if self.lighting:
+            self._draw_lighting(surface)
         
         # 绘制分数
         self._draw_score(surface)
@@ -229,34 +503,48 @@ class GameScene(Scene):
             # 暂停背景音乐
             self.resource_loader.pause_music()
             
-            # 绘制暂停提示
-            pause_font = self.font_manager.large_font
-            pause_text = self.font_manager.render_text("游戏暂停", pause_font, WHITE)
-            pause_rect = pause_text.get_rect(center=(self.window.get_width() // 2, self.window.get_height() // 2))
-            
-            # 创建半透明背景
-            overlay = pygame.Surface((self.window.get_width(), self.window.get_height()), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 128))
-            self.window.blit(overlay, (0, 0))
-            
-            # 显示暂停文本
-            self.window.blit(pause_text, pause_rect)
-            pygame.display.update()
+            # 显示暂停覆盖层（游戏画面变暗并缓存，暂停期间每帧只需一次blit）
+            self.game_engine.compositor.set_modal(self._draw_pause_overlay)
         else:
             # 恢复背景音乐
             self.resource_loader.unpause_music()
+            
+            # 移除暂停覆盖层
+            self.game_engine.compositor.clear_modal()
+    
+    def _draw_pause_overlay(self, surface):
+        """
+        绘制暂停提示（只在进入暂停时绘制一次到快照上）
+        
+        参数:
+            surface: 渲染目标表面
+        """
+        pause_font = self.font_manager.large_font
+        pause_text = self.font_manager.render_text("游戏暂停", pause_font, WHITE)
+        pause_rect = pause_text.get_rect(center=(surface.get_width() // 2, surface.get_height() // 2))
+        surface.blit(pause_text, pause_rect)
     
     def on_game_over(self):
-        """处理游戏结束"""
+        """处理游戏结束（音效和爆炸特效由事件订阅者处理）"""
+        # 游戏已结束，删除自动存档
+        self.game_engine.autosave.discard()
+        
+        # 记录成绩（后台线程写入排行榜）
+        self.game_engine.leaderboard.submit(
+            self.game_engine.settings.get("player_name", "玩家"),
+            self.score,
+            self.obstacle_manager.difficulty,
+            self.scene_type,
+            len(self.snake.positions),
+            encode_replay(self.initial_state, self.input_log, self.move_tick)
+        )
+        
+        self.game_over_timer = 0
+    
+    def _show_game_over_scene(self):
+        """切换到游戏结束场景"""
         try:
-            # 播放游戏结束音效
-            self.resource_loader.play_sound("game_over")
-            
-            # 延迟一会儿，让玩家看到游戏结束状态
-            pygame.time.delay(1000)
-            
-            # 切换到游戏结束场景
-            self.game_engine.change_scene("game_over", score=self.score)
+            self.game_engine.change_scene("game_over", score=self.score, difficulty=self.obstacle_manager.difficulty)
         except Exception as e:
             print(f"处理游戏结束时出错: {e}")
             import traceback
@@ -284,43 +572,36 @@ class GameScene(Scene):
             background_color = self.scene_config["background"]
             surface.fill(background_color)
             
-            # 绘制草坪网格
-            grid_colors = self.scene_config["grid_colors"]
-            for y in range(GRID_HEIGHT):
-                for x in range(GRID_WIDTH):
-                    # 棋盘格草地样式
-                    color = grid_colors[0] if (x + y) % 2 == 0 else grid_colors[1]
-                    
-                    pygame.draw.rect(surface, color, pygame.Rect(
-                        x * GRID_SIZE, 
-                        y * GRID_SIZE, 
-                        GRID_SIZE, 
-                        GRID_SIZE
-                    ))
-                    
-                    # 添加场景特定的装饰
-                    if self.scene_type == "day" and random.random() < 0.05:
-                        # 白天场景添加小草
-                        grass_height = random.randint(2, 5)
-                        grass_width = 2
-                        grass_x = x * GRID_SIZE + random.randint(5, GRID_SIZE - 5)
-                        grass_y = y * GRID_SIZE + GRID_SIZE - grass_height
-                        pygame.draw.rect(surface, (58, 121, 39), pygame.Rect(
-                            grass_x, grass_y, grass_width, grass_height
-                        ))
-                    elif self.scene_type == "night" and random.random() < 0.02:
-                        # 夜晚场景添加星星
-                        star_x = x * GRID_SIZE + GRID_SIZE // 2
-                        star_y = y * GRID_SIZE + GRID_SIZE // 2
-                        star_radius = random.randint(1, 2)
-                        star_color = (255, 255, 200)
-                        pygame.draw.circle(surface, star_color, (star_x, star_y), star_radius)
-                    elif self.scene_type == "pool" and random.random() < 0.1 and (x + y) % 3 == 0:
-                        # 泳池场景添加水波纹
-                        ripple_x = x * GRID_SIZE + GRID_SIZE // 2
-                        ripple_y = y * GRID_SIZE + GRID_SIZE // 2
-                        ripple_radius = 3 + math.sin(self.animation_time * 2 + (x + y) * 0.1) * 2
-                        pygame.draw.circle(surface, (100, 150, 255, 100), (ripple_x, ripple_y), ripple_radius, 1)
+            # 绘制草坪（预渲染的背景区块，只绘制摄像机可见的部分）
+            self.background_cache.draw(surface, self.camera)
+            
+            # 泳池场景在水面上叠加水波纹（动画效果，每帧绘制）
+            if self.ripples:
+                self.ripples.draw(surface, self.camera, self.animation_time)
+    
+    def _draw_lighting(self, surface):
+        """
+        绘制夜晚场景的光照，只有蛇头和发光食物周围可见
+        
+        参数:
+            surface: 渲染目标表面
+        """
+        half = GRID_SIZE // 2
+        self.lighting.begin()
+        
+        # 蛇头光源
+        head_x, head_y = self.camera.world_to_screen(self.snake.positions[0])
+        self.lighting.add_light(head_x + half, head_y + half, LIGHTING["head_radius"])
+        
+        # 发光食物光源
+        glow_foods = LIGHTING["glow_foods"]
+        for food_type, position in self.food_manager.items():
+            radius = glow_foods.get(food_type)
+            if radius:
+                food_x, food_y = self.camera.world_to_screen(position)
+                self.lighting.add_light(food_x + half, food_y + half, radius)
+        
+        self.lighting.apply(surface)
     
     def _draw_score(self, surface):
         """
@@ -364,8 +645,9 @@ class GameScene(Scene):
         # 绘制护盾状态
         shield_x, shield_y = 40, abilities_bg.centery
         shield_radius = 15
-        shield_color = (100, 200, 255) if self.snake.shield_active else (100, 100, 100)
-        shield_text_color = WHITE if self.snake.shield_active else (150, 150, 150)
+        shield_active = "shield" in self.hud_abilities
+        shield_color = (100, 200, 255) if shield_active else (100, 100, 100)
+        shield_text_color = WHITE if shield_active else (150, 150, 150)
         
         # 绘制护盾图标
         pygame.draw.circle(surface, shield_color, (shield_x, shield_y), shield_radius, 2)
@@ -374,8 +656,9 @@ class GameScene(Scene):
         # 绘制速度状态
         speed_x, speed_y = 120, abilities_bg.centery
         speed_radius = 15
-        speed_color = (255, 200, 0) if self.snake.speed_boost_active else (100, 100, 100)
-        speed_text_color = WHITE if self.snake.speed_boost_active else (150, 150, 150)
+        speed_active = "speed_up" in self.hud_abilities
+        speed_color = (255, 200, 0) if speed_active else (100, 100, 100)
+        speed_text_color = WHITE if speed_active else (150, 150, 150)
         
         # 绘制速度图标
         for i in range(3):
@@ -8,7 +8,7 @@ import random
 import math
 from scenes.base_scene import Scene
 from config import (
-    WINDOW_WIDTH, WINDOW_HEIGHT, PVZ_GREEN, PVZ_DARK_GREEN, 
+    WINDOW_WIDTH, WINDOW_HEIGHT, BLACK, PVZ_GREEN, PVZ_DARK_GREEN, 
     PVZ_LIGHT_GREEN, PVZ_BROWN, PVZ_SKY_BLUE, PVZ_SUN_YELLOW, WHITE
 )
 from ui.buttons import Button, WoodButton, AnimatedButton
@@ -42,9 +42,17 @@ class MenuScene(Scene):
         
         # 版本信息
         self.version = "v2.0 PvZ风格"
+        
+        # 预渲染缓存（首次渲染时创建）
+        self.background_surface = None  # 草坪背景
+        self.foreground_surface = None  # 标题、说明和版本信息
+        self.sun_sprites = {}  # 阳光图像 {radius: Surface}
+        self.sun_rects = None  # 上次刷新时每个阳光在屏幕上的区域，None表示需要重绘整个画面
     
     def enter(self, **kwargs):
         """进入菜单场景"""
+        self.sun_rects = None
+        
         # 设置UI管理器的活动按钮组为主菜单
         self.ui_manager.set_active_group("main_menu")
         
@@ -83,28 +91,138 @@ class MenuScene(Scene):
             self.blink_timer = 0
             self.show_blink = not self.show_blink
     
+    def is_animating(self):
+        """菜单只有缓慢的浮动动画（空闲帧率下每帧最多移动1像素），空闲帧率下播放即可"""
+        return False
+    
+    def take_dirty_rects(self):
+        """
+        取出位置发生变化的阳光的新旧区域（标题、说明和背景不变，不需要重绘）
+        
+        返回:
+            list: 屏幕区域列表，None表示需要重绘整个画面
+        """
+        if self.background_surface is None:
+            return None
+        
+        previous = self.sun_rects
+        self.sun_rects = [self._sun_rect(sun) for sun in self.suns]
+        if previous is None:
+            return None
+        return [
+            rect
+            for old, new in zip(previous, self.sun_rects) if old != new
+            for rect in (old, new)
+        ]
+    
     def render(self, surface):
         """渲染菜单场景"""
+        # 静态内容只渲染一次
+        if self.background_surface is None:
+            self._create_static_surfaces()
+        
         # 绘制背景
-        self._draw_background(surface)
+        surface.blit(self.background_surface, (0, 0))
         
-        # 绘制标题
-        self._draw_title(surface)
+        # 绘制阳光装饰
+        self._draw_suns(surface)
+        
+        # 绘制标题、游戏说明和版本信息
+        surface.blit(self.foreground_surface, (0, 0))
+    
+    def _create_static_surfaces(self):
+        """预渲染菜单的静态背景和前景"""
+        # 草坪背景
+        self.background_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        self._draw_background(self.background_surface)
         
-        # 绘制游戏说明
-        self._draw_instructions(surface)
+        # 标题和说明（透明背景，叠加在阳光上方）
+        self.foreground_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+        self._draw_title(self.foreground_surface)
+        self._draw_instructions(self.foreground_surface)
         
-        # 绘制版本信息
+        # 版本信息
         version_text = self.font_manager.render_text(
             f"版本: {self.version}", 
             self.font_manager.small_font, 
             (150, 150, 150)
         )
         version_rect = version_text.get_rect(bottomright=(WINDOW_WIDTH - 10, WINDOW_HEIGHT - 10))
-        surface.blit(version_text, version_rect)
+        self.foreground_surface.blit(version_text, version_rect)
+        
+        # 阳光图像
+        self.sun_sprites = {}
+        for sun in self.suns:
+            if sun['radius'] not in self.sun_sprites:
+                self.sun_sprites[sun['radius']] = self._create_sun_sprite(sun['radius'])
+    
+    def _create_sun_sprite(self, radius):
+        """
+        预渲染一个PvZ风格的阳光（发光、主体和光芒）
+        
+        参数:
+            radius: 阳光半径
+            
+        返回:
+            pygame.Surface: 阳光图像，中心为阳光圆心
+        """
+        size = (radius + 6) * 2
+        center = size // 2
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        
+        # 外部发光效果
+        for i in range(3):
+            glow_radius = radius + (3-i)*2
+            glow_alpha = 100 - i*30
+            glow_surface = pygame.Surface((glow_radius*2, glow_radius*2), pygame.SRCALPHA)
+            pygame.draw.circle(glow_surface, (255, 255, 0, glow_alpha), 
+                            (glow_radius, glow_radius), glow_radius)
+            sprite.blit(glow_surface, (center - glow_radius, center - glow_radius))
+        
+        # 主体阳光
+        pygame.draw.circle(sprite, PVZ_SUN_YELLOW, (center, center), radius)
+        
+        # 添加阳光光芒细节
+        ray_length = radius + 4
+        for angle in range(0, 360, 45):
+            rad_angle = math.radians(angle)
+            end_x = center + math.cos(rad_angle) * ray_length
+            end_y = center + math.sin(rad_angle) * ray_length
+            pygame.draw.line(sprite, PVZ_SUN_YELLOW, (center, center), 
+                          (end_x, end_y), 2)
+        
+        return sprite
+    
+    def _draw_suns(self, surface):
+        """
+        绘制浮动的阳光装饰
+        
+        参数:
+            surface: 渲染目标表面
+        """
+        for sun in self.suns:
+            surface.blit(self.sun_sprites[sun['radius']], self._sun_rect(sun))
+    
+    def _sun_rect(self, sun):
+        """
+        计算阳光当前在屏幕上的区域
+        
+        浮动幅度5像素、角速度2弧度每秒，每秒最多移动10像素，
+        在空闲帧率（10帧每秒）下每帧最多移动1像素，看起来仍然平滑。
+        
+        参数:
+            sun: 阳光装饰
+            
+        返回:
+            pygame.Rect: 屏幕区域
+        """
+        y_offset = math.sin(self.animation_time * 2 + sun['phase']) * 5
+        size = self.sun_sprites[sun['radius']].get_width()
+        half = size // 2
+        return pygame.Rect(sun['x'] - half, int(sun['y'] + y_offset) - half, size, size)
     
     def _draw_background(self, surface):
-        """绘制菜单背景"""
+        """绘制菜单背景（草坪，只在预渲染时调用一次）"""
         # 绘制天空背景
         surface.fill(PVZ_SKY_BLUE)
         
@@ -128,37 +246,6 @@ class MenuScene(Scene):
                     pygame.draw.rect(surface, PVZ_DARK_GREEN, pygame.Rect(
                         grass_x, grass_y, grass_width, grass_height
                     ))
-        
-        # 绘制阳光装饰
-        for sun in self.suns:
-            # 添加浮动效果
-            y_offset = math.sin(self.animation_time * 2 + sun['phase']) * 5
-            sun_y = sun['y'] + y_offset
-            
-            # 绘制PvZ风格的阳光
-            radius = sun['radius']
-            
-            # 外部发光效果
-            for i in range(3):
-                glow_radius = radius + (3-i)*2
-                glow_alpha = 100 - i*30
-                glow_surface = pygame.Surface((glow_radius*2, glow_radius*2), pygame.SRCALPHA)
-                pygame.draw.circle(glow_surface, (255, 255, 0, glow_alpha), 
-                                (glow_radius, glow_radius), glow_radius)
-                surface.blit(glow_surface, 
-                          (sun['x'] - glow_radius, sun_y - glow_radius))
-            
-            # 主体阳光
-            pygame.draw.circle(surface, PVZ_SUN_YELLOW, (sun['x'], sun_y), radius)
-            
-            # 添加阳光光芒细节
-            ray_length = radius + 4
-            for angle in range(0, 360, 45):
-                rad_angle = math.radians(angle)
-                end_x = sun['x'] + math.cos(rad_angle) * ray_length
-                end_y = sun_y + math.sin(rad_angle) * ray_length
-                pygame.draw.line(surface, PVZ_SUN_YELLOW, (sun['x'], sun_y), 
-                              (end_x, end_y), 2)
     
     def _draw_title(self, surface):
         """绘制菜单标题"""
@@ -208,7 +295,7 @@ class MenuScene(Scene):
             500,
             200
         )
-        pygame.draw.rect(surface, (0, 0, 0, 160), instructions_bg, border_radius=15)
+        pygame.draw.rect(surface, BLACK, instructions_bg, border_radius=15)
         pygame.draw.rect(surface, PVZ_DARK_GREEN, instructions_bg, 3, border_radius=15)
         
         instructions = [
@@ -248,7 +335,7 @@ class MenuScene(Scene):
             500,
             200
         )
-        pygame.draw.rect(surface, (0, 0, 0, 160), instructions_bg, border_radius=15)
+        pygame.draw.rect(surface, BLACK, instructions_bg, border_radius=15)
         pygame.draw.rect(surface, PVZ_DARK_GREEN, instructions_bg, 3, border_radius=15)
         
         instructions = [
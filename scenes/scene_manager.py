@@ -97,6 +97,28 @@ class SceneManager:
         if self.current_scene:
             self.current_scene.update(delta_time)
     
+    def is_animating(self):
+        """
+        当前场景是否需要全帧率刷新
+        
+        返回:
+            bool: 是否需要全帧率刷新
+        """
+        if self.current_scene:
+            return self.current_scene.is_animating()
+        return False
+    
+    def take_dirty_rects(self):
+        """
+        取出当前场景需要重绘的区域
+        
+        返回:
+            list: 屏幕区域列表，None表示需要重绘整个画面
+        """
+        if self.current_scene:
+            return self.current_scene.take_dirty_rects()
+        return None
+    
     def render(self, surface):
         """
         渲染当前场景
@@ -0,0 +1,10 @@
+"""
+对战服务器包
+多条蛇共用一块棋盘的联机对战：房间按固定tick模拟，通过TCP广播增量
+"""
+
+from server.match import Match
+from server.room import Room
+from server.game_server import GameServer
+
+__all__ = ["Match", "Room", "GameServer"]
@@ -0,0 +1,28 @@
+"""
+对战服务器入口
+用法: python -m server [--host HOST] [--port PORT] [--tick-rate N]
+"""
+
+import argparse
+import asyncio
+from config import SERVER
+from server.game_server import GameServer
+
+
+def main():
+    """对战服务器命令行入口"""
+    parser = argparse.ArgumentParser(description="贪吃蛇对战服务器")
+    parser.add_argument("--host", default=SERVER["host"], help="监听地址")
+    parser.add_argument("--port", type=int, default=SERVER["port"], help="监听端口")
+    parser.add_argument("--tick-rate", type=int, default=SERVER["tick_rate"], help="每秒tick数")
+    args = parser.parse_args()
+
+    server = GameServer(args.host, args.port, args.tick_rate)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("对战服务器已停止")
+
+
+if __name__ == "__main__":
+    main()
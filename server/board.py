@@ -0,0 +1,303 @@
+"""
+棋盘状态编码
+把房间的棋盘状态编码成关键帧，或相对上一tick的增量
+"""
+
+from collections import namedtuple
+from config import OBSTACLE_TYPES
+from entities.food_registry import FOOD_TYPE_NAMES
+from server.protocol import ByteReader, write_varint, zigzag, unzigzag
+from utils.save_state import DIRECTIONS, DIRECTION_CODES, pack_body, unpack_body
+
+# 食物和障碍物类型编码
+FOOD_TYPE_CODES = {name: code for code, name in enumerate(FOOD_TYPE_NAMES)}
+OBSTACLE_TYPE_NAMES = tuple(OBSTACLE_TYPES)
+OBSTACLE_TYPE_CODES = {name: code for code, name in enumerate(OBSTACLE_TYPE_NAMES)}
+
+# 蛇增量标志位
+SNAKE_MOVED = 1  # 蛇头前进一格（后面跟方向编码）
+SNAKE_TAIL_KEPT = 2  # 尾巴没有移除（蛇变长了）
+SNAKE_FULL = 4  # 完整蛇身（新出现或不连续的移动）
+SNAKE_SCORE = 8  # 分数变化（后面跟zigzag编码的差值）
+
+# 棋盘快照（只读，由Match.snapshot()生成）
+# snakes: {player_id: SnakeView}，foods: {cell: food_type}，obstacles: ((obstacle_type, cell), ...)
+SnakeView = namedtuple("SnakeView", ["positions", "score"])
+BoardState = namedtuple("BoardState", ["tick", "snakes", "foods", "obstacles"])
+
+
+class BoardCodec:
+    """
+    棋盘编码器类
+    关键帧包含完整状态；增量只包含变化：每条蛇的新蛇头方向和尾巴是否保留、
+    增删的食物、移动的障碍物。所有整数都用变长编码，普通的一个tick只需要几个字节。
+    """
+
+    def __init__(self, width, height):
+        """
+        初始化棋盘编码器
+
+        参数:
+            width: 棋盘宽度（格子数）
+            height: 棋盘高度（格子数）
+        """
+        self.width = width
+        self.height = height
+
+    def _write_snake(self, buffer, positions):
+        """写入完整蛇身：蛇头坐标、长度和每节2位的方向编码"""
+        write_varint(buffer, positions[0][0])
+        write_varint(buffer, positions[0][1])
+        write_varint(buffer, len(positions))
+        buffer.extend(pack_body(positions, self.width, self.height))
+
+    def _read_snake(self, reader):
+        """读取完整蛇身"""
+        head = (reader.varint(), reader.varint())
+        length = reader.varint()
+        positions, reader.offset = unpack_body(head, length, reader.data, reader.offset, self.width, self.height)
+        return positions
+
+    def _write_obstacles(self, buffer, obstacles):
+        """写入完整障碍物列表"""
+        write_varint(buffer, len(obstacles))
+        for obstacle_type, (x, y) in obstacles:
+            buffer.append(OBSTACLE_TYPE_CODES[obstacle_type])
+            write_varint(buffer, x)
+            write_varint(buffer, y)
+
+    def _read_obstacles(self, reader):
+        """读取完整障碍物列表"""
+        return tuple(
+            (OBSTACLE_TYPE_NAMES[reader.byte()], (reader.varint(), reader.varint()))
+            for _ in range(reader.varint())
+        )
+
+    def encode_keyframe(self, state):
+        """
+        编码关键帧
+
+        参数:
+            state: BoardState
+
+        返回:
+            bytes: 关键帧数据
+        """
+        buffer = bytearray()
+        write_varint(buffer, state.tick)
+
+        write_varint(buffer, len(state.snakes))
+        for player_id, snake in state.snakes.items():
+            write_varint(buffer, player_id)
+            write_varint(buffer, zigzag(snake.score))
+            self._write_snake(buffer, snake.positions)
+
+        write_varint(buffer, len(state.foods))
+        for (x, y), food_type in state.foods.items():
+            buffer.append(FOOD_TYPE_CODES[food_type])
+            write_varint(buffer, x)
+            write_varint(buffer, y)
+
+        self._write_obstacles(buffer, state.obstacles)
+        return bytes(buffer)
+
+    def decode_keyframe(self, data, reader=None):
+        """
+        解码关键帧
+
+        参数:
+            data: 关键帧数据
+            reader: 读取器，传入时从读取器的当前位置开始，读完后停在关键帧之后
+
+        返回:
+            BoardState: 棋盘状态
+        """
+        reader = reader or ByteReader(data)
+        tick = reader.varint()
+
+        snakes = {}
+        for _ in range(reader.varint()):
+            player_id = reader.varint()
+            score = unzigzag(reader.varint())
+            snakes[player_id] = SnakeView(self._read_snake(reader), score)
+
+        foods = {}
+        for _ in range(reader.varint()):
+            food_type = FOOD_TYPE_NAMES[reader.byte()]
+            foods[(reader.varint(), reader.varint())] = food_type
+
+        obstacles = self._read_obstacles(reader)
+        return BoardState(tick, snakes, foods, obstacles)
+
+    def encode_delta(self, previous, current):
+        """
+        编码两个tick之间的增量
+
+        参数:
+            previous: 上一个BoardState
+            current: 当前BoardState
+
+        返回:
+            bytes: 增量数据
+        """
+        buffer = bytearray()
+        write_varint(buffer, current.tick - previous.tick)
+
+        # 有变化的蛇
+        changed = []
+        for player_id, snake in current.snakes.items():
+            before = previous.snakes.get(player_id)
+            if before is not snake and before != snake:
+                changed.append((player_id, before, snake))
+        write_varint(buffer, len(changed))
+        for player_id, before, snake in changed:
+            write_varint(buffer, player_id)
+            flags_index = len(buffer)
+            buffer.append(0)
+            flags = 0
+
+            positions = snake.positions
+            if before is not None and positions != before.positions:
+                moved_code = self.step_code(before.positions[0], positions[0])
+                old_length = len(before.positions)
+                tail_kept = len(positions) == old_length + 1
+                # 只检查首尾两端：蛇每tick最多前进一格，中间部分必然相同
+                if (moved_code is not None and (tail_kept or len(positions) == old_length)
+                        and (len(positions) == 1 or (positions[1] == before.positions[0]
+                                                     and positions[-1] == before.positions[len(positions) - 2]))):
+                    flags |= SNAKE_MOVED | (SNAKE_TAIL_KEPT if tail_kept else 0)
+                    buffer.append(moved_code)
+                else:
+                    flags |= SNAKE_FULL
+            elif before is None:
+                flags |= SNAKE_FULL
+            if flags & SNAKE_FULL:
+                self._write_snake(buffer, positions)
+
+            if before is None or snake.score != before.score:
+                flags |= SNAKE_SCORE
+                write_varint(buffer, zigzag(snake.score - (before.score if before else 0)))
+            buffer[flags_index] = flags
+
+        # 离开棋盘的蛇
+        removed = [player_id for player_id in previous.snakes if player_id not in current.snakes]
+        write_varint(buffer, len(removed))
+        for player_id in removed:
+            write_varint(buffer, player_id)
+
+        # 食物增删
+        removed_foods = [cell for cell, food_type in previous.foods.items() if current.foods.get(cell) != food_type]
+        added_foods = [(cell, food_type) for cell, food_type in current.foods.items()
+                       if previous.foods.get(cell) != food_type]
+        write_varint(buffer, len(removed_foods))
+        for x, y in removed_foods:
+            write_varint(buffer, x)
+            write_varint(buffer, y)
+        write_varint(buffer, len(added_foods))
+        for (x, y), food_type in added_foods:
+            buffer.append(FOOD_TYPE_CODES[food_type])
+            write_varint(buffer, x)
+            write_varint(buffer, y)
+
+        # 障碍物：类型序列不变时只发送移动过的，否则发送完整列表
+        if current.obstacles == previous.obstacles:
+            buffer.append(0)
+        elif len(current.obstacles) == len(previous.obstacles) and all(
+                a[0] == b[0] for a, b in zip(current.obstacles, previous.obstacles)):
+            moves = [
+                (index, cell) for index, ((_, cell), (_, old_cell))
+                in enumerate(zip(current.obstacles, previous.obstacles)) if cell != old_cell
+            ]
+            buffer.append(1)
+            write_varint(buffer, len(moves))
+            for index, (x, y) in moves:
+                write_varint(buffer, index)
+                write_varint(buffer, x)
+                write_varint(buffer, y)
+        else:
+            buffer.append(2)
+            self._write_obstacles(buffer, current.obstacles)
+
+        return bytes(buffer)
+
+    def decode_delta(self, previous, data, reader=None):
+        """
+        在上一个状态上应用增量
+
+        参数:
+            previous: 上一个BoardState
+            data: 增量数据
+            reader: 读取器，传入时从读取器的当前位置开始，读完后停在增量之后
+
+        返回:
+            BoardState: 新的棋盘状态
+        """
+        reader = reader or ByteReader(data)
+        tick = previous.tick + reader.varint()
+        snakes = dict(previous.snakes)
+
+        for _ in range(reader.varint()):
+            player_id = reader.varint()
+            flags = reader.byte()
+            before = snakes.get(player_id)
+            positions = before.positions if before else ()
+            score = before.score if before else 0
+
+            if flags & SNAKE_MOVED:
+                dx, dy = DIRECTIONS[reader.byte()]
+                head_x, head_y = positions[0]
+                head = ((head_x + dx) % self.width, (head_y + dy) % self.height)
+                if flags & SNAKE_TAIL_KEPT:
+                    positions = (head,) + positions
+                else:
+                    positions = (head,) + positions[:-1]
+            if flags & SNAKE_FULL:
+                positions = self._read_snake(reader)
+            if flags & SNAKE_SCORE:
+                score += unzigzag(reader.varint())
+            snakes[player_id] = SnakeView(positions, score)
+
+        for _ in range(reader.varint()):
+            snakes.pop(reader.varint(), None)
+
+        foods = dict(previous.foods)
+        for _ in range(reader.varint()):
+            foods.pop((reader.varint(), reader.varint()), None)
+        for _ in range(reader.varint()):
+            food_type = FOOD_TYPE_NAMES[reader.byte()]
+            foods[(reader.varint(), reader.varint())] = food_type
+
+        mode = reader.byte()
+        if mode == 0:
+            obstacles = previous.obstacles
+        elif mode == 1:
+            obstacles = list(previous.obstacles)
+            for _ in range(reader.varint()):
+                index = reader.varint()
+                obstacles[index] = (obstacles[index][0], (reader.varint(), reader.varint()))
+            obstacles = tuple(obstacles)
+        else:
+            obstacles = self._read_obstacles(reader)
+
+        return BoardState(tick, snakes, foods, obstacles)
+
+    def step_code(self, before, after):
+        """
+        计算两个相邻格子之间的方向编码
+
+        参数:
+            before: 起点格子
+            after: 终点格子
+
+        返回:
+            int: 方向编码，如果不相邻返回None
+        """
+        dx = (after[0] - before[0]) % self.width
+        dy = (after[1] - before[1]) % self.height
+        if dx == 0:
+            dy = -1 if dy == self.height - 1 else dy
+        elif dy == 0:
+            dx = -1 if dx == self.width - 1 else dx
+        else:
+            return None
+        return DIRECTION_CODES.get((dx, dy))
@@ -0,0 +1,233 @@
+"""
+对战服务器
+在一个asyncio事件循环中托管所有房间：一个定时协程驱动所有房间的tick，
+每个连接一个读取协程，只负责解析消息
+"""
+
+import asyncio
+from config import SERVER
+from server.room import Room
+from server.protocol import (
+    MSG_HELLO, MSG_INPUT, MSG_BYE, ByteReader, FrameDecoder, read_messages
+)
+
+
+class ClientConnection:
+    """
+    客户端连接类
+    发送时直接写入传输层缓冲区不等待；对方读得太慢导致缓冲区过大时断开连接，
+    避免一个慢客户端拖慢整个房间。
+    """
+
+    def __init__(self, reader, writer):
+        """
+        初始化客户端连接
+
+        参数:
+            reader: asyncio.StreamReader
+            writer: asyncio.StreamWriter
+        """
+        self.reader = reader
+        self.writer = writer
+        self.player_id = None
+        self.room = None
+        self.closed = False
+
+    def send(self, data):
+        """
+        发送数据（不等待）
+
+        参数:
+            data: 要发送的字节
+        """
+        if self.closed:
+            return
+        if self.writer.transport.get_write_buffer_size() > SERVER["max_write_buffer"]:
+            print(f"客户端 {self.player_id} 接收过慢，断开连接")
+            self.close()
+            return
+        self.writer.write(data)
+
+    def close(self):
+        """关闭连接"""
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+
+
+class GameServer:
+    """
+    对战服务器类
+    房间的模拟只在定时协程中进行，连接协程和模拟互不干扰；
+    空房间在最后一个玩家离开时删除。
+    """
+
+    def __init__(self, host=None, port=None, tick_rate=None, settings=None):
+        """
+        初始化对战服务器
+
+        参数:
+            host: 监听地址，如果为None则使用配置中的值
+            port: 监听端口，如果为None则使用配置中的值（0表示自动分配）
+            tick_rate: 每秒tick数，如果为None则使用配置中的值
+            settings: 房间使用的游戏设置
+        """
+        self.host = host or SERVER["host"]
+        self.port = SERVER["port"] if port is None else port
+        self.tick_rate = tick_rate or SERVER["tick_rate"]
+        self.settings = settings
+
+        self.rooms = {}  # {name: Room}
+        self._server = None
+        self._ticker = None
+        self._next_room = 1
+
+        # 统计信息
+        self.ticks = 0
+        self.late_ticks = 0
+
+    async def start(self):
+        """开始监听并启动tick协程"""
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ticker = asyncio.create_task(self._tick_loop())
+        print(f"对战服务器已启动: {self.host}:{self.port}，每秒{self.tick_rate}个tick")
+
+    async def serve_forever(self):
+        """启动服务器并一直运行"""
+        await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        """停止服务器，断开所有连接"""
+        if self._ticker:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+            self._ticker = None
+        if self._server:
+            self._server.close()
+            for room in self.rooms.values():
+                for connection in list(room.connections.values()):
+                    connection.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _tick_loop(self):
+        """按固定频率推进所有房间"""
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.tick_rate
+        next_tick = loop.time()
+        while True:
+            next_tick += interval
+            for room in list(self.rooms.values()):
+                try:
+                    room.step()
+                except Exception as e:
+                    print(f"房间 {room.name} 模拟出错: {e}")
+                    import traceback
+                    traceback.print_exc()
+            self.ticks += 1
+
+            delay = next_tick - loop.time()
+            if delay < 0:
+                # 跟不上时不补tick，从现在重新计时
+                self.late_ticks += 1
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def _find_room(self, name):
+        """
+        按名称查找房间，名称为空时加入第一个未满的房间，没有则新建
+
+        参数:
+            name: 房间名称
+
+        返回:
+            Room: 房间，如果指定的房间已满返回None
+        """
+        if name:
+            room = self.rooms.get(name)
+            if room is None:
+                room = self.rooms[name] = Room(name, self.tick_rate, self.settings)
+            return None if room.is_full else room
+
+        for room in self.rooms.values():
+            if not room.is_full:
+                return room
+        while f"room-{self._next_room}" in self.rooms:
+            self._next_room += 1
+        name = f"room-{self._next_room}"
+        room = self.rooms[name] = Room(name, self.tick_rate, self.settings)
+        return room
+
+    async def _handle_client(self, reader, writer):
+        """
+        处理一个客户端连接：等待HELLO加入房间，之后只转交输入
+
+        参数:
+            reader: asyncio.StreamReader
+            writer: asyncio.StreamWriter
+        """
+        connection = ClientConnection(reader, writer)
+        decoder = FrameDecoder()
+        try:
+            while not connection.closed:
+                messages = await read_messages(reader, decoder)
+                if messages is None:
+                    break
+                for message_type, payload in messages:
+                    if not self._handle_message(connection, message_type, payload):
+                        connection.close()
+                        break
+        except ConnectionError:
+            pass
+        except ValueError as e:
+            print(f"客户端消息格式错误: {e}")
+        finally:
+            room = connection.room
+            if room is not None:
+                room.leave(connection.player_id)
+                if room.is_empty and self.rooms.get(room.name) is room:
+                    del self.rooms[room.name]
+            connection.close()
+
+    def _handle_message(self, connection, message_type, payload):
+        """
+        处理一条客户端消息
+
+        参数:
+            connection: 客户端连接
+            message_type: 消息类型
+            payload: 消息内容
+
+        返回:
+            bool: 是否保持连接
+        """
+        reader = ByteReader(payload)
+        if message_type == MSG_HELLO:
+            if connection.room is not None:
+                return False
+            room_name = reader.string()
+            reader.string()  # 玩家名称（暂未使用）
+            room = self._find_room(room_name)
+            if room is None:
+                print(f"房间 {room_name} 已满")
+                return False
+            connection.room = room
+            connection.player_id = room.join(connection)
+            return True
+
+        if message_type == MSG_INPUT:
+            if connection.room is None:
+                return False
+            connection.room.handle_input(connection.player_id, payload)
+            return True
+
+        if message_type == MSG_BYE:
+            return False
+
+        return False
@@ -0,0 +1,204 @@
+"""
+本地回环测试
+在同一个进程中运行一个房间和多个联机预测客户端，中间用模拟延迟和抖动的链路连接。
+使用模拟时钟，不需要真正等待，几秒内可以跑完几分钟的对局
+"""
+
+import argparse
+import random
+from collections import deque
+from config import SERVER
+from server.netplay import NetplayClient
+from server.protocol import MSG_INPUT, FrameDecoder
+from server.room import Room
+from utils.save_state import DIRECTIONS
+
+
+class LatencyLink:
+    """
+    模拟延迟的单向链路类
+    每条数据的延迟在[min_latency, max_latency]之间随机，但和TCP一样保持发送顺序。
+    """
+
+    def __init__(self, min_latency, max_latency, rng):
+        """
+        初始化模拟链路
+
+        参数:
+            min_latency: 最小单向延迟（秒）
+            max_latency: 最大单向延迟（秒）
+            rng: 随机数生成器
+        """
+        self.min_latency = min_latency
+        self.max_latency = max_latency
+        self.rng = rng
+        self.in_flight = deque()  # [(到达时间, 数据)]
+        self.last_arrival = 0.0
+
+    def send(self, data, now):
+        """
+        发送数据
+
+        参数:
+            data: 字节
+            now: 当前时间（秒）
+        """
+        arrival = max(self.last_arrival, now + self.rng.uniform(self.min_latency, self.max_latency))
+        self.last_arrival = arrival
+        self.in_flight.append((arrival, data))
+
+    def receive(self, now):
+        """
+        取出已经到达的数据
+
+        参数:
+            now: 当前时间（秒）
+
+        返回:
+            bytes: 到达的数据（可能为空）
+        """
+        parts = []
+        while self.in_flight and self.in_flight[0][0] <= now:
+            parts.append(self.in_flight.popleft()[1])
+        return b"".join(parts)
+
+
+class LoopbackConnection:
+    """回环连接类：房间写入的数据经过下行链路到达客户端"""
+
+    def __init__(self, session, link):
+        """
+        初始化回环连接
+
+        参数:
+            session: 回环测试（提供当前时间now）
+            link: 下行链路
+        """
+        self.session = session
+        self.link = link
+
+    def send(self, data):
+        """发送数据"""
+        self.link.send(data, self.session.now)
+
+
+class LoopbackSession:
+    """
+    回环测试类
+    房间按固定tick推进，客户端每帧处理到达的消息、推进预测并随机按键。
+    记录每次按键到预测画面生效之间的tick数，以及回滚和纠正次数。
+    """
+
+    def __init__(self, clients=2, min_latency=0.05, max_latency=0.2, turn_chance=0.05,
+                 frame_rate=60, seed=None):
+        """
+        初始化回环测试
+
+        参数:
+            clients: 客户端数量
+            min_latency: 最小单向延迟（秒）
+            max_latency: 最大单向延迟（秒）
+            turn_chance: 每帧按键的概率
+            frame_rate: 客户端帧率
+            seed: 随机种子
+        """
+        self.rng = random.Random(seed)
+        self.room = Room("loopback", seed=seed)
+        self.tick_interval = 1.0 / self.room.tick_rate
+        self.frame_interval = 1.0 / frame_rate
+        self.turn_chance = turn_chance
+        self.now = 0.0
+
+        # 每个客户端: [NetplayClient, 玩家id, 上行链路, 下行链路, 客户端解码器, 服务器解码器]
+        self.clients = []
+        for _ in range(clients):
+            downlink = LatencyLink(min_latency, max_latency, self.rng)
+            uplink = LatencyLink(min_latency, max_latency, self.rng)
+            player_id = self.room.join(LoopbackConnection(self, downlink))
+            self.clients.append([NetplayClient(), player_id, uplink, downlink, FrameDecoder(), FrameDecoder()])
+
+        # 统计信息：按键到预测生效的tick数 {延迟: 次数}
+        self.input_delays = {}
+        self.presses = 0
+
+    def run(self, duration):
+        """
+        运行指定的模拟时间
+
+        参数:
+            duration: 模拟时间（秒）
+        """
+        next_tick = self.now + self.tick_interval
+        end = self.now + duration
+        while self.now < end:
+            self.now += self.frame_interval
+            while next_tick <= self.now:
+                self.room.step()
+                next_tick += self.tick_interval
+
+            for client, player_id, uplink, downlink, client_decoder, server_decoder in self.clients:
+                for message_type, payload in server_decoder.feed(uplink.receive(self.now)):
+                    if message_type == MSG_INPUT:
+                        self.room.handle_input(player_id, payload)
+                for message_type, payload in client_decoder.feed(downlink.receive(self.now)):
+                    client.handle_message(message_type, payload, self.now)
+                client.update(self.now)
+                self._press(client, uplink)
+
+    def _press(self, client, uplink):
+        """随机按键，并检查指令在哪个预测tick生效"""
+        if client.local_tick is None or self.rng.random() >= self.turn_chance:
+            return
+        tick = client.local_tick
+        queued = sum(1 for pending_tick in client.pending if pending_tick > tick)
+        data = client.press(self.rng.choice(DIRECTIONS))
+        if data is None:
+            return
+        uplink.send(data, self.now)
+        self.presses += 1
+        # 单机游戏中按键在蛇的下一步生效（前面有排队的指令时依次顺延），
+        # 与之相比多等待的预测tick数就是感受到的输入延迟
+        delay = max(client.pending) - (tick + 1 + queued)
+        self.input_delays[delay] = self.input_delays.get(delay, 0) + 1
+
+    def report(self):
+        """
+        汇总统计信息
+
+        返回:
+            dict: 统计信息
+        """
+        clients = [client for client, *_ in self.clients]
+        return {
+            "ticks": self.room.match.tick,
+            "presses": self.presses,
+            "input_delays": dict(sorted(self.input_delays.items())),
+            "late_inputs": self.room.match.late_inputs,
+            "early_inputs": self.room.match.early_inputs,
+            "rollbacks": sum(client.rollbacks for client in clients),
+            "resimulated_ticks": sum(client.resimulated_ticks for client in clients),
+            "corrections": sum(client.corrections for client in clients),
+            "stalls": sum(client.stalls for client in clients),
+        }
+
+
+def main():
+    """回环测试命令行入口"""
+    parser = argparse.ArgumentParser(description="联机预测回环测试")
+    parser.add_argument("--clients", type=int, default=4, help="客户端数量")
+    parser.add_argument("--min-latency", type=float, default=0.05, help="最小单向延迟（秒）")
+    parser.add_argument("--max-latency", type=float, default=0.2, help="最大单向延迟（秒）")
+    parser.add_argument("--duration", type=float, default=120.0, help="模拟时间（秒）")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    args = parser.parse_args()
+
+    session = LoopbackSession(args.clients, args.min_latency, args.max_latency, seed=args.seed)
+    session.run(args.duration)
+    print(f"延迟 {args.min_latency * 1000:.0f}-{args.max_latency * 1000:.0f}ms，"
+          f"{args.clients}个客户端，每秒{SERVER['tick_rate']}个tick")
+    for key, value in session.report().items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+对战模拟
+无界面地运行一块多条蛇共用的棋盘，规则与GameScene.update一致
+"""
+
+import random
+from config import DEFAULT_SETTINGS, SERVER, NETPLAY, UP, DOWN, LEFT, RIGHT
+from entities.snake import Snake
+from entities.food import FoodManager
+from entities.food_registry import FOOD_REGISTRY
+from entities.obstacle import ObstacleManager, ZombieObstacle
+from utils.input_queue import InputQueue
+from utils.occupancy import OccupancyGrid
+from server.board import SnakeView, BoardState
+
+
+class HeadlessEngine:
+    """
+    无界面的引擎上下文
+    实体类只从引擎读取设置和资源加载器；服务器不加载任何图像和声音。
+    """
+
+    def __init__(self, settings=None):
+        """
+        初始化无界面引擎上下文
+
+        参数:
+            settings: 游戏设置，如果为None则使用默认设置
+        """
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.settings.update(settings or {})
+        self.settings["use_images"] = False
+        self.resource_loader = None
+
+
+class Match:
+    """
+    对战模拟类
+    每次step()所有蛇同时前进一格，碰撞由共享的占用网格一次判定：撞到自己、别的蛇或障碍物的蛇死亡，
+    一段时间后在空位复活。食物位置由房间自己的随机数生成器决定。
+    速度提升在固定tick的对战中没有效果（每tick每条蛇都只走一格）。
+    """
+
+    def __init__(self, width=None, height=None, tick_rate=None, settings=None, seed=None):
+        """
+        初始化对战模拟
+
+        参数:
+            width: 棋盘宽度（格子数），如果为None则使用配置中的值
+            height: 棋盘高度（格子数），如果为None则使用配置中的值
+            tick_rate: 每秒tick数，用于推进障碍物计时
+            settings: 游戏设置（难度等）
+            seed: 随机种子
+        """
+        self.width = width or SERVER["board_width"]
+        self.height = height or SERVER["board_height"]
+        self.tick_interval = 1.0 / (tick_rate or SERVER["tick_rate"])
+        self.rng = random.Random(seed)
+        self.engine = HeadlessEngine(settings)
+        self.tick = 0
+
+        # 玩家 {player_id: Snake}、分数、输入队列和等待复活的玩家 {player_id: 复活tick}
+        self.snakes = {}
+        self.scores = {}
+        self.input_queues = {}
+        self.respawns = {}
+        self.grid = OccupancyGrid(self.width, self.height)
+        self.late_inputs = 0  # 到达时生效tick已经过去的指令数
+        self.early_inputs = 0  # 生效tick超出客户端预测范围而被拒绝的指令数
+
+        self.food_manager = FoodManager(self.engine)
+        self.food_manager.set_grid_size(self.width, self.height)
+        self.obstacle_manager = ObstacleManager(self.engine)
+        self.obstacle_manager.set_grid_size(self.width, self.height)
+        self.obstacle_manager.rng = self.rng
+
+        for _ in range(SERVER["food_count"]):
+            self._spawn_food()
+
+    def _free_cell(self):
+        """
+        随机找一个没有蛇、食物和障碍物的格子
+
+        返回:
+            tuple: 格子坐标，如果找不到返回None
+        """
+        has_food = self.food_manager.has_food
+        blocked = {obstacle.position for obstacle in self.obstacle_manager.obstacles}
+        for _ in range(100):
+            cell = (self.rng.randrange(self.width), self.rng.randrange(self.height))
+            if not has_food(cell) and cell not in blocked and cell not in self.grid:
+                return cell
+        return None
+
+    def _spawn_food(self):
+        """在空格子上生成一个随机类型的食物"""
+        cell = self._free_cell()
+        if cell is None:
+            return None
+        food_type = self._random_food_type()
+        return self.food_manager.add_food(food_type, cell)
+
+    def _random_food_type(self):
+        """按权重随机选择食物类型（使用房间自己的随机数生成器）"""
+        return FOOD_REGISTRY.random_type(self.rng)
+
+    def add_player(self, player_id):
+        """
+        加入玩家，在空位生成蛇
+
+        参数:
+            player_id: 玩家id
+
+        返回:
+            bool: 是否成功生成
+        """
+        self.scores.setdefault(player_id, 0)
+        self.input_queues[player_id] = InputQueue(SERVER["input_queue_size"])
+        return self._spawn_snake(player_id)
+
+    def _spawn_snake(self, player_id):
+        """在空位生成玩家的蛇"""
+        cell = self._free_cell()
+        if cell is None:
+            self.respawns[player_id] = self.tick + SERVER["respawn_ticks"]
+            return False
+        snake = Snake(self.engine, self.width, self.height)
+        snake.positions = [cell]
+        snake._rebuild_cell_index()
+        snake.direction = snake.next_direction = self.rng.choice((UP, DOWN, LEFT, RIGHT))
+        self.snakes[player_id] = snake
+        self.grid.add_snake(player_id, snake.positions)
+        self.respawns.pop(player_id, None)
+        return True
+
+    def remove_player(self, player_id):
+        """
+        移除玩家
+
+        参数:
+            player_id: 玩家id
+        """
+        snake = self.snakes.pop(player_id, None)
+        if snake is not None:
+            self.grid.remove_snake(player_id, snake.positions)
+        self.scores.pop(player_id, None)
+        self.input_queues.pop(player_id, None)
+        self.respawns.pop(player_id, None)
+
+    def queue_input(self, player_id, direction, tick=None):
+        """
+        加入玩家的方向指令
+
+        参数:
+            player_id: 玩家id
+            direction: 方向元组
+            tick: 指令生效的tick（客户端预测时使用），为None或已经过去时在下一个tick生效；
+                超过当前tick + NETPLAY["history_size"]的指令会被拒绝（客户端不会预测那么远，
+                接受的话会堵住这个玩家的指令队列直到那个tick）
+
+        返回:
+            bool: 指令是否被接受
+        """
+        snake = self.snakes.get(player_id)
+        queue = self.input_queues.get(player_id)
+        if snake is None or queue is None:
+            return False
+        if tick is not None and tick > self.tick + NETPLAY["history_size"]:
+            self.early_inputs += 1
+            return False
+        if tick is not None and tick <= self.tick:
+            self.late_inputs += 1
+        when = self.tick + 1 if tick is None else max(tick, self.tick + 1)
+        return queue.push(direction, snake.direction, when)
+
+    def step(self):
+        """推进一个tick"""
+        self.tick += 1
+
+        # 障碍物（僵尸移动和新障碍物生成）
+        heads = [snake.positions[0] for snake in self.snakes.values()]
+        self.obstacle_manager.update(self.tick_interval, self.grid, heads)
+        self.grid.set_obstacles(self.obstacle_manager.obstacles)
+
+        # 执行到期的方向指令，然后在占用网格上一次判定所有蛇的碰撞，结果与处理顺序无关
+        shielded = set()
+        for player_id, snake in self.snakes.items():
+            queue = self.input_queues[player_id]
+            if queue.commands and queue.commands[0].time <= self.tick:
+                snake.set_direction(queue.pop().direction)
+            snake.tick_abilities()
+            if snake.shield_active:
+                shielded.add(player_id)
+        dead = self.grid.step(self.snakes, shielded)
+
+        for player_id, snake in self.snakes.items():
+            if player_id not in dead:
+                snake.move()
+
+        for player_id in dead:
+            snake = self.snakes.pop(player_id)
+            self.grid.remove_snake(player_id, snake.positions)
+            self.input_queues[player_id].clear()
+            self.respawns[player_id] = self.tick + SERVER["respawn_ticks"]
+
+        # 吃食物
+        eaten = 0
+        for player_id, snake in self.snakes.items():
+            food = self.food_manager.check_collisions(snake.positions[0])
+            if food:
+                self.scores[player_id] += food.apply_effect(snake)
+                self.food_manager.remove_food(food)
+                snake.grow()
+                eaten += 1
+        for _ in range(eaten):
+            self._spawn_food()
+
+        # 复活
+        for player_id, respawn_tick in list(self.respawns.items()):
+            if self.tick >= respawn_tick:
+                self._spawn_snake(player_id)
+
+    def snapshot(self):
+        """
+        生成当前棋盘的只读快照
+
+        返回:
+            BoardState: 棋盘状态
+        """
+        return BoardState(
+            self.tick,
+            {
+                player_id: SnakeView(tuple(snake.positions), self.scores[player_id])
+                for player_id, snake in self.snakes.items()
+            },
+            {position: food_type for food_type, position in self.food_manager.items()},
+            tuple(
+                ("zombie" if isinstance(obstacle, ZombieObstacle) else "tombstone", obstacle.position)
+                for obstacle in self.obstacle_manager.obstacles
+            )
+        )
@@ -0,0 +1,283 @@
+"""
+联机客户端预测
+本地输入立即在预测的棋盘上生效，服务器的权威状态到达后与预测比较，不一致时回滚并重新模拟
+"""
+
+from collections import deque, namedtuple
+from config import FOOD_TYPES, NETPLAY
+from server.board import BoardCodec, BoardState, SnakeView
+from server.protocol import (
+    MSG_WELCOME, MSG_KEYFRAME, MSG_DELTA, MSG_INPUT, ByteReader, encode_message, write_varint
+)
+from utils.save_state import DIRECTIONS, DIRECTION_CODES
+
+# 预测快照
+# board: BoardState；directions: {player_id: 方向}，方向未知（刚复活）的蛇没有该项；
+# growing: 下一步不移除尾巴的玩家集合（上一步吃到了食物）。
+# BoardState只由元组和不再修改的字典组成，相邻快照共享没有变化的部分，保存快照不需要深拷贝
+Snapshot = namedtuple("Snapshot", ["board", "directions", "growing"])
+
+
+def infer_snapshot(previous, board, codec):
+    """
+    从权威状态推断每条蛇的方向和是否正在变长
+
+    参数:
+        previous: 上一个tick的权威BoardState，没有时为None
+        board: 当前的权威BoardState
+        codec: BoardCodec，用于计算相邻格子之间的方向
+
+    返回:
+        Snapshot: 预测快照
+    """
+    if previous is not None and previous.tick != board.tick - 1:
+        previous = None
+    directions = {}
+    growing = set()
+    for player_id, snake in board.snakes.items():
+        positions = snake.positions
+        before = previous.snakes.get(player_id) if previous else None
+        if len(positions) > 1:
+            code = codec.step_code(positions[1], positions[0])
+        elif before is not None:
+            code = codec.step_code(before.positions[0], positions[0])
+        else:
+            code = None
+        if code is not None:
+            directions[player_id] = DIRECTIONS[code]
+        # 服务器在蛇头吃到食物后的下一步保留尾巴
+        if before is not None and positions[0] in previous.foods:
+            growing.add(player_id)
+    return Snapshot(board, directions, growing)
+
+
+def predict_step(snapshot, inputs, width, height):
+    """
+    按服务器的规则预测下一个tick
+
+    其他玩家沿当前方向前进；自身碰撞和蛇之间的碰撞按服务器的顺序判定。
+    障碍物碰撞（取决于护盾和僵尸的随机移动）和新食物的位置无法预测，留给服务器纠正。
+
+    参数:
+        snapshot: 当前的预测快照
+        inputs: 本tick生效的方向指令 {player_id: 方向}
+        width: 棋盘宽度（格子数）
+        height: 棋盘高度（格子数）
+
+    返回:
+        Snapshot: 下一个tick的预测快照
+    """
+    board = snapshot.board
+    directions = dict(snapshot.directions)
+    for player_id, direction in inputs.items():
+        current = directions.get(player_id)
+        if current is None or (-direction[0], -direction[1]) != current:
+            directions[player_id] = direction
+
+    # 所有蛇先移动（撞到自己的蛇不移动），再统一判定碰撞
+    snakes = {}
+    dead = set()
+    for player_id, snake in board.snakes.items():
+        direction = directions.get(player_id)
+        if direction is None:
+            snakes[player_id] = snake
+            continue
+        positions = snake.positions
+        head_x, head_y = positions[0]
+        head = ((head_x + direction[0]) % width, (head_y + direction[1]) % height)
+        if len(positions) > 1 and head in positions:
+            dead.add(player_id)
+            snakes[player_id] = snake
+        elif player_id in snapshot.growing:
+            snakes[player_id] = SnakeView((head,) + positions, snake.score)
+        else:
+            snakes[player_id] = SnakeView((head,) + positions[:-1], snake.score)
+
+    if len(snakes) > 1:
+        cells = {}
+        for player_id, snake in snakes.items():
+            for cell in snake.positions:
+                cells.setdefault(cell, set()).add(player_id)
+        for player_id, snake in snakes.items():
+            if cells[snake.positions[0]] - {player_id}:
+                dead.add(player_id)
+
+    # 吃食物
+    foods = board.foods
+    growing = set()
+    for player_id in dead:
+        del snakes[player_id]
+        directions.pop(player_id, None)
+    for player_id, snake in snakes.items():
+        food_type = foods.get(snake.positions[0])
+        if food_type is not None:
+            if foods is board.foods:
+                foods = dict(foods)
+            del foods[snake.positions[0]]
+            snakes[player_id] = SnakeView(snake.positions, snake.score + FOOD_TYPES[food_type]["score"])
+            growing.add(player_id)
+
+    return Snapshot(BoardState(board.tick + 1, snakes, foods, board.obstacles), directions, growing)
+
+
+class NetplayClient:
+    """
+    联机预测客户端类
+    本地时钟领先最新权威状态lead_ticks个tick，按键立即写入下一个预测tick并发给服务器，
+    服务器在同一个tick执行它，所以感受到的输入延迟与单机相同。
+    最近的预测快照保存在环形缓冲区中：权威状态到达时与同一tick的预测比较，
+    一致就丢掉更早的快照，不一致就从权威状态开始重新模拟到当前tick。
+    客户端不负责收发数据，调用者把收到的消息交给handle_message，把press返回的数据发给服务器。
+    """
+
+    def __init__(self, lead_ticks=None, history_size=None):
+        """
+        初始化联机预测客户端
+
+        参数:
+            lead_ticks: 本地预测领先权威状态的tick数，如果为None则使用配置中的值
+            history_size: 预测快照缓冲区大小，如果为None则使用配置中的值
+        """
+        self.lead_ticks = lead_ticks or NETPLAY["lead_ticks"]
+        self.history = deque(maxlen=history_size or NETPLAY["history_size"])
+
+        self.player_id = None
+        self.codec = None
+        self.tick_interval = None
+
+        self.confirmed = None  # 最新的权威BoardState
+        self.pending = {}  # 还没有被权威状态确认的本地指令 {tick: 方向}
+        self.clock = None  # 本地时钟 (起点时间, 起点tick)
+
+        # 统计信息
+        self.rollbacks = 0  # 预测与权威状态不一致的次数
+        self.resimulated_ticks = 0  # 回滚后重新模拟的tick数
+        self.corrections = 0  # 回滚改变了本地蛇当前位置的次数
+        self.stalls = 0  # 预测达到缓冲区上限而暂停的次数
+
+    @property
+    def predicted(self):
+        """当前的预测棋盘（BoardState），还没有收到关键帧时为None"""
+        return self.history[-1].board if self.history else None
+
+    @property
+    def local_tick(self):
+        """当前预测到的tick"""
+        return self.history[-1].board.tick if self.history else None
+
+    def handle_message(self, message_type, payload, now):
+        """
+        处理一条服务器消息
+
+        参数:
+            message_type: 消息类型
+            payload: 消息内容
+            now: 当前时间（秒）
+        """
+        if message_type == MSG_WELCOME:
+            reader = ByteReader(payload)
+            self.player_id = reader.varint()
+            self.codec = BoardCodec(reader.varint(), reader.varint())
+            self.tick_interval = 1.0 / reader.varint()
+        elif message_type == MSG_KEYFRAME:
+            previous = self.confirmed
+            self.confirmed = self.codec.decode_keyframe(payload)
+            self._reconcile(previous, now)
+        elif message_type == MSG_DELTA and self.confirmed is not None:
+            previous = self.confirmed
+            self.confirmed = self.codec.decode_delta(previous, payload)
+            self._reconcile(previous, now)
+
+    def press(self, direction):
+        """
+        本地按键：指令在下一个预测tick生效
+
+        参数:
+            direction: 方向元组
+
+        返回:
+            bytes: 要发给服务器的INPUT消息，指令被丢弃（重复方向或掉头）时返回None
+        """
+        if not self.history:
+            return None
+        tick = self.local_tick + 1
+        while tick in self.pending:
+            tick += 1
+        last = self.pending.get(tick - 1) or self.history[-1].directions.get(self.player_id)
+        if last is not None and (direction == last or (-direction[0], -direction[1]) == last):
+            return None
+        self.pending[tick] = direction
+
+        payload = bytearray([DIRECTION_CODES[direction]])
+        write_varint(payload, tick)
+        return encode_message(MSG_INPUT, bytes(payload))
+
+    def update(self, now):
+        """
+        按本地时钟推进预测
+
+        参数:
+            now: 当前时间（秒）
+        """
+        if self.clock is None or not self.history:
+            return
+        origin_time, origin_tick = self.clock
+        self._advance_to(origin_tick + int((now - origin_time) / self.tick_interval))
+
+    def _advance_to(self, target):
+        """预测到目标tick（不超过缓冲区上限）"""
+        limit = self.confirmed.tick + self.history.maxlen - 1
+        if target > limit:
+            self.stalls += 1
+            target = limit
+        width, height = self.codec.width, self.codec.height
+        while self.local_tick < target:
+            tick = self.local_tick + 1
+            direction = self.pending.get(tick)
+            inputs = {self.player_id: direction} if direction else {}
+            self.history.append(predict_step(self.history[-1], inputs, width, height))
+
+    def _snapshot_at(self, tick):
+        """缓冲区中指定tick的快照，没有时返回None"""
+        if not self.history:
+            return None
+        index = tick - self.history[0].board.tick
+        if 0 <= index < len(self.history):
+            return self.history[index]
+        return None
+
+    def _reconcile(self, previous, now):
+        """权威状态到达：确认预测或回滚重新模拟"""
+        board = self.confirmed
+        for tick in [tick for tick in self.pending if tick <= board.tick]:
+            del self.pending[tick]
+
+        predicted = self._snapshot_at(board.tick)
+        if predicted is not None and predicted.board == board:
+            # 预测正确，只丢掉更早的快照
+            while self.history[0].board.tick < board.tick:
+                self.history.popleft()
+        else:
+            target = self.local_tick
+            if predicted is not None:
+                self.rollbacks += 1
+                before = self.history[-1].board.snakes.get(self.player_id)
+            self.history.clear()
+            self.history.append(infer_snapshot(previous, board, self.codec))
+            if target is not None and target > board.tick:
+                self.resimulated_ticks += target - board.tick
+                self._advance_to(target)
+                if predicted is not None and self.history[-1].board.snakes.get(self.player_id) != before:
+                    self.corrections += 1
+
+        self._sync_clock(board.tick, now)
+
+    def _sync_clock(self, tick, now):
+        """让本地时钟保持领先权威状态lead_ticks个tick（允许网络抖动造成的偏差）"""
+        expected = tick + self.lead_ticks
+        if self.clock is not None:
+            origin_time, origin_tick = self.clock
+            current = origin_tick + int((now - origin_time) / self.tick_interval)
+            if expected - 1 <= current <= expected + self.lead_ticks:
+                return
+        self.clock = (now, expected)
@@ -0,0 +1,197 @@
+"""
+网络协议
+变长整数编码、消息分帧以及客户端和服务器之间的消息类型
+"""
+
+# 消息类型
+MSG_HELLO = 1  # 客户端 -> 服务器：房间名, 玩家名
+MSG_WELCOME = 2  # 服务器 -> 客户端：玩家id, 棋盘宽, 棋盘高, 每秒tick数
+MSG_KEYFRAME = 3  # 服务器 -> 客户端：完整棋盘状态
+MSG_DELTA = 4  # 服务器 -> 客户端：相对上一tick的变化
+MSG_INPUT = 5  # 客户端 -> 服务器：方向编码, 生效tick（可选）
+MSG_BYE = 6  # 客户端 -> 服务器：离开房间
+
+# 单条消息的最大长度，超过时认为连接出错
+MAX_MESSAGE_SIZE = 1 << 20
+
+
+def write_varint(buffer, value):
+    """
+    把非负整数以变长编码（LEB128，每字节7位）追加到buffer
+
+    参数:
+        buffer: bytearray
+        value: 非负整数
+    """
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def zigzag(value):
+    """把有符号整数映射为非负整数（0, -1, 1, -2 ... -> 0, 1, 2, 3 ...）"""
+    return (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+
+def unzigzag(value):
+    """zigzag的逆运算"""
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+
+
+def write_string(buffer, text):
+    """
+    把字符串以"长度 + UTF-8"格式追加到buffer
+
+    参数:
+        buffer: bytearray
+        text: 字符串
+    """
+    data = text.encode("utf-8")
+    write_varint(buffer, len(data))
+    buffer.extend(data)
+
+
+class ByteReader:
+    """
+    字节读取器类
+    按顺序从消息中读取变长整数、字节和字符串，数据不足时抛出ValueError。
+    """
+
+    def __init__(self, data, offset=0):
+        """
+        初始化字节读取器
+
+        参数:
+            data: bytes或bytearray
+            offset: 起始位置
+        """
+        self.data = data
+        self.offset = offset
+
+    def varint(self):
+        """读取一个变长整数"""
+        result = 0
+        shift = 0
+        data = self.data
+        while True:
+            if self.offset >= len(data):
+                raise ValueError("消息数据不完整")
+            byte = data[self.offset]
+            self.offset += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def byte(self):
+        """读取一个字节"""
+        if self.offset >= len(self.data):
+            raise ValueError("消息数据不完整")
+        value = self.data[self.offset]
+        self.offset += 1
+        return value
+
+    def bytes(self, size):
+        """读取指定长度的字节"""
+        end = self.offset + size
+        if end > len(self.data):
+            raise ValueError("消息数据不完整")
+        value = bytes(self.data[self.offset:end])
+        self.offset = end
+        return value
+
+    def string(self):
+        """读取一个字符串"""
+        return self.bytes(self.varint()).decode("utf-8")
+
+    def at_end(self):
+        """是否已读完"""
+        return self.offset >= len(self.data)
+
+
+def encode_message(message_type, payload=b""):
+    """
+    把消息编码成一帧：长度（变长整数） + 类型（1字节） + 内容
+
+    参数:
+        message_type: 消息类型
+        payload: 消息内容
+
+    返回:
+        bytes: 一帧数据
+    """
+    frame = bytearray()
+    write_varint(frame, len(payload) + 1)
+    frame.append(message_type)
+    frame.extend(payload)
+    return bytes(frame)
+
+
+class FrameDecoder:
+    """
+    分帧解码器类
+    不断喂入从连接收到的字节，取出其中完整的消息。
+    """
+
+    def __init__(self):
+        """初始化分帧解码器"""
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """
+        喂入收到的字节
+
+        参数:
+            data: 收到的字节
+
+        返回:
+            list: 完整消息列表 [(message_type, payload)]
+        """
+        self.buffer.extend(data)
+        messages = []
+        buffer = self.buffer
+        offset = 0
+        while True:
+            # 解析长度前缀，前缀不完整时等待更多数据
+            size = 0
+            shift = 0
+            position = offset
+            while position < len(buffer):
+                byte = buffer[position]
+                position += 1
+                size |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+            else:
+                break
+            if size == 0 or size > MAX_MESSAGE_SIZE:
+                raise ValueError(f"无效的消息长度: {size}")
+            if position + size > len(buffer):
+                break
+            messages.append((buffer[position], bytes(buffer[position + 1:position + size])))
+            offset = position + size
+        if offset:
+            del buffer[:offset]
+        return messages
+
+
+async def read_messages(reader, decoder):
+    """
+    从asyncio流中读取下一批完整消息
+
+    参数:
+        reader: asyncio.StreamReader
+        decoder: FrameDecoder
+
+    返回:
+        list: 完整消息列表，连接关闭时返回None
+    """
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            return None
+        messages = decoder.feed(data)
+        if messages:
+            return messages
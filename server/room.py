@@ -0,0 +1,130 @@
+"""
+房间
+把一局对战和连接到它的客户端组合在一起，每个tick模拟一次并广播同一份增量
+"""
+
+from config import SERVER
+from server.match import Match
+from server.board import BoardCodec
+from server.protocol import (
+    MSG_WELCOME, MSG_KEYFRAME, MSG_DELTA, ByteReader, encode_message, write_varint
+)
+from utils.save_state import DIRECTIONS
+
+
+class Room:
+    """
+    房间类
+    房间只在tick时模拟和编码一次，得到的帧原样写给房间里的所有连接，
+    所以模拟开销与连接数无关；连接的读取协程只负责把输入交给房间。
+    """
+
+    def __init__(self, name, tick_rate=None, settings=None, seed=None):
+        """
+        初始化房间
+
+        参数:
+            name: 房间名称
+            tick_rate: 每秒tick数，如果为None则使用配置中的值
+            settings: 游戏设置
+            seed: 随机种子
+        """
+        self.name = name
+        self.tick_rate = tick_rate or SERVER["tick_rate"]
+        self.match = Match(tick_rate=self.tick_rate, settings=settings, seed=seed)
+        self.codec = BoardCodec(self.match.width, self.match.height)
+
+        # 连接 {player_id: connection}，连接需要提供send(data)方法
+        self.connections = {}
+        self.next_player_id = 1
+
+        # 上一次广播的棋盘状态，新连接的关键帧和下一个增量都以它为基准
+        self.last_state = self.match.snapshot()
+
+        # 统计信息
+        self.bytes_sent = 0
+
+    @property
+    def is_full(self):
+        """房间是否已满"""
+        return len(self.connections) >= SERVER["max_players_per_room"]
+
+    @property
+    def is_empty(self):
+        """房间是否没有连接"""
+        return not self.connections
+
+    def join(self, connection):
+        """
+        加入房间：分配玩家id，发送欢迎消息和当前棋盘的关键帧
+
+        参数:
+            connection: 客户端连接
+
+        返回:
+            int: 玩家id
+        """
+        player_id = self.next_player_id
+        self.next_player_id += 1
+        self.connections[player_id] = connection
+        self.match.add_player(player_id)
+
+        welcome = bytearray()
+        for value in (player_id, self.match.width, self.match.height, self.tick_rate):
+            write_varint(welcome, value)
+        connection.send(encode_message(MSG_WELCOME, bytes(welcome)))
+        connection.send(encode_message(MSG_KEYFRAME, self.codec.encode_keyframe(self.last_state)))
+        return player_id
+
+    def leave(self, player_id):
+        """
+        离开房间
+
+        参数:
+            player_id: 玩家id
+        """
+        self.connections.pop(player_id, None)
+        self.match.remove_player(player_id)
+
+    def queue_input(self, player_id, direction, tick=None):
+        """
+        转交玩家的方向指令
+
+        参数:
+            player_id: 玩家id
+            direction: 方向元组
+            tick: 指令生效的tick，为None时在下一个tick生效
+        """
+        self.match.queue_input(player_id, direction, tick)
+
+    def handle_input(self, player_id, payload):
+        """
+        解析INPUT消息并转交方向指令
+
+        参数:
+            player_id: 玩家id
+            payload: 消息内容（方向编码，可选的生效tick）
+
+        异常:
+            ValueError: 消息数据不完整
+        """
+        reader = ByteReader(payload)
+        code = reader.byte()
+        tick = None if reader.at_end() else reader.varint()
+        if code < len(DIRECTIONS):
+            self.queue_input(player_id, DIRECTIONS[code], tick)
+
+    def step(self):
+        """模拟一个tick并把增量广播给所有连接"""
+        self.match.step()
+        state = self.match.snapshot()
+        # 定期广播关键帧，丢失增量或中途观战的客户端可以据此重新同步
+        if state.tick % SERVER["keyframe_interval"] == 0:
+            frame = encode_message(MSG_KEYFRAME, self.codec.encode_keyframe(state))
+        else:
+            frame = encode_message(MSG_DELTA, self.codec.encode_delta(self.last_state, state))
+        self.last_state = state
+
+        for connection in list(self.connections.values()):
+            connection.send(frame)
+        self.bytes_sent += len(frame) * len(self.connections)
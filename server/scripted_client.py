@@ -0,0 +1,207 @@
+"""
+脚本客户端
+模拟真实玩家连接服务器：按脚本随机转向，并用收到的关键帧和增量重建棋盘，
+用于测试服务器和压力测试
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from server.board import BoardCodec
+from server.game_server import GameServer
+from server.protocol import (
+    MSG_HELLO, MSG_WELCOME, MSG_KEYFRAME, MSG_DELTA, MSG_INPUT, MSG_BYE,
+    ByteReader, FrameDecoder, encode_message, read_messages, write_string
+)
+from utils.save_state import DIRECTIONS
+
+
+class ScriptedClient:
+    """
+    脚本客户端类
+    连接后加入房间，每收到一个tick有一定概率随机转向。
+    """
+
+    def __init__(self, room="", name="bot", turn_chance=0.2, seed=None):
+        """
+        初始化脚本客户端
+
+        参数:
+            room: 房间名称，为空时由服务器分配
+            name: 玩家名称
+            turn_chance: 每个tick转向的概率
+            seed: 随机种子
+        """
+        self.room = room
+        self.name = name
+        self.turn_chance = turn_chance
+        self.rng = random.Random(seed)
+
+        self.player_id = None
+        self.codec = None
+        self.state = None  # 重建的BoardState
+
+        self.reader = None
+        self.writer = None
+        self.decoder = FrameDecoder()
+
+        # 统计信息
+        self.ticks_received = 0
+        self.bytes_received = 0
+
+    async def connect(self, host, port):
+        """
+        连接服务器并加入房间
+
+        参数:
+            host: 服务器地址
+            port: 服务器端口
+        """
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        hello = bytearray()
+        write_string(hello, self.room)
+        write_string(hello, self.name)
+        self.writer.write(encode_message(MSG_HELLO, bytes(hello)))
+        await self.writer.drain()
+
+    def send_direction(self, direction):
+        """
+        发送方向指令
+
+        参数:
+            direction: 方向元组
+        """
+        self.writer.write(encode_message(MSG_INPUT, bytes([DIRECTIONS.index(direction)])))
+
+    def _handle_message(self, message_type, payload):
+        """处理一条服务器消息"""
+        if message_type == MSG_WELCOME:
+            reader = ByteReader(payload)
+            self.player_id = reader.varint()
+            width, height = reader.varint(), reader.varint()
+            reader.varint()  # 每秒tick数
+            self.codec = BoardCodec(width, height)
+        elif message_type in (MSG_KEYFRAME, MSG_DELTA):
+            joined = self.state is not None
+            if message_type == MSG_KEYFRAME:
+                self.state = self.codec.decode_keyframe(payload)
+            else:
+                self.state = self.codec.decode_delta(self.state, payload)
+            # 加入时的关键帧不算一个tick，之后定期广播的关键帧和增量一样
+            if joined:
+                self.ticks_received += 1
+                self._on_tick()
+
+    def _on_tick(self):
+        """每个tick执行一次脚本：随机转向"""
+        if self.rng.random() < self.turn_chance:
+            self.send_direction(self.rng.choice(DIRECTIONS))
+
+    async def run(self, duration):
+        """
+        接收服务器消息直到时间结束或连接断开
+
+        参数:
+            duration: 运行时间（秒）
+        """
+        deadline = time.monotonic() + duration
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    messages = await asyncio.wait_for(read_messages(self.reader, self.decoder), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if messages is None:
+                    break
+                for message_type, payload in messages:
+                    self.bytes_received += len(payload)
+                    self._handle_message(message_type, payload)
+        finally:
+            await self.close()
+
+    async def close(self):
+        """离开房间并断开连接"""
+        if self.writer is None:
+            return
+        try:
+            self.writer.write(encode_message(MSG_BYE))
+            self.writer.close()
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self.writer = None
+
+
+async def run_load_test(host, port, rooms, clients_per_room, duration):
+    """
+    启动多个脚本客户端同时运行
+
+    参数:
+        host: 服务器地址
+        port: 服务器端口
+        rooms: 房间数量
+        clients_per_room: 每个房间的客户端数量
+        duration: 运行时间（秒）
+
+    返回:
+        list: 所有脚本客户端
+    """
+    clients = []
+    for room_index in range(rooms):
+        for client_index in range(clients_per_room):
+            client = ScriptedClient(
+                f"load-{room_index}", f"bot-{room_index}-{client_index}",
+                seed=room_index * 1000 + client_index
+            )
+            await client.connect(host, port)
+            clients.append(client)
+    await asyncio.gather(*(client.run(duration) for client in clients))
+    return clients
+
+
+async def _main(args):
+    """命令行入口"""
+    server = None
+    host, port = args.host, args.port
+    if args.local:
+        # 在同一个事件循环中启动服务器
+        server = GameServer(host, 0)
+        await server.start()
+        port = server.port
+
+    started = time.monotonic()
+    clients = await run_load_test(host, port, args.rooms, args.clients, args.duration)
+    elapsed = time.monotonic() - started
+
+    ticks = sum(client.ticks_received for client in clients)
+    received = sum(client.bytes_received for client in clients)
+    print(f"{len(clients)}个客户端，{args.rooms}个房间，运行{elapsed:.1f}秒")
+    print(f"平均每个客户端收到{ticks / len(clients):.0f}个tick，"
+          f"平均每tick {received / max(ticks, 1):.1f}字节")
+    if server:
+        print(f"服务器tick: {server.ticks}，超时tick: {server.late_ticks}")
+        await server.close()
+
+
+def main():
+    """脚本客户端命令行入口"""
+    parser = argparse.ArgumentParser(description="对战服务器脚本客户端")
+    parser.add_argument("--host", default="127.0.0.1", help="服务器地址")
+    parser.add_argument("--port", type=int, default=None, help="服务器端口")
+    parser.add_argument("--rooms", type=int, default=10, help="房间数量")
+    parser.add_argument("--clients", type=int, default=4, help="每个房间的客户端数量")
+    parser.add_argument("--duration", type=float, default=5.0, help="运行时间（秒）")
+    parser.add_argument("--local", action="store_true", help="在本进程中启动服务器")
+    args = parser.parse_args()
+    if args.port is None:
+        from config import SERVER
+        args.port = SERVER["port"]
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+观战数据流
+把单人游戏场景的状态编码成关键帧和逐步增量，供远程观战。
+棋盘部分（蛇身、食物、僵尸）复用BoardCodec，额外附带方向、能力计时和结束状态
+"""
+
+from collections import namedtuple
+from config import SPECTATOR
+from server.board import BoardCodec, BoardState, SnakeView
+from server.protocol import (
+    MSG_KEYFRAME, MSG_DELTA, ByteReader, encode_message, write_varint, zigzag, unzigzag
+)
+from utils.occupancy import PLAYER_OWNER
+from utils.save_state import DIRECTIONS, DIRECTION_CODES
+
+# 观战棋盘中玩家蛇的id
+SPECTATED_PLAYER = 0
+
+# 状态标志位
+FLAG_SHIELD = 1
+FLAG_SPEED_BOOST = 2
+FLAG_GAME_OVER = 4
+
+# 增量中附加字段的变化标志位
+CHANGED_FLAGS = 1  # 后面跟新的状态标志
+CHANGED_DIRECTION = 2  # 后面跟方向编码
+CHANGED_SHIELD_TIMER = 4  # 后面跟zigzag编码的差值
+CHANGED_SPEED_BOOST_TIMER = 8  # 后面跟zigzag编码的差值
+
+# 观战者看到的状态（不包括随机数、输入队列和动画偏移等只影响模拟或装饰的数据）
+# board: BoardState（tick为蛇已移动的步数，蛇的id为SPECTATED_PLAYER）
+SpectatorState = namedtuple("SpectatorState", [
+    "board", "direction", "flags", "shield_timer", "speed_boost_timer"
+])
+
+
+def spectator_state(state):
+    """
+    从游戏状态快照中取出观战需要的部分
+
+    参数:
+        state: GameState状态快照（由capture_state生成）
+
+    返回:
+        SpectatorState: 观战状态
+    """
+    snake = state.snake
+    flags = ((FLAG_SHIELD if snake.shield_active else 0)
+             | (FLAG_SPEED_BOOST if snake.speed_boost_active else 0)
+             | (FLAG_GAME_OVER if state.game_over else 0))
+    board = BoardState(
+        state.move_tick,
+        {SPECTATED_PLAYER: SnakeView(snake.positions, state.score)},
+        {position: food_type for food_type, position, _ in state.foods},
+        tuple((obstacle_type, position) for obstacle_type, position, _, _, _ in state.obstacles)
+    )
+    return SpectatorState(board, snake.direction, flags, int(snake.shield_timer), int(snake.speed_boost_timer))
+
+
+def apply_spectator_state(scene, state):
+    """
+    把观战状态显示到游戏场景（观战用的场景只渲染，不调用update）
+
+    参数:
+        scene: 游戏场景
+        state: SpectatorState观战状态
+    """
+    snake_view = state.board.snakes.get(SPECTATED_PLAYER)
+    scene.move_tick = state.board.tick
+    scene.game_over = bool(state.flags & FLAG_GAME_OVER)
+
+    snake = scene.snake
+    if snake_view is not None:
+        scene.score = snake_view.score
+        snake.positions = list(snake_view.positions)
+        snake._rebuild_cell_index()
+        scene.occupancy.reset({PLAYER_OWNER: snake.positions})
+        scene.camera.follow(snake.positions[0])
+    snake.direction = snake.next_direction = state.direction
+    snake.shield_active = bool(state.flags & FLAG_SHIELD)
+    snake.shield_timer = state.shield_timer
+    snake.speed_boost_active = bool(state.flags & FLAG_SPEED_BOOST)
+    snake.speed_boost_timer = state.speed_boost_timer
+    scene.sync_abilities()
+
+    food_manager = scene.food_manager
+    food_manager.clear()
+    for position, food_type in state.board.foods.items():
+        food_manager.add_food(food_type, position)
+
+    obstacle_manager = scene.obstacle_manager
+    obstacle_manager.obstacles = []
+    for obstacle_type, position in state.board.obstacles:
+        obstacle_manager.spawn_obstacle(obstacle_type, position)
+
+
+class SpectatorEncoder:
+    """
+    观战编码器类
+    每隔keyframe_interval步发送一个关键帧，其余每步只发送增量；
+    蛇每步只前进一格，普通的一步只需要几个字节。
+    """
+
+    def __init__(self, width, height, keyframe_interval=None):
+        """
+        初始化观战编码器
+
+        参数:
+            width: 世界宽度（格子数）
+            height: 世界高度（格子数）
+            keyframe_interval: 关键帧间隔（步数），如果为None则使用配置中的值
+        """
+        self.codec = BoardCodec(width, height)
+        self.keyframe_interval = keyframe_interval or SPECTATOR["keyframe_interval"]
+        self.previous = None
+        self.last_keyframe_tick = 0
+
+    def reset(self):
+        """下一帧强制发送关键帧（例如有新的观战者加入）"""
+        self.previous = None
+
+    def encode(self, state):
+        """
+        编码一帧
+
+        参数:
+            state: SpectatorState观战状态
+
+        返回:
+            bytes: 一帧消息（关键帧或增量）
+        """
+        previous = self.previous
+        tick = state.board.tick
+        if (previous is None or tick < previous.board.tick
+                or tick - self.last_keyframe_tick >= self.keyframe_interval):
+            frame = encode_message(MSG_KEYFRAME, self.encode_keyframe(state))
+            self.last_keyframe_tick = tick
+        else:
+            frame = encode_message(MSG_DELTA, self.encode_delta(previous, state))
+        self.previous = state
+        return frame
+
+    def encode_keyframe(self, state):
+        """
+        编码关键帧
+
+        参数:
+            state: SpectatorState观战状态
+
+        返回:
+            bytes: 关键帧数据
+        """
+        buffer = bytearray(self.codec.encode_keyframe(state.board))
+        buffer.append(state.flags)
+        buffer.append(DIRECTION_CODES[state.direction])
+        write_varint(buffer, zigzag(state.shield_timer))
+        write_varint(buffer, zigzag(state.speed_boost_timer))
+        return bytes(buffer)
+
+    def encode_delta(self, previous, state):
+        """
+        编码两步之间的增量
+
+        参数:
+            previous: 上一个SpectatorState
+            state: 当前SpectatorState
+
+        返回:
+            bytes: 增量数据
+        """
+        buffer = bytearray(self.codec.encode_delta(previous.board, state.board))
+        changed_index = len(buffer)
+        buffer.append(0)
+        changed = 0
+        if state.flags != previous.flags:
+            changed |= CHANGED_FLAGS
+            buffer.append(state.flags)
+        if state.direction != previous.direction:
+            changed |= CHANGED_DIRECTION
+            buffer.append(DIRECTION_CODES[state.direction])
+        if state.shield_timer != previous.shield_timer:
+            changed |= CHANGED_SHIELD_TIMER
+            write_varint(buffer, zigzag(state.shield_timer - previous.shield_timer))
+        if state.speed_boost_timer != previous.speed_boost_timer:
+            changed |= CHANGED_SPEED_BOOST_TIMER
+            write_varint(buffer, zigzag(state.speed_boost_timer - previous.speed_boost_timer))
+        buffer[changed_index] = changed
+        return bytes(buffer)
+
+
+class SpectatorDecoder:
+    """
+    观战解码器类
+    从关键帧和增量重建观战状态，收到第一个关键帧之前的增量会被丢弃。
+    """
+
+    def __init__(self, width, height):
+        """
+        初始化观战解码器
+
+        参数:
+            width: 世界宽度（格子数）
+            height: 世界高度（格子数）
+        """
+        self.codec = BoardCodec(width, height)
+        self.state = None
+
+    def decode(self, message_type, payload):
+        """
+        解码一条消息
+
+        参数:
+            message_type: 消息类型
+            payload: 消息内容
+
+        返回:
+            SpectatorState: 最新的观战状态，还没有收到关键帧时返回None
+
+        异常:
+            ValueError: 消息类型未知或数据不完整
+        """
+        if message_type == MSG_KEYFRAME:
+            self.state = self.decode_keyframe(payload)
+        elif message_type == MSG_DELTA:
+            if self.state is not None:
+                self.state = self.decode_delta(self.state, payload)
+        else:
+            raise ValueError(f"未知的观战消息类型: {message_type}")
+        return self.state
+
+    def decode_keyframe(self, data):
+        """
+        解码关键帧
+
+        参数:
+            data: 关键帧数据
+
+        返回:
+            SpectatorState: 观战状态
+        """
+        reader = ByteReader(data)
+        board = self.codec.decode_keyframe(data, reader)
+        flags = reader.byte()
+        direction = DIRECTIONS[reader.byte()]
+        shield_timer = unzigzag(reader.varint())
+        speed_boost_timer = unzigzag(reader.varint())
+        return SpectatorState(board, direction, flags, shield_timer, speed_boost_timer)
+
+    def decode_delta(self, previous, data):
+        """
+        在上一个状态上应用增量
+
+        参数:
+            previous: 上一个SpectatorState
+            data: 增量数据
+
+        返回:
+            SpectatorState: 新的观战状态
+        """
+        reader = ByteReader(data)
+        board = self.codec.decode_delta(previous.board, data, reader)
+        flags, direction = previous.flags, previous.direction
+        shield_timer, speed_boost_timer = previous.shield_timer, previous.speed_boost_timer
+
+        changed = reader.byte()
+        if changed & CHANGED_FLAGS:
+            flags = reader.byte()
+        if changed & CHANGED_DIRECTION:
+            direction = DIRECTIONS[reader.byte()]
+        if changed & CHANGED_SHIELD_TIMER:
+            shield_timer += unzigzag(reader.varint())
+        if changed & CHANGED_SPEED_BOOST_TIMER:
+            speed_boost_timer += unzigzag(reader.varint())
+        return SpectatorState(board, direction, flags, shield_timer, speed_boost_timer)
@@ -0,0 +1,195 @@
+"""
+回放检查
+无界面地用随机帧间隔和随机按键玩若干局，把每局的回放在新的游戏场景中重现，
+检查重现的结局与实际对局一致；也可以重现排行榜中保存的回放，核对记录的分数和长度
+"""
+
+import os
+import argparse
+import random
+import tempfile
+
+# 无界面运行（必须在导入pygame之前设置）
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import config
+from game_engine import GameEngine
+from utils.leaderboard import Leaderboard
+from utils.save_state import capture_state, encode_replay, decode_replay, replay_game
+
+# 检查时随机选择的方向
+DIRECTION_CHOICES = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+
+def outcome(state):
+    """
+    取出状态快照中由模拟决定的部分（不包括动画时间、动画相位和输入队列）
+
+    参数:
+        state: GameState状态快照
+
+    返回:
+        tuple: 可比较的结局
+    """
+    return (
+        state.score, state.move_tick, state.move_timer, state.food_spawn_timer,
+        state.obstacle_game_time, state.obstacle_spawn_timer, state.snake.positions,
+        tuple((food_type, position) for food_type, position, _ in state.foods),
+        tuple((obstacle_type, position, direction, move_timer)
+              for obstacle_type, position, _, direction, move_timer in state.obstacles),
+        state.rng_state
+    )
+
+
+def enter_game(engine, settings):
+    """
+    用指定设置进入新的游戏场景
+
+    参数:
+        engine: 游戏引擎
+        settings: 要覆盖的游戏设置
+
+    返回:
+        GameScene: 游戏场景
+    """
+    engine.settings.update(settings)
+    engine.change_scene("game")
+    return engine.scene_manager.current_scene
+
+
+def play_game(scene, rng, max_frames):
+    """
+    用随机帧间隔和随机按键玩一局
+
+    参数:
+        scene: 已进入的游戏场景
+        rng: 随机数生成器
+        max_frames: 最多运行的帧数
+
+    返回:
+        bool: 游戏是否在max_frames帧内结束
+    """
+    for _ in range(max_frames):
+        if rng.random() < 0.05:
+            scene.input_queue.push(rng.choice(DIRECTION_CHOICES), scene.snake.direction, scene.animation_time)
+        scene.update(rng.uniform(0.002, config.MAX_DELTA_TIME / 4))
+        if scene.game_over:
+            return True
+    return False
+
+
+def check_games(engine, games, settings, rng, max_frames):
+    """
+    玩若干局并重现每局的回放
+
+    参数:
+        engine: 游戏引擎
+        games: 局数
+        settings: 游戏设置（难度、场景）
+        rng: 随机数生成器
+        max_frames: 每局最多运行的帧数
+
+    返回:
+        list: 错误信息，全部通过时为空列表
+    """
+    errors = []
+    for game_index in range(games):
+        scene = enter_game(engine, settings)
+        if not play_game(scene, rng, max_frames):
+            print(f"第{game_index}局: {max_frames}帧内没有结束，跳过")
+            continue
+        expected = outcome(capture_state(scene))
+        stats = dict(scene.stats)
+        replay = encode_replay(scene.initial_state, scene.input_log, scene.move_tick)
+
+        scene = enter_game(engine, settings)
+        try:
+            actual = outcome(replay_game(scene, replay))
+        except ValueError as e:
+            errors.append(f"第{game_index}局: {e}")
+            continue
+        if actual != expected:
+            errors.append(f"第{game_index}局: 重现的结局与实际对局不一致")
+        else:
+            print(f"第{game_index}局: {expected[1]}步，{expected[0]}分，重现一致，事件统计 {stats}")
+    return errors
+
+
+def check_leaderboard(engine, leaderboard, difficulty, scene_type, limit):
+    """
+    重现排行榜前几名的回放，核对分数和长度
+
+    参数:
+        engine: 游戏引擎
+        leaderboard: 排行榜
+        difficulty: 难度
+        scene_type: 场景类型
+        limit: 检查的成绩数
+
+    返回:
+        list: 错误信息，全部通过时为空列表
+    """
+    errors = []
+    for entry in leaderboard.top_scores(difficulty, scene_type, limit):
+        replay = leaderboard.get_replay(entry["id"])
+        if replay is None:
+            print(f"成绩{entry['id']}: 没有回放，跳过")
+            continue
+        try:
+            initial_state = decode_replay(replay)[0]
+            scene = enter_game(engine, {
+                "difficulty": initial_state.difficulty, "scene": initial_state.scene_type,
+                "world_width": initial_state.world_width, "world_height": initial_state.world_height
+            })
+            state = replay_game(scene, replay)
+        except ValueError as e:
+            errors.append(f"成绩{entry['id']}: {e}")
+            continue
+        if (state.score, len(state.snake.positions)) != (entry["score"], entry["length"]):
+            errors.append(
+                f"成绩{entry['id']}: 记录{entry['score']}分/长度{entry['length']}，"
+                f"重现{state.score}分/长度{len(state.snake.positions)}"
+            )
+        else:
+            print(f"成绩{entry['id']}: {entry['player']} {entry['score']}分，重现一致")
+    return errors
+
+
+def main():
+    """回放检查命令行入口"""
+    parser = argparse.ArgumentParser(description="回放检查")
+    parser.add_argument("--games", type=int, default=5, help="随机对局数")
+    parser.add_argument("--difficulty", default="hard", help="难度")
+    parser.add_argument("--scene", default="day", help="场景类型")
+    parser.add_argument("--max-frames", type=int, default=50000, help="每局最多运行的帧数")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--leaderboard", help="改为检查这个排行榜数据库中前几名的回放")
+    parser.add_argument("--limit", type=int, default=10, help="检查排行榜中的成绩数")
+    args = parser.parse_args()
+
+    # 检查中结束的游戏不写入玩家的排行榜和自动存档
+    config.SAVES_DIR = tempfile.mkdtemp()
+    engine = GameEngine()
+
+    if args.leaderboard:
+        leaderboard = Leaderboard(args.leaderboard)
+        errors = check_leaderboard(engine, leaderboard, args.difficulty, args.scene, args.limit)
+    else:
+        settings = {"difficulty": args.difficulty, "scene": args.scene}
+        errors = check_games(engine, args.games, settings, random.Random(args.seed), args.max_frames)
+
+    # 事件订阅者的累计开销（游戏场景在各局之间复用，包括所有对局和重现）
+    scene = engine.scene_manager.current_scene
+    if scene is not None and hasattr(scene, "events"):
+        for name, cost in scene.events.report().items():
+            print(f"事件订阅者 {name}: {cost}")
+
+    for error in errors:
+        print(error)
+    print(f"失败{len(errors)}个")
+    raise SystemExit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+存档往返检查
+无界面地运行游戏场景，反复执行 存档 → 读档 → 观战编码/解码，
+检查读档后的状态与存档前一致，并且观战编码器能处理读档后的状态
+"""
+
+import os
+import argparse
+import random
+import tempfile
+
+# 无界面运行（必须在导入pygame之前设置）
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import config
+from game_engine import GameEngine
+from server.protocol import FrameDecoder
+from server.stream import SpectatorEncoder, SpectatorDecoder, spectator_state
+from utils.save_state import capture_state
+
+# 检查时随机选择的方向
+DIRECTION_CHOICES = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+
+def check_round_trip(scene, rounds, rng):
+    """
+    反复存档、读档并编码观战状态
+
+    参数:
+        scene: 已进入的游戏场景
+        rounds: 检查次数
+        rng: 随机数生成器（选择方向和能力）
+
+    返回:
+        list: 错误信息，全部通过时为空列表
+    """
+    errors = []
+    encoder = SpectatorEncoder(scene.world_width, scene.world_height)
+    decoder = SpectatorDecoder(scene.world_width, scene.world_height)
+    frames = FrameDecoder()
+
+    for round_index in range(rounds):
+        # 打开能力，让存档中的计时不为零
+        if rng.random() < 0.5:
+            scene.snake.activate_shield()
+        if rng.random() < 0.5:
+            scene.snake.activate_speed_boost()
+        scene.snake.set_direction(rng.choice(DIRECTION_CHOICES))
+        for _ in range(rng.randint(1, 30)):
+            scene.update(1 / 60)
+            if scene.game_over:
+                scene.game_over = False
+
+        before = capture_state(scene)
+        scene.load_state(scene.save_state())
+        after = capture_state(scene)
+        if spectator_state(after) != spectator_state(before):
+            errors.append(f"第{round_index}次: 读档后的观战状态与存档前不一致")
+
+        try:
+            state = spectator_state(after)
+            for message_type, payload in frames.feed(encoder.encode(state)):
+                if decoder.decode(message_type, payload) != state:
+                    errors.append(f"第{round_index}次: 观战解码结果与编码前不一致")
+        except (TypeError, ValueError) as e:
+            errors.append(f"第{round_index}次: 读档后无法编码观战状态: {e}")
+    return errors
+
+
+def main():
+    """存档往返检查命令行入口"""
+    parser = argparse.ArgumentParser(description="存档往返检查")
+    parser.add_argument("--rounds", type=int, default=50, help="检查次数")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    args = parser.parse_args()
+
+    # 检查中结束的游戏不写入玩家的排行榜和自动存档
+    config.SAVES_DIR = tempfile.mkdtemp()
+    engine = GameEngine()
+    engine.change_scene("game")
+    scene = engine.scene_manager.current_scene
+    errors = check_round_trip(scene, args.rounds, random.Random(args.seed))
+
+    for error in errors:
+        print(error)
+    print(f"检查{args.rounds}次，失败{len(errors)}次")
+    raise SystemExit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,15 @@ import math
 from config import PVZ_GREEN, PVZ_DARK_GREEN, WHITE, PVZ_BROWN, FONT_SIZES
 
 class Button:
-    """基础按钮类"""
+    """
+    基础按钮类
+    每个状态（正常、悬停、按下）的外观预渲染成一张图像并缓存，
+    文本、尺寸或颜色改变时才重新渲染，每帧只需一次blit。
+    由UIManager管理时，悬停和按下状态由UIManager统一设置，不经过handle_event。
+    """
+    
+    # 是否有持续的动画（有动画的按钮每次刷新都要重绘，动画足够慢，空闲帧率下也是平滑的）
+    animated = False
     
     def __init__(self, x, y, width, height, text="", callback=None,
                  bg_color=PVZ_GREEN, hover_color=None, border_color=PVZ_DARK_GREEN,
@@ -20,6 +28,7 @@ class Button:
         self.callback = callback
         self.bg_color = bg_color
         self.hover_color = hover_color or tuple(min(c + 30, 255) for c in bg_color)
+        self.pressed_color = tuple(max(c - 30, 0) for c in bg_color)
         self.border_color = border_color
         self.text_color = text_color
         self.font_size = font_size
@@ -31,6 +40,10 @@ class Button:
         self.hovered = False
         self.pressed = False
         self.ui_manager = None  # 将在添加到UI管理器时设置
+        
+        # 状态图像缓存 {state: Surface}，以及生成这些图像时的外观参数
+        self._sprites = {}
+        self._sprite_key = None
     
     def handle_event(self, event):
         """处理事件"""
@@ -47,27 +60,114 @@ class Button:
             if event.button == 1 and self.pressed:
                 self.pressed = False
                 if self.hovered:
-                    # 点击声音
-                    if self.sound and self.ui_manager:
-                        self.ui_manager.resource_loader.play_sound(self.sound)
-                    
-                    # 执行回调
-                    if self.callback:
-                        self.callback()
+                    self.click()
                     return True
         
         return False
     
+    def click(self):
+        """触发按钮点击（播放声音并执行回调）"""
+        # 点击声音
+        if self.sound and self.ui_manager:
+            self.ui_manager.resource_loader.play_sound(self.sound)
+        
+        # 执行回调
+        if self.callback:
+            self.callback()
+    
+    def update(self, delta_time):
+        """更新按钮状态（基础按钮没有动画）"""
+        pass
+    
+    @property
+    def state(self):
+        """当前外观状态：'normal'、'hover'或'pressed'"""
+        if self.pressed:
+            return "pressed"
+        if self.hovered:
+            return "hover"
+        return "normal"
+    
+    def _appearance_key(self):
+        """
+        获取决定按钮外观的参数，参数变化时缓存的图像失效
+        
+        返回:
+            tuple: 外观参数
+        """
+        return (
+            self.text, self.rect.size, self.bg_color, self.hover_color, self.pressed_color,
+            self.border_color, self.text_color, self.font_size,
+            self.border_radius, self.border_width, self.ui_manager is not None
+        )
+    
+    def get_sprite(self, state=None):
+        """
+        获取指定状态的按钮图像（首次使用或外观改变时渲染）
+        
+        参数:
+            state: 按钮状态，如果为None则使用当前状态
+            
+        返回:
+            pygame.Surface: 按钮图像
+        """
+        key = self._appearance_key()
+        if key != self._sprite_key:
+            self._sprites = {}
+            self._sprite_key = key
+        
+        state = state or self.state
+        sprite = self._sprites.get(state)
+        if sprite is None:
+            sprite = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            self._draw(sprite, sprite.get_rect(), state)
+            self._sprites[state] = sprite
+        return sprite
+    
+    def get_blit_position(self):
+        """
+        获取按钮图像的绘制位置
+        
+        返回:
+            tuple: 屏幕坐标 (x, y)
+        """
+        return self.rect.topleft
+    
+    def get_bounds(self):
+        """
+        获取按钮可能绘制到的区域（局部刷新时使用）
+        
+        返回:
+            pygame.Rect: 屏幕区域
+        """
+        return self.rect
+    
     def render(self, surface):
         """渲染按钮"""
+        surface.blit(self.get_sprite(), self.get_blit_position())
+    
+    def _draw(self, surface, rect, state):
+        """
+        绘制按钮外观（只在渲染缓存图像时调用）
+        
+        参数:
+            surface: 渲染目标表面
+            rect: 按钮在目标表面上的矩形
+            state: 按钮状态
+        """
         # 确定当前颜色
-        current_color = self.hover_color if self.hovered else self.bg_color
+        if state == "pressed":
+            current_color = self.pressed_color
+        elif state == "hover":
+            current_color = self.hover_color
+        else:
+            current_color = self.bg_color
         
         # 绘制按钮背景
-        pygame.draw.rect(surface, current_color, self.rect, border_radius=self.border_radius)
+        pygame.draw.rect(surface, current_color, rect, border_radius=self.border_radius)
         
         # 绘制边框
-        pygame.draw.rect(surface, self.border_color, self.rect, 
+        pygame.draw.rect(surface, self.border_color, rect, 
                         width=self.border_width, border_radius=self.border_radius)
         
         # 如果有文本，绘制文本
@@ -77,7 +177,7 @@ class Button:
             # 获取字体
             font = self.ui_manager.font_manager.get_font(self.ui_manager.font_manager.system_font, font_size_value)
             text_surface = font.render(self.text, True, self.text_color)
-            text_rect = text_surface.get_rect(center=self.rect.center)
+            text_rect = text_surface.get_rect(center=rect.center)
             surface.blit(text_surface, text_rect)
 
 class WoodButton(Button):
@@ -93,22 +193,28 @@ class WoodButton(Button):
         # 木质风格特有参数
         self.wood_lines = 3  # 木纹线条数量
     
-    def render(self, surface):
-        """渲染木质按钮"""
+    def _appearance_key(self):
+        """获取决定按钮外观的参数（包括木纹数量）"""
+        return super()._appearance_key() + (self.wood_lines,)
+    
+    def _draw(self, surface, rect, state):
+        """绘制木质按钮外观"""
         # 绘制基础按钮
-        super().render(surface)
+        super()._draw(surface, rect, state)
         
         # 添加木纹纹理
         for i in range(self.wood_lines):
-            y_pos = self.rect.y + (i + 1) * self.rect.height // (self.wood_lines + 1)
+            y_pos = rect.y + (i + 1) * rect.height // (self.wood_lines + 1)
             pygame.draw.line(surface, (101, 67, 33), 
-                           (self.rect.x + 10, y_pos),
-                           (self.rect.x + self.rect.width - 10, y_pos),
+                           (rect.x + 10, y_pos),
+                           (rect.x + rect.width - 10, y_pos),
                            2)
 
 class AnimatedButton(Button):
     """带有动画效果的按钮"""
     
+    animated = True
+    
     def __init__(self, x, y, width, height, text="", callback=None,
                  bg_color=PVZ_GREEN, hover_color=None, border_color=PVZ_DARK_GREEN,
                  text_color=WHITE, font_size="medium", border_radius=10, border_width=3,
@@ -123,23 +229,22 @@ class AnimatedButton(Button):
         self.animation_speed = animation_speed
     
     def update(self, delta_time):
-        """更新按钮动画"""
-        self.animation_offset = (self.animation_offset + self.animation_speed) % (math.pi * 2)
+        """
+        更新按钮动画（animation_speed为60帧每秒时每帧的相位增量，与实际帧率无关）
+        
+        默认速度下浮动每秒最多移动约9像素，空闲帧率下每帧不到1像素
+        """
+        self.animation_offset = (self.animation_offset + self.animation_speed * 60 * delta_time) % (math.pi * 2)
     
-    def render(self, surface):
-        """渲染带有动画效果的按钮"""
+    def get_blit_position(self):
+        """获取按钮图像的绘制位置（上下浮动，不修改按钮矩形）"""
         # 计算动画偏移量
         y_offset = int(math.sin(self.animation_offset) * 3)
-        
-        # 临时调整按钮位置
-        original_pos = self.rect.topleft
-        self.rect.y += y_offset
-        
-        # 绘制基础按钮
-        super().render(surface)
-        
-        # 恢复原位置
-        self.rect.topleft = original_pos
+        return (self.rect.x, self.rect.y + y_offset)
+    
+    def get_bounds(self):
+        """获取按钮可能绘制到的区域（包括上下浮动的范围）"""
+        return self.rect.inflate(0, 6)
 
 class IconButton(Button):
     """带有图标的按钮"""
@@ -157,25 +262,27 @@ class IconButton(Button):
         self.icon_name = icon_name
         self.icon = None
     
-    def render(self, surface):
-        """渲染带有图标的按钮"""
+    def _appearance_key(self):
+        """获取决定按钮外观的参数（包括图标）"""
+        # 如果有图标并且UI管理器存在，先加载图标
+        if self.icon_name and self.ui_manager and not self.icon:
+            self.icon = self.ui_manager.resource_loader.load_image(self.icon_name)
+        return super()._appearance_key() + (self.icon_name, self.icon is not None)
+    
+    def _draw(self, surface, rect, state):
+        """绘制带有图标的按钮外观"""
         # 绘制基础按钮
-        super().render(surface)
+        super()._draw(surface, rect, state)
         
-        # 如果有图标并且UI管理器存在，加载并绘制图标
-        if self.icon_name and self.ui_manager:
-            if not self.icon:
-                self.icon = self.ui_manager.resource_loader.load_image(self.icon_name)
+        if self.icon:
+            # 计算图标位置
+            if self.text:
+                # 如果有文本，将图标放在文本左侧
+                icon_rect = self.icon.get_rect(
+                    midright=(rect.centerx - 10, rect.centery)
+                )
+            else:
+                # 如果没有文本，将图标放在中央
+                icon_rect = self.icon.get_rect(center=rect.center)
             
-            if self.icon:
-                # 计算图标位置
-                if self.text:
-                    # 如果有文本，将图标放在文本左侧
-                    icon_rect = self.icon.get_rect(
-                        midright=(self.rect.centerx - 10, self.rect.centery)
-                    )
-                else:
-                    # 如果没有文本，将图标放在中央
-                    icon_rect = self.icon.get_rect(center=self.rect.center)
-                
-                surface.blit(self.icon, icon_rect) 
\ No newline at end of file
+            surface.blit(self.icon, icon_rect)
@@ -0,0 +1,59 @@
+"""
+UI命中检测网格
+把屏幕划分成均匀的格子，记录每个格子覆盖到的控件，鼠标命中检测只需检查一个格子
+"""
+
+from config import UI_HIT_GRID_CELL
+
+
+class UIHitGrid:
+    """
+    UI命中检测网格类
+    控件按矩形登记到它覆盖的所有格子里。查询时只检查鼠标所在格子中的控件，
+    与控件总数无关。控件集合变化时（切换按钮组）整体重建。
+    """
+
+    def __init__(self, cell_size=UI_HIT_GRID_CELL):
+        """
+        初始化命中检测网格
+
+        参数:
+            cell_size: 格子边长（像素）
+        """
+        self.cell_size = cell_size
+
+        # 网格 {(cell_x, cell_y): [widget]}，同一格子内按绘制顺序排列
+        self.cells = {}
+
+    def rebuild(self, widgets):
+        """
+        重建网格
+
+        参数:
+            widgets: 控件列表（需要有rect属性），按绘制顺序排列
+        """
+        self.cells = {}
+        size = self.cell_size
+        for widget in widgets:
+            rect = widget.rect
+            for cell_y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                for cell_x in range(rect.left // size, (rect.right - 1) // size + 1):
+                    self.cells.setdefault((cell_x, cell_y), []).append(widget)
+
+    def hit_test(self, pos):
+        """
+        查找位于指定位置的控件
+
+        参数:
+            pos: 屏幕坐标 (x, y)
+
+        返回:
+            控件，如果没有则返回None；重叠时返回最后绘制（最上层）的控件
+        """
+        candidates = self.cells.get((pos[0] // self.cell_size, pos[1] // self.cell_size))
+        if not candidates:
+            return None
+        for widget in reversed(candidates):
+            if widget.rect.collidepoint(pos):
+                return widget
+        return None
@@ -4,7 +4,12 @@ UI管理器
 """
 
 import pygame
+from config import DIFFICULTY_LEVELS, DEFAULT_SETTINGS
 from ui.buttons import Button, AnimatedButton, IconButton
+from ui.hit_grid import UIHitGrid
+
+# UI只关心的事件类型，其他事件直接交给场景
+UI_EVENT_TYPES = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
 
 class UIManager:
     """
@@ -32,6 +37,14 @@ class UIManager:
         self.button_groups = {}  # 按钮组 {group_name: [button_names]}
         self.active_group = None  # 当前活动的按钮组
         
+        # 事件路由：活动按钮的命中检测网格，以及当前悬停和按下的按钮
+        self.hit_grid = UIHitGrid()
+        self.hovered_button = None
+        self.pressed_button = None
+        
+        # 上次刷新屏幕后外观发生变化的区域（局部刷新时使用）
+        self.dirty_rects = []
+        
         # 初始化UI
         self._init_ui()
     
@@ -83,6 +96,18 @@ class UIManager:
         exit_button.ui_manager = self
         self.buttons["exit_button"] = exit_button
         
+        # 创建难度按钮（点击切换到下一个难度）
+        difficulty_button = AnimatedButton(
+            window_width // 2 - 100,
+            window_height // 2 + 140,
+            200, 50,
+            self._difficulty_text(),
+            lambda: self._cycle_difficulty(),
+            sound="menu_click"
+        )
+        difficulty_button.ui_manager = self
+        self.buttons["difficulty_button"] = difficulty_button
+        
         # 创建返回按钮
         back_button = AnimatedButton(
             window_width // 2 - 100,
@@ -125,7 +150,7 @@ class UIManager:
         self.button_groups["main_menu"] = ["start_button", "settings_button", "exit_button"]
         
         # 设置菜单按钮组
-        self.button_groups["settings"] = ["back_button"]
+        self.button_groups["settings"] = ["difficulty_button", "back_button"]
         
         # 游戏结束按钮组
         self.button_groups["game_over"] = ["restart_button", "menu_button", "exit_button"]
@@ -144,12 +169,57 @@ class UIManager:
             group_name: 按钮组名称
         """
         if group_name in self.button_groups:
-            self.active_group = group_name
-            self.active_buttons = [self.buttons[name] for name in self.button_groups[group_name]]
+            self._set_active_buttons(group_name, [self.buttons[name] for name in self.button_groups[group_name]])
+            
+            # 按当前鼠标位置恢复悬停状态，不必等到下一次鼠标移动
+            if pygame.mouse.get_focused():
+                self._set_hovered(self.hit_grid.hit_test(pygame.mouse.get_pos()))
+    
+    def clear_active_group(self):
+        """清除活动的按钮组（不显示任何按钮）"""
+        self._set_active_buttons(None, [])
+    
+    def _set_active_buttons(self, group_name, buttons):
+        """
+        替换活动按钮，重置悬停和按下状态并重建命中检测网格
+        
+        参数:
+            group_name: 按钮组名称，可以为None
+            buttons: 按钮列表
+        """
+        for button in self.active_buttons:
+            button.hovered = False
+            button.pressed = False
+            self.dirty_rects.append(button.get_bounds())
+        self.hovered_button = None
+        self.pressed_button = None
+        
+        self.active_group = group_name
+        self.active_buttons = buttons
+        self.dirty_rects.extend(button.get_bounds() for button in buttons)
+        self.hit_grid.rebuild(buttons)
+    
+    def _set_hovered(self, button):
+        """
+        切换悬停的按钮
+        
+        参数:
+            button: 新的悬停按钮，可以为None
+        """
+        if button is self.hovered_button:
+            return
+        if self.hovered_button:
+            self.hovered_button.hovered = False
+            self.dirty_rects.append(self.hovered_button.get_bounds())
+        if button:
+            button.hovered = True
+            self.dirty_rects.append(button.get_bounds())
+        self.hovered_button = button
     
     def handle_event(self, event):
         """
         处理UI事件
+        只处理鼠标事件，通过命中检测网格找到鼠标下的按钮，只把事件交给这一个按钮
         
         参数:
             event: Pygame事件对象
@@ -157,16 +227,37 @@ class UIManager:
         返回:
             bool: 事件是否被处理
         """
-        # 如果没有活动按钮，直接返回
-        if not self.active_buttons:
+        # 非鼠标事件或没有活动按钮，直接返回
+        if event.type not in UI_EVENT_TYPES or not self.active_buttons:
             return False
         
-        # 处理按钮事件
-        for button in self.active_buttons:
-            if button.handle_event(event):
+        if event.type == pygame.MOUSEMOTION:
+            self._set_hovered(self.hit_grid.hit_test(event.pos))
+            return self.hovered_button is not None
+        
+        if event.button != 1:
+            return False
+        
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            button = self.hit_grid.hit_test(event.pos)
+            self._set_hovered(button)
+            if button:
+                button.pressed = True
+                self.pressed_button = button
+                self.dirty_rects.append(button.get_bounds())
                 return True
+            return False
         
-        return False
+        # 鼠标抬起：只有在按下的同一个按钮上抬起才算点击
+        button = self.pressed_button
+        if not button:
+            return False
+        button.pressed = False
+        self.pressed_button = None
+        self.dirty_rects.append(button.get_bounds())
+        if self.hit_grid.hit_test(event.pos) is button:
+            button.click()
+        return True
     
     def update(self, delta_time):
         """
@@ -179,6 +270,18 @@ class UIManager:
         for button in self.active_buttons:
             button.update(delta_time)
     
+    def take_dirty_rects(self):
+        """
+        取出上次刷新后需要重绘的区域（有动画的按钮每帧都需要重绘）
+        
+        返回:
+            list: 屏幕区域列表
+        """
+        rects = self.dirty_rects
+        rects.extend(button.get_bounds() for button in self.active_buttons if button.animated)
+        self.dirty_rects = []
+        return rects
+    
     def render(self, surface):
         """
         渲染UI
@@ -186,9 +289,12 @@ class UIManager:
         参数:
             surface: 渲染目标表面
         """
-        # 渲染活动按钮
-        for button in self.active_buttons:
-            button.render(surface)
+        # 活动按钮都有预渲染的状态图像，一次blits批量绘制
+        if self.active_buttons:
+            surface.blits([
+                (button.get_sprite(), button.get_blit_position())
+                for button in self.active_buttons
+            ], doreturn=False)
     
     def on_pause_changed(self, paused):
         """
@@ -200,7 +306,25 @@ class UIManager:
         if paused:
             self.set_active_group("pause_menu")
         else:
-            self.active_buttons = []
+            self.clear_active_group()
+    
+    def _difficulty_text(self):
+        """难度按钮上显示的文本"""
+        difficulty = self.game_engine.settings.get("difficulty", DEFAULT_SETTINGS["difficulty"])
+        return f"难度: {DIFFICULTY_LEVELS.get(difficulty, {}).get('name', difficulty)}"
+    
+    def _cycle_difficulty(self):
+        """切换到下一个难度（下一局游戏开始时生效）"""
+        levels = list(DIFFICULTY_LEVELS)
+        difficulty = self.game_engine.settings.get("difficulty", DEFAULT_SETTINGS["difficulty"])
+        index = levels.index(difficulty) + 1 if difficulty in levels else 0
+        self.game_engine.set_setting("difficulty", levels[index % len(levels)])
+    
+    def on_difficulty_changed(self):
+        """难度设置变化后更新难度按钮上的文本"""
+        button = self.buttons["difficulty_button"]
+        button.text = self._difficulty_text()
+        self.dirty_rects.append(button.get_bounds())
     
     def _exit_game(self):
         """退出游戏"""
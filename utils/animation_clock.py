@@ -0,0 +1,122 @@
+"""
+动画时钟
+所有食物和障碍物共用一个按真实时间推进的相位，每个实体只保存自己的相位偏移（查找表下标），
+悬浮等周期动画从预先计算的正弦查找表中批量取值，不需要每帧对每个实体调用math.sin
+"""
+
+import math
+import random
+from config import ANIMATION
+
+
+class AnimationClock:
+    """
+    动画时钟类
+    一个周期分成table_size个相位，实体的当前相位 = (时钟相位 + 实体相位偏移) % table_size。
+    时钟按delta_time推进，动画速度与帧率无关。
+    """
+
+    def __init__(self, phase_speed=None, table_size=None):
+        """
+        初始化动画时钟
+
+        参数:
+            phase_speed: 角速度（弧度/秒），如果为None则使用配置中的值
+            table_size: 正弦查找表大小（必须是2的幂），如果为None则使用配置中的值
+        """
+        self.table_size = table_size or ANIMATION["sine_table_size"]
+        self.mask = self.table_size - 1
+        self.steps_per_second = (phase_speed or ANIMATION["phase_speed"]) * self.table_size / (math.pi * 2)
+        self.sine_table = [math.sin(math.pi * 2 * i / self.table_size) for i in range(self.table_size)]
+        self.offset_tables = {}  # 按振幅缓存的整数偏移表 {振幅: [int(sin * 振幅)]}
+        self.time = 0.0
+        self.phase = 0
+
+    def advance(self, delta_time):
+        """
+        推进时钟
+
+        参数:
+            delta_time: 时间增量（秒）
+        """
+        period = self.table_size / self.steps_per_second
+        self.time = (self.time + delta_time) % period
+        self.phase = int(self.time * self.steps_per_second) & self.mask
+
+    def random_phase(self):
+        """
+        随机的相位偏移（新实体使用，避免所有实体同步摆动）
+
+        返回:
+            int: 相位偏移
+        """
+        return int(random.random() * self.table_size)
+
+    def to_radians(self, phase):
+        """
+        把实体的相位偏移换算成当前的绝对相位（弧度），用于存档
+
+        参数:
+            phase: 实体的相位偏移
+
+        返回:
+            float: 当前相位（弧度，0到2π）
+        """
+        return ((self.phase + phase) & self.mask) * math.pi * 2 / self.table_size
+
+    def from_radians(self, radians):
+        """
+        把存档中的绝对相位换算成相对当前时钟的相位偏移
+
+        参数:
+            radians: 相位（弧度）
+
+        返回:
+            int: 相位偏移
+        """
+        return (round(radians * self.table_size / (math.pi * 2)) - self.phase) & self.mask
+
+    def offsets(self, phases, amplitudes):
+        """
+        批量计算整数像素偏移 int(sin(相位) * 振幅)
+
+        参数:
+            phases: 相位偏移序列
+            amplitudes: 振幅序列（与phases一一对应）
+
+        返回:
+            list: 像素偏移
+        """
+        tables = {amplitude: self.offset_table(amplitude) for amplitude in set(amplitudes)}
+        clock_phase, mask = self.phase, self.mask
+        return [tables[amplitude][(clock_phase + phase) & mask] for phase, amplitude in zip(phases, amplitudes)]
+
+    def offset_table(self, amplitude):
+        """
+        获取某个振幅的整数偏移表（按相位索引，第一次使用时生成）
+        
+        参数:
+            amplitude: 振幅
+
+        返回:
+            list: int(sin(相位) * 振幅)
+        """
+        table = self.offset_tables.get(amplitude)
+        if table is None:
+            table = self.offset_tables[amplitude] = [int(value * amplitude) for value in self.sine_table]
+        return table
+
+    def samples(self, phases, amplitude=1.0, harmonic=1):
+        """
+        批量计算 sin(相位 * harmonic) * amplitude
+
+        参数:
+            phases: 相位偏移序列
+            amplitude: 振幅
+            harmonic: 频率倍数
+
+        返回:
+            list: 采样值
+        """
+        table, clock_phase, mask = self.sine_table, self.phase, self.mask
+        return [table[((clock_phase + phase) * harmonic) & mask] * amplitude for phase in phases]
@@ -0,0 +1,233 @@
+"""
+音频管理器
+按类别（界面、游戏、环境）给音效预留混音通道，限制每个音效同时播放的数量，
+冷却时间内的重复触发直接忽略，重要音效播放时压低背景音乐
+"""
+
+import time
+import pygame
+from config import AUDIO, SOUND_POLICIES
+
+# 没有在SOUND_POLICIES中声明的音效使用的策略
+DEFAULT_SOUND_POLICY = {
+    "category": "gameplay",  # 通道类别
+    "max_voices": 2,  # 同时播放的最大数量
+    "cooldown": 0.0,  # 两次触发之间的最短间隔（秒）
+    "priority": 1,  # 优先级，通道不够时可以抢占优先级不高于自己的音效
+    "duck": False  # 播放时是否压低背景音乐
+}
+
+
+def init_mixer():
+    """
+    按配置初始化混音器（缓冲区越小延迟越低，但太小会出现爆音）
+
+    返回:
+        bool: 混音器是否可用
+    """
+    if pygame.mixer.get_init():
+        return True
+    try:
+        pygame.mixer.init(**AUDIO["mixer"])
+        return True
+    except pygame.error as e:
+        print(f"警告: 无法初始化混音器: {e}")
+        return False
+
+
+class AudioManager:
+    """
+    音频管理器类
+    每个类别独占一段通道（通道被预留，pygame不会把它们分给其他音效），
+    通道用完时抢占同类别中优先级最低、播放最久的音效，都比当前音效重要时放弃播放。
+    """
+
+    def __init__(self, music_volume=0.7):
+        """
+        初始化音频管理器
+
+        参数:
+            music_volume: 背景音乐音量
+        """
+        self.policies = {}  # 缓存合并了缺省值的策略 {音效名称: 策略}
+        self.category_channels = {}  # {类别: [通道下标]}
+        self.channels = []  # 通道对象
+        self.voices = []  # 每个通道上的音效 (音效名称, 优先级, 开始时间)，空闲为None
+        self.last_played = {}  # {音效名称: 上次触发的时间}
+        self.music_volume = music_volume
+        self.duck_until = 0.0  # 背景音乐压低到这个时间为止
+
+        # 统计
+        self.played = 0
+        self.throttled = 0  # 冷却时间内被忽略的次数
+        self.stolen = 0  # 抢占其他音效的次数
+        self.dropped = 0  # 没有可用通道而放弃的次数
+
+        if pygame.mixer.get_init():
+            self._reserve_channels()
+
+    def _reserve_channels(self):
+        """按类别分配并预留通道"""
+        categories = AUDIO["categories"]
+        reserved = sum(categories.values())
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), reserved + AUDIO["free_channels"]))
+        pygame.mixer.set_reserved(reserved)
+
+        index = 0
+        for category, count in categories.items():
+            self.category_channels[category] = list(range(index, index + count))
+            index += count
+        self.channels = [pygame.mixer.Channel(i) for i in range(reserved)]
+        self.voices = [None] * reserved
+
+    def policy(self, name):
+        """
+        获取音效的播放策略
+
+        参数:
+            name: 音效名称
+
+        返回:
+            dict: 播放策略
+        """
+        policy = self.policies.get(name)
+        if policy is None:
+            policy = self.policies[name] = {**DEFAULT_SOUND_POLICY, **SOUND_POLICIES.get(name, {})}
+        return policy
+
+    def play(self, name, sound):
+        """
+        按策略播放音效
+
+        参数:
+            name: 音效名称
+            sound: pygame.mixer.Sound对象
+
+        返回:
+            pygame.mixer.Channel: 播放音效的通道，没有播放时返回None
+        """
+        if not self.channels:
+            return None
+
+        policy = self.policy(name)
+        now = time.perf_counter()
+
+        # 冷却时间内的重复触发
+        if now - self.last_played.get(name, -1e9) < policy["cooldown"]:
+            self.throttled += 1
+            return None
+
+        channel_indices = self.category_channels.get(policy["category"])
+        if not channel_indices:
+            print(f"警告: 音效 {name} 的类别 {policy['category']} 没有通道")
+            return None
+
+        index = self._pick_channel(name, policy, channel_indices)
+        if index is None:
+            self.dropped += 1
+            return None
+
+        self.channels[index].play(sound)
+        self.voices[index] = (name, policy["priority"], now)
+        self.last_played[name] = now
+        self.played += 1
+
+        if policy["duck"]:
+            self.duck(now)
+        return self.channels[index]
+
+    def _pick_channel(self, name, policy, channel_indices):
+        """
+        选择播放音效的通道
+
+        参数:
+            name: 音效名称
+            policy: 播放策略
+            channel_indices: 类别的通道下标
+
+        返回:
+            int: 通道下标，没有可用通道时返回None
+        """
+        free = None
+        same_sound = []
+        candidates = []
+        for index in channel_indices:
+            voice = self.voices[index]
+            if voice is None or not self.channels[index].get_busy():
+                self.voices[index] = None
+                if free is None:
+                    free = index
+                continue
+            if voice[0] == name:
+                same_sound.append(index)
+            if voice[1] <= policy["priority"]:
+                candidates.append(index)
+
+        # 同一个音效达到数量上限时重新开始最早的那个
+        if len(same_sound) >= policy["max_voices"]:
+            self.stolen += 1
+            return min(same_sound, key=lambda i: self.voices[i][2])
+
+        if free is not None:
+            return free
+
+        # 抢占优先级最低、播放最久的音效
+        if candidates:
+            self.stolen += 1
+            return min(candidates, key=lambda i: (self.voices[i][1], self.voices[i][2]))
+        return None
+
+    def duck(self, now=None):
+        """
+        压低背景音乐，duck_time秒后恢复
+
+        参数:
+            now: 当前时间，如果为None则读取时钟
+        """
+        if now is None:
+            now = time.perf_counter()
+        self.duck_until = now + AUDIO["duck_time"]
+        pygame.mixer.music.set_volume(self.music_volume * AUDIO["duck_volume"])
+
+    def update(self):
+        """恢复压低时间已到的背景音乐（每帧调用）"""
+        if self.duck_until and time.perf_counter() >= self.duck_until:
+            self.duck_until = 0.0
+            pygame.mixer.music.set_volume(self.music_volume)
+
+    def set_music_volume(self, volume):
+        """
+        设置背景音乐音量（压低期间只记录，恢复时生效）
+
+        参数:
+            volume: 音量值，范围0.0-1.0
+        """
+        self.music_volume = volume
+        if self.duck_until:
+            volume *= AUDIO["duck_volume"]
+        pygame.mixer.music.set_volume(volume)
+
+    def stop_category(self, category):
+        """
+        停止一个类别的所有音效
+
+        参数:
+            category: 类别
+        """
+        for index in self.category_channels.get(category, ()):
+            self.channels[index].stop()
+            self.voices[index] = None
+
+    def report(self):
+        """
+        汇总播放统计
+
+        返回:
+            dict: 播放、忽略、抢占和放弃的次数
+        """
+        return {
+            "played": self.played,
+            "throttled": self.throttled,
+            "stolen": self.stolen,
+            "dropped": self.dropped
+        }
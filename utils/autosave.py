@@ -0,0 +1,169 @@
+"""
+自动存档
+在后台线程中把游戏状态压缩写入磁盘，游戏主循环从不等待磁盘读写
+"""
+
+import os
+import threading
+import zlib
+from config import AUTOSAVE
+from utils.save_state import encode_state
+
+# 待处理请求：删除存档
+_DISCARD = object()
+
+
+class AutosaveWriter:
+    """
+    自动存档写入器类
+    游戏线程只提交不可变的状态快照，写入线程负责编码、压缩、写入临时文件并原子替换。
+    写入线程忙时提交的多个快照会合并，只写入最新的一个。
+    """
+
+    def __init__(self, path, compression_level=None):
+        """
+        初始化自动存档写入器
+
+        参数:
+            path: 存档文件路径
+            compression_level: zlib压缩级别，如果为None则使用配置中的值
+        """
+        self.path = path
+        self.compression_level = (
+            compression_level if compression_level is not None else AUTOSAVE["compression_level"]
+        )
+
+        # 待写入的快照（或删除请求），只保留最新的一个
+        self._pending = None
+        self._busy = False
+        self._stopping = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+        # 统计信息
+        self.writes = 0
+        self.coalesced = 0
+
+    def _ensure_thread(self):
+        """首次提交时启动写入线程"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="autosave-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, state):
+        """
+        提交要保存的状态快照（立即返回）
+
+        参数:
+            state: GameState状态快照（不可变）
+        """
+        with self._condition:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = state
+            self._ensure_thread()
+            self._condition.notify_all()
+
+    def discard(self):
+        """删除存档（游戏结束或放弃本局时调用），会取消尚未写入的快照"""
+        with self._condition:
+            self._pending = _DISCARD
+            self._ensure_thread()
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        等待所有待处理的请求完成
+
+        参数:
+            timeout: 最长等待时间（秒），如果为None则一直等待
+
+        返回:
+            bool: 是否已全部完成
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._pending is None and not self._busy, timeout
+            )
+
+    def stop(self, timeout=5.0):
+        """
+        写完待处理的请求后停止写入线程
+
+        参数:
+            timeout: 最长等待时间（秒）
+        """
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        """写入线程主循环"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._stopping)
+                request = self._pending
+                if request is None:
+                    return
+                self._pending = None
+                self._busy = True
+
+            try:
+                if request is _DISCARD:
+                    self._remove()
+                else:
+                    self._write(request)
+            except Exception as e:
+                print(f"自动存档失败: {e}")
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _write(self, state):
+        """
+        编码、压缩并原子地写入存档（在写入线程中执行）
+
+        参数:
+            state: GameState状态快照
+        """
+        data = zlib.compress(encode_state(state), self.compression_level)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # 先写临时文件并同步到磁盘，再原子替换，断电时旧存档仍然完整
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.writes += 1
+
+    def _remove(self):
+        """删除存档文件（在写入线程中执行）"""
+        for path in (self.path, self.path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def load(self):
+        """
+        读取存档
+
+        返回:
+            bytes: 解压后的二进制存档，如果没有存档或存档损坏返回None
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                return zlib.decompress(f.read())
+        except (OSError, zlib.error) as e:
+            print(f"读取自动存档失败: {e}")
+            return None
@@ -0,0 +1,220 @@
+"""
+背景分块缓存
+把草坪背景切分成固定大小的区块，首次可见时才渲染，并用LRU限制内存占用
+"""
+
+import random
+from collections import OrderedDict
+import pygame
+from config import GRID_SIZE, BACKGROUND_CHUNK_SIZE, BACKGROUND_CACHE_BUDGET
+
+
+class BackgroundChunkCache:
+    """
+    背景区块缓存类
+    每个区块是一张预渲染的Surface，包含棋盘格草地和场景装饰。
+    装饰使用按区块坐标生成的随机种子，所以区块被淘汰后重新渲染也完全一样。
+    """
+
+    def __init__(self, world_width, world_height, scene_type, scene_config,
+                 chunk_size=BACKGROUND_CHUNK_SIZE, memory_budget=BACKGROUND_CACHE_BUDGET,
+                 grid_size=GRID_SIZE, seed=None, water_map=None):
+        """
+        初始化背景区块缓存
+
+        参数:
+            world_width: 世界宽度（格子数）
+            world_height: 世界高度（格子数）
+            scene_type: 场景类型，如"day"、"night"、"pool"
+            scene_config: 场景配置（config.SCENES中的一项）
+            chunk_size: 区块边长（格子数）
+            memory_budget: 缓存内存上限（字节）
+            grid_size: 网格大小（像素）
+            seed: 装饰随机种子，如果为None则随机生成
+            water_map: 水域地图，水域格子会画成水面
+        """
+        self.world_width = world_width
+        self.world_height = world_height
+        self.scene_type = scene_type
+        self.grid_colors = scene_config["grid_colors"]
+        self.water_colors = scene_config.get("water_colors")
+        self.water_map = water_map
+        self.chunk_size = chunk_size
+        self.memory_budget = memory_budget
+        self.grid_size = grid_size
+        self.seed = seed if seed is not None else random.getrandbits(32)
+
+        # 区块像素尺寸和区块数量
+        self.chunk_pixels = chunk_size * grid_size
+        self.chunks_x = (world_width + chunk_size - 1) // chunk_size
+        self.chunks_y = (world_height + chunk_size - 1) // chunk_size
+
+        # LRU缓存 {(chunk_x, chunk_y): Surface}，最近使用的在末尾
+        self.chunks = OrderedDict()
+        self.memory_used = 0
+
+        # 统计信息
+        self.renders = 0
+        self.evictions = 0
+
+    def _chunk_rng(self, chunk_x, chunk_y):
+        """
+        获取区块专用的随机数生成器
+
+        参数:
+            chunk_x: 区块x坐标
+            chunk_y: 区块y坐标
+
+        返回:
+            random.Random: 由区块坐标决定的随机数生成器
+        """
+        return random.Random((self.seed * 1000003 + chunk_x) * 1000003 + chunk_y)
+
+    def _render_chunk(self, chunk_x, chunk_y):
+        """
+        渲染一个区块
+
+        参数:
+            chunk_x: 区块x坐标
+            chunk_y: 区块y坐标
+
+        返回:
+            pygame.Surface: 区块图像
+        """
+        first_x = chunk_x * self.chunk_size
+        first_y = chunk_y * self.chunk_size
+        cells_x = min(self.chunk_size, self.world_width - first_x)
+        cells_y = min(self.chunk_size, self.world_height - first_y)
+
+        size = self.grid_size
+        chunk = pygame.Surface((cells_x * size, cells_y * size)).convert()
+        rng = self._chunk_rng(chunk_x, chunk_y)
+
+        for y in range(cells_y):
+            for x in range(cells_x):
+                world_x = first_x + x
+                world_y = first_y + y
+
+                # 棋盘格草地样式（按世界坐标着色，区块之间无缝衔接）
+                colors = self.grid_colors
+                is_water = self.water_map is not None and self.water_map.is_water((world_x, world_y))
+                if is_water and self.water_colors:
+                    colors = self.water_colors
+                color = colors[0] if (world_x + world_y) % 2 == 0 else colors[1]
+                cell_rect = pygame.Rect(x * size, y * size, size, size)
+                chunk.fill(color, cell_rect)
+
+                if is_water:
+                    continue
+
+                # 添加场景特定的装饰
+                self._draw_decoration(chunk, cell_rect, rng)
+
+        self.renders += 1
+        return chunk
+
+    def _draw_decoration(self, chunk, cell_rect, rng):
+        """
+        在格子上绘制静态装饰
+
+        参数:
+            chunk: 区块图像
+            cell_rect: 格子在区块内的矩形
+            rng: 区块随机数生成器
+        """
+        size = self.grid_size
+        if self.scene_type == "day" and rng.random() < 0.05:
+            # 白天场景添加小草
+            grass_height = rng.randint(2, 5)
+            grass_x = cell_rect.x + rng.randint(5, size - 5)
+            grass_y = cell_rect.bottom - grass_height
+            pygame.draw.rect(chunk, (58, 121, 39), pygame.Rect(grass_x, grass_y, 2, grass_height))
+        elif self.scene_type == "night" and rng.random() < 0.02:
+            # 夜晚场景添加星星
+            pygame.draw.circle(chunk, (255, 255, 200), cell_rect.center, rng.randint(1, 2))
+
+    def get_chunk(self, chunk_x, chunk_y):
+        """
+        获取区块图像，未缓存时渲染并按内存预算淘汰最久未用的区块
+
+        参数:
+            chunk_x: 区块x坐标
+            chunk_y: 区块y坐标
+
+        返回:
+            pygame.Surface: 区块图像
+        """
+        key = (chunk_x, chunk_y)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        chunk = self._render_chunk(chunk_x, chunk_y)
+        self.chunks[key] = chunk
+        self.memory_used += self._surface_bytes(chunk)
+
+        # 超出预算时淘汰最久未使用的区块（至少保留刚渲染的这一个）
+        while self.memory_used > self.memory_budget and len(self.chunks) > 1:
+            _, evicted = self.chunks.popitem(last=False)
+            self.memory_used -= self._surface_bytes(evicted)
+            self.evictions += 1
+
+        return chunk
+
+    @staticmethod
+    def _surface_bytes(surface):
+        """
+        估算Surface占用的内存
+
+        参数:
+            surface: pygame.Surface
+
+        返回:
+            int: 字节数
+        """
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def _spans(self, offset, view, world_pixels, scroll):
+        """
+        计算某个方向上可见的区块及其屏幕位置
+
+        参数:
+            offset: 视口在世界中的像素偏移
+            view: 视口像素长度
+            world_pixels: 世界像素长度
+            scroll: 该方向是否滚动（环绕）
+
+        返回:
+            list: (区块坐标, 屏幕像素位置) 列表
+        """
+        spans = []
+        end = offset + view if scroll else min(view, world_pixels)
+        position = offset
+        while position < end:
+            wrapped = position % world_pixels
+            index = wrapped // self.chunk_pixels
+            chunk_start = index * self.chunk_pixels
+            chunk_end = min(chunk_start + self.chunk_pixels, world_pixels)
+            spans.append((index, position - offset - (wrapped - chunk_start)))
+            position += chunk_end - wrapped
+        return spans
+
+    def draw(self, surface, camera):
+        """
+        绘制摄像机可见范围内的背景区块
+
+        参数:
+            surface: 渲染目标表面
+            camera: 摄像机
+        """
+        columns = self._spans(camera.x, camera.view_width, camera.world_pixel_width, camera.scroll_x)
+        rows = self._spans(camera.y, camera.view_height, camera.world_pixel_height, camera.scroll_y)
+        for chunk_y, screen_y in rows:
+            for chunk_x, screen_x in columns:
+                surface.blit(self.get_chunk(chunk_x, chunk_y), (screen_x, screen_y))
+
+    def clear(self):
+        """清空缓存"""
+        self.chunks.clear()
+        self.memory_used = 0
@@ -0,0 +1,162 @@
+"""
+摄像机
+当游戏世界大于窗口时，跟随蛇头滚动视口，并提供可见区域查询用于剔除
+"""
+
+import pygame
+from config import GRID_SIZE
+
+
+class Camera:
+    """
+    摄像机类
+    维护视口在世界中的像素偏移，负责世界网格坐标到屏幕坐标的转换。
+    世界是环形的（蛇会从一边穿到另一边），所以视口在越过边界时会自然地环绕。
+    """
+
+    def __init__(self, world_width, world_height, view_width, view_height, grid_size=GRID_SIZE):
+        """
+        初始化摄像机
+
+        参数:
+            world_width: 世界宽度（格子数）
+            world_height: 世界高度（格子数）
+            view_width: 视口宽度（像素）
+            view_height: 视口高度（像素）
+            grid_size: 网格大小（像素）
+        """
+        self.world_width = world_width
+        self.world_height = world_height
+        self.view_width = view_width
+        self.view_height = view_height
+        self.grid_size = grid_size
+
+        # 世界的像素尺寸
+        self.world_pixel_width = world_width * grid_size
+        self.world_pixel_height = world_height * grid_size
+
+        # 只有世界比视口大的方向才需要滚动
+        self.scroll_x = self.world_pixel_width > view_width
+        self.scroll_y = self.world_pixel_height > view_height
+
+        # 视口左上角在世界中的像素位置
+        self.x = 0
+        self.y = 0
+
+    @property
+    def scrolling(self):
+        """是否有任一方向需要滚动"""
+        return self.scroll_x or self.scroll_y
+
+    def follow(self, cell):
+        """
+        让视口居中于指定格子
+
+        参数:
+            cell: 网格坐标 (x, y)，通常为蛇头位置
+        """
+        if self.scroll_x:
+            center_x = cell[0] * self.grid_size + self.grid_size // 2
+            self.x = (center_x - self.view_width // 2) % self.world_pixel_width
+        if self.scroll_y:
+            center_y = cell[1] * self.grid_size + self.grid_size // 2
+            self.y = (center_y - self.view_height // 2) % self.world_pixel_height
+
+    def world_to_screen(self, cell):
+        """
+        将网格坐标转换为屏幕像素坐标（格子左上角）
+
+        参数:
+            cell: 网格坐标 (x, y)
+
+        返回:
+            tuple: 屏幕像素坐标 (px, py)
+        """
+        px = cell[0] * self.grid_size - self.x
+        py = cell[1] * self.grid_size - self.y
+
+        # 环形世界：把坐标折回到视口附近，允许左/上边缘露出半个格子
+        if self.scroll_x:
+            px %= self.world_pixel_width
+            if px > self.world_pixel_width - self.grid_size:
+                px -= self.world_pixel_width
+        if self.scroll_y:
+            py %= self.world_pixel_height
+            if py > self.world_pixel_height - self.grid_size:
+                py -= self.world_pixel_height
+
+        return px, py
+
+    def cell_rect(self, cell):
+        """
+        获取格子在屏幕上的矩形
+
+        参数:
+            cell: 网格坐标 (x, y)
+
+        返回:
+            pygame.Rect: 屏幕矩形
+        """
+        px, py = self.world_to_screen(cell)
+        return pygame.Rect(px, py, self.grid_size, self.grid_size)
+
+    def is_visible(self, cell):
+        """
+        检查格子是否在视口内（包括部分可见）
+
+        参数:
+            cell: 网格坐标 (x, y)
+
+        返回:
+            bool: 是否可见
+        """
+        px, py = self.world_to_screen(cell)
+        return (-self.grid_size < px < self.view_width and
+                -self.grid_size < py < self.view_height)
+
+    def visible_columns(self):
+        """
+        获取可见的列号
+
+        返回:
+            list: 可见列的网格x坐标（已按世界宽度取模）
+        """
+        if not self.scroll_x:
+            return list(range(self.world_width))
+        start = self.x // self.grid_size
+        count = min(self.view_width // self.grid_size + 2, self.world_width)
+        return [(start + i) % self.world_width for i in range(count)]
+
+    def visible_rows(self):
+        """
+        获取可见的行号
+
+        返回:
+            list: 可见行的网格y坐标（已按世界高度取模）
+        """
+        if not self.scroll_y:
+            return list(range(self.world_height))
+        start = self.y // self.grid_size
+        count = min(self.view_height // self.grid_size + 2, self.world_height)
+        return [(start + i) % self.world_height for i in range(count)]
+
+    def visible_cell_count(self):
+        """
+        获取可见格子的数量
+
+        返回:
+            int: 可见格子数
+        """
+        return len(self.visible_columns()) * len(self.visible_rows())
+
+    def visible_cells(self):
+        """
+        遍历所有可见格子
+
+        返回:
+            generator: 依次产生可见格子的网格坐标 (x, y)
+        """
+        columns = self.visible_columns()
+        for y in self.visible_rows():
+            for x in columns:
+                yield (x, y)
@@ -0,0 +1,110 @@
+"""
+画面合成器
+按图层顺序（场景层、UI层、模态覆盖层）合成每一帧画面
+"""
+
+import pygame
+from config import BLACK
+
+
+class Compositor:
+    """
+    画面合成器类
+    普通帧按顺序绘制所有图层；有模态覆盖层（如暂停）时，被冻结的图层使用
+    进入模态时缓存的变暗快照，每帧只需一次blit，其余实时图层照常绘制在快照上方。
+    场景能给出变化区域时只重绘这些区域，由调用者只把这些区域更新到屏幕上。
+    """
+
+    def __init__(self, window):
+        """
+        初始化画面合成器
+
+        参数:
+            window: 游戏窗口表面
+        """
+        self.window = window
+
+        # 图层列表 [(name, render_func, freeze_when_modal)]，按绘制顺序排列
+        self.layers = []
+
+        # 模态覆盖层绘制函数，为None表示没有模态覆盖层
+        self.modal = None
+
+        # 模态期间的画面快照（被冻结的图层 + 变暗 + 覆盖层）
+        self.snapshot = None
+
+        # 窗口内容是否已经失效（模态切换、窗口被遮挡后重新显示），失效后下一帧必须全部重绘
+        self.invalidated = True
+
+    def add_layer(self, name, render_func, freeze_when_modal=True):
+        """
+        添加图层
+
+        参数:
+            name: 图层名称
+            render_func: 绘制函数，接收目标表面
+            freeze_when_modal: 模态期间是否冻结为快照（False表示始终实时绘制）
+        """
+        self.layers.append((name, render_func, freeze_when_modal))
+
+    def set_modal(self, render_func, dim=128):
+        """
+        显示模态覆盖层，并把当前画面缓存为变暗的快照
+
+        参数:
+            render_func: 覆盖层绘制函数，接收目标表面
+            dim: 变暗程度，0为全黑，255为不变暗
+        """
+        self.modal = render_func
+
+        # 窗口里还是上一帧的画面，直接复制作为快照
+        self.snapshot = self.window.copy()
+        self.snapshot.fill((dim, dim, dim), special_flags=pygame.BLEND_RGB_MULT)
+        render_func(self.snapshot)
+        self.invalidated = True
+
+    def clear_modal(self):
+        """移除模态覆盖层，释放快照"""
+        self.modal = None
+        self.snapshot = None
+        self.invalidated = True
+
+    def invalidate(self):
+        """标记窗口内容失效，下一帧全部重绘"""
+        self.invalidated = True
+
+    def render(self, dirty_rects=None):
+        """
+        合成一帧画面到窗口
+
+        参数:
+            dirty_rects: 需要重绘的区域列表，为None时重绘整个画面
+
+        返回:
+            list: 重绘的区域，None表示重绘了整个画面（需要刷新整个屏幕）
+        """
+        if self.snapshot is not None:
+            # 冻结的图层和覆盖层都在快照里
+            self.window.blit(self.snapshot, (0, 0))
+            for _, render_func, freeze_when_modal in self.layers:
+                if not freeze_when_modal:
+                    render_func(self.window)
+            self.invalidated = False
+            return None
+
+        if dirty_rects is None or self.invalidated:
+            # 清空屏幕并按顺序绘制所有图层
+            self.window.fill(BLACK)
+            for _, render_func, _ in self.layers:
+                render_func(self.window)
+            self.invalidated = False
+            return None
+
+        # 只重绘变化的区域：裁剪后按顺序绘制所有图层，区域外的像素保持上一帧的内容
+        for rect in dirty_rects:
+            self.window.set_clip(rect)
+            self.window.fill(BLACK)
+            for _, render_func, _ in self.layers:
+                render_func(self.window)
+        self.window.set_clip(None)
+        return dirty_rects
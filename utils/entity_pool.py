@@ -0,0 +1,131 @@
+"""
+实体池
+按列（结构数组）保存大量同类实体：每个字段一列，数值字段用array紧凑存储，批量更新和绘制时直接遍历列。
+实体用带代数的句柄引用，删除时把最后一个实体移到空位，O(1)完成；
+槽位被复用后代数会增加，旧句柄因此失效，不会误指向新实体
+"""
+
+from array import array
+
+# 句柄中槽位号占的位数（句柄 = 代数 << SLOT_BITS | 槽位号）
+SLOT_BITS = 24
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+
+class EntityPool:
+    """
+    实体池类
+    columns中每一列按稠密下标排列（0到len-1，没有空洞），删除会改变最后一个实体的下标，
+    所以长期引用实体时要保存句柄，而不是下标。
+    """
+
+    def __init__(self, fields):
+        """
+        初始化实体池
+
+        参数:
+            fields: {字段名: array类型码}，类型码为None的字段用列表存储任意对象
+        """
+        self.columns = {name: array(typecode) if typecode else [] for name, typecode in fields.items()}
+        self.slots = array("i")  # 稠密下标 -> 槽位号
+        self.indices = array("i")  # 槽位号 -> 稠密下标（空闲槽位为-1）
+        self.generations = array("I")  # 槽位号 -> 代数
+        self.free_slots = []
+
+    def __len__(self):
+        """实体数量"""
+        return len(self.slots)
+
+    def add(self, **values):
+        """
+        添加实体
+
+        参数:
+            **values: 每个字段的值（必须给出所有字段）
+
+        返回:
+            int: 实体句柄
+        """
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            slot = len(self.indices)
+            if slot > SLOT_MASK:
+                raise OverflowError("实体池已满")
+            self.indices.append(-1)
+            self.generations.append(0)
+
+        self.indices[slot] = len(self.slots)
+        self.slots.append(slot)
+        for name, column in self.columns.items():
+            column.append(values[name])
+        return (self.generations[slot] << SLOT_BITS) | slot
+
+    def index(self, handle):
+        """
+        获取句柄对应实体的稠密下标
+
+        参数:
+            handle: 实体句柄
+
+        返回:
+            int: 稠密下标，实体已被删除时返回-1
+        """
+        slot = handle & SLOT_MASK
+        if slot >= len(self.indices) or self.generations[slot] != handle >> SLOT_BITS:
+            return -1
+        return self.indices[slot]
+
+    def handle(self, index):
+        """
+        获取稠密下标处实体的句柄
+
+        参数:
+            index: 稠密下标
+
+        返回:
+            int: 实体句柄
+        """
+        slot = self.slots[index]
+        return (self.generations[slot] << SLOT_BITS) | slot
+
+    def remove(self, handle):
+        """
+        删除实体（最后一个实体移到被删除实体的位置）
+
+        参数:
+            handle: 实体句柄
+
+        返回:
+            bool: 是否删除成功（句柄已失效时返回False）
+        """
+        index = self.index(handle)
+        if index < 0:
+            return False
+
+        last = len(self.slots) - 1
+        for column in self.columns.values():
+            if index != last:
+                column[index] = column[last]
+            column.pop()
+        if index != last:
+            moved_slot = self.slots[last]
+            self.slots[index] = moved_slot
+            self.indices[moved_slot] = index
+        self.slots.pop()
+
+        slot = handle & SLOT_MASK
+        self.indices[slot] = -1
+        self.generations[slot] = (self.generations[slot] + 1) & 0xFFFFFFFF
+        self.free_slots.append(slot)
+        return True
+
+    def clear(self):
+        """删除所有实体（所有现有句柄失效）"""
+        for slot in self.slots:
+            self.indices[slot] = -1
+            self.generations[slot] = (self.generations[slot] + 1) & 0xFFFFFFFF
+            self.free_slots.append(slot)
+        del self.slots[:]
+        for column in self.columns.values():
+            del column[:]
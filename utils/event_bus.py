@@ -0,0 +1,144 @@
+"""
+游戏事件总线
+模拟过程中只把事件追加到本帧的缓冲区，不直接调用音效、特效和界面；
+每帧模拟结束后由订阅者批量处理，每个订阅者的开销单独统计
+"""
+
+import time
+from collections import namedtuple
+
+# 吃到食物（owner为蛇的id，position为食物所在格子）
+FoodEaten = namedtuple("FoodEaten", ["owner", "food_type", "position", "score"])
+
+# 特殊能力开始（吃到带效果的食物，能力已激活时也会产生，表示计时重新开始）和结束
+AbilityStarted = namedtuple("AbilityStarted", ["owner", "ability"])
+AbilityEnded = namedtuple("AbilityEnded", ["owner", "ability"])
+
+# 致命碰撞（cause为OccupancyGrid.step记录的原因，position为撞上的格子）
+Collision = namedtuple("Collision", ["owner", "position", "cause"])
+
+# 生成了新的僵尸
+ZombieSpawned = namedtuple("ZombieSpawned", ["position"])
+
+# 游戏结束（position为蛇头所在格子）
+GameOver = namedtuple("GameOver", ["score", "length", "position"])
+
+
+class Subscriber:
+    """
+    订阅者类
+    保存处理函数、关心的事件类型和累计开销
+    """
+
+    def __init__(self, name, handler, event_types=None):
+        """
+        初始化订阅者
+
+        参数:
+            name: 订阅者名称（用于统计）
+            handler: 处理函数，接收本帧的事件列表
+            event_types: 关心的事件类型集合，为None时接收所有事件
+        """
+        self.name = name
+        self.handler = handler
+        self.event_types = frozenset(event_types) if event_types is not None else None
+
+        # 开销统计
+        self.calls = 0
+        self.events = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+
+class EventBus:
+    """
+    事件总线类
+    emit只做一次列表追加；dispatch把本帧的事件一次性交给每个订阅者，
+    订阅者只收到自己关心的类型，没有相关事件时不会被调用。
+    """
+
+    def __init__(self):
+        """初始化事件总线"""
+        self.events = []  # 本帧的事件缓冲区
+        self.subscribers = []
+
+    def emit(self, event):
+        """
+        追加一个事件
+
+        参数:
+            event: 事件（上面定义的namedtuple）
+        """
+        self.events.append(event)
+
+    def subscribe(self, name, handler, event_types=None):
+        """
+        添加订阅者
+
+        参数:
+            name: 订阅者名称
+            handler: 处理函数，接收本帧的事件列表
+            event_types: 关心的事件类型，为None时接收所有事件
+
+        返回:
+            Subscriber: 订阅者
+        """
+        subscriber = Subscriber(name, handler, event_types)
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, name):
+        """
+        移除订阅者
+
+        参数:
+            name: 订阅者名称
+        """
+        self.subscribers = [subscriber for subscriber in self.subscribers if subscriber.name != name]
+
+    def clear(self):
+        """丢弃还没有处理的事件（例如读档之后）"""
+        self.events = []
+
+    def dispatch(self):
+        """把本帧的事件批量交给订阅者，然后清空缓冲区"""
+        events = self.events
+        if not events:
+            return
+        self.events = []
+
+        for subscriber in self.subscribers:
+            event_types = subscriber.event_types
+            batch = events if event_types is None else [event for event in events if type(event) in event_types]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                subscriber.handler(batch)
+            except Exception as e:
+                print(f"事件订阅者 {subscriber.name} 处理出错: {e}")
+            elapsed = time.perf_counter() - start
+
+            subscriber.calls += 1
+            subscriber.events += len(batch)
+            subscriber.seconds += elapsed
+            if elapsed > subscriber.max_seconds:
+                subscriber.max_seconds = elapsed
+
+    def report(self):
+        """
+        汇总每个订阅者的开销
+
+        返回:
+            dict: {订阅者名称: {"calls": 调用次数, "events": 事件数, "total_ms": 总耗时, "max_ms": 最长一次}}
+        """
+        return {
+            subscriber.name: {
+                "calls": subscriber.calls,
+                "events": subscriber.events,
+                "total_ms": round(subscriber.seconds * 1000, 3),
+                "max_ms": round(subscriber.max_seconds * 1000, 3),
+            }
+            for subscriber in self.subscribers
+        }
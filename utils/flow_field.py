@@ -0,0 +1,239 @@
+"""
+流场寻路
+从蛇头出发在环形网格上做一次广度优先搜索，得到每个格子到最近蛇头的距离，
+所有僵尸共享这一张距离场，每个僵尸只需要比较四个相邻格子就能找到追击方向
+"""
+
+from array import array
+from collections import deque
+
+# 不可达格子的距离
+UNREACHABLE = 1 << 30
+
+
+class FlowField:
+    """
+    流场类
+    蛇头每走一步只重新计算一次距离场。所有目标都只移动了一格、墙没有变化时做增量修复：
+    新距离不会比旧距离大1以上，所以先把整张场整体加1（只改一个偏移量），
+    再从新目标开始只向距离变小的格子扩散，通常只需要访问一半的格子。
+    新增一堵墙时只重新计算最短路径必须经过这堵墙的格子。
+    目标数量变化、跳跃或者墙的其他变化时重新完整计算。
+    """
+
+    def __init__(self, width, height):
+        """
+        初始化流场
+
+        参数:
+            width: 网格宽度（格子数）
+            height: 网格高度（格子数）
+        """
+        self.width = width
+        self.height = height
+        size = width * height
+
+        # 每个格子的四个相邻格子下标（环形网格）
+        self.neighbors = [
+            (
+                y * width + (x + 1) % width,
+                y * width + (x - 1) % width,
+                ((y + 1) % height) * width + x,
+                ((y - 1) % height) * width + x
+            )
+            for y in range(height) for x in range(width)
+        ]
+
+        # 实际距离 = distances[i] + offset（不可达格子保持UNREACHABLE）
+        self.distances = array("i", [UNREACHABLE]) * size
+        self.offset = 0
+        self.targets = ()
+        self.walls = frozenset()
+
+        # 统计信息
+        self.full_builds = 0
+        self.repairs = 0
+        self.visited = 0
+
+    def distance(self, cell):
+        """
+        获取格子到最近目标的距离
+
+        参数:
+            cell: 格子坐标 (x, y)
+
+        返回:
+            int: 距离，不可达时返回UNREACHABLE
+        """
+        value = self.distances[cell[1] * self.width + cell[0]]
+        return value if value == UNREACHABLE else value + self.offset
+
+    def update(self, targets, walls):
+        """
+        更新距离场（目标和墙都没有变化时什么也不做）
+
+        参数:
+            targets: 目标格子序列（蛇头）
+            walls: 不能通过的格子集合（静止障碍物）
+        """
+        targets = tuple(targets)
+        walls = frozenset(walls)
+
+        # 只新增了一堵墙（例如生成了墓碑）时先对旧目标做局部修复，再按目标移动处理
+        added = walls - self.walls
+        if (self.targets and len(added) == 1 and len(walls) == len(self.walls) + 1
+                and not any(target in walls for target in self.targets)):
+            self.walls = walls
+            self._add_wall(next(iter(added)))
+
+        if targets == self.targets and walls == self.walls:
+            return
+
+        # 新目标在墙上（例如护盾穿过障碍物）时这个目标不会扩散，距离可能增加不止1
+        incremental = (
+            walls == self.walls and self.targets and len(targets) == len(self.targets)
+            and all(self._adjacent(old, new) for old, new in zip(self.targets, targets))
+            and not any(target in walls for target in targets)
+        )
+        self.targets = targets
+        self.walls = walls
+        if incremental and self.offset < UNREACHABLE // 2:
+            self._repair()
+        else:
+            self._build()
+
+    def _adjacent(self, a, b):
+        """两个格子是否相同或在环形网格上相邻"""
+        dx = abs(a[0] - b[0])
+        dy = abs(a[1] - b[1])
+        dx = min(dx, self.width - dx)
+        dy = min(dy, self.height - dy)
+        return dx + dy <= 1
+
+    def _wall_indices(self):
+        """墙所在的格子下标"""
+        width = self.width
+        return {y * width + x for x, y in self.walls}
+
+    def _build(self):
+        """从所有目标完整计算一次距离场"""
+        self.full_builds += 1
+        size = self.width * self.height
+        distances = array("i", [UNREACHABLE]) * size
+        self.distances = distances
+        self.offset = 0
+        walls = self._wall_indices()
+
+        queue = deque()
+        for x, y in self.targets:
+            index = y * self.width + x
+            if index not in walls and distances[index]:
+                distances[index] = 0
+                queue.append(index)
+        self._spread(queue, walls)
+
+    def _repair(self):
+        """整体加1后，从新目标向距离变小的格子扩散"""
+        self.repairs += 1
+        self.offset += 1
+        distances = self.distances
+        offset = self.offset
+        walls = self._wall_indices()
+
+        queue = deque()
+        for x, y in self.targets:
+            index = y * self.width + x
+            if index not in walls and distances[index] > -offset:
+                distances[index] = -offset
+                queue.append(index)
+        self._spread(queue, walls)
+
+    def _add_wall(self, wall):
+        """
+        新增一堵墙后，只重新计算最短路径都经过这堵墙的格子
+
+        从墙开始沿距离加1的方向找出失去所有上一级格子的格子（按距离逐层处理，
+        检查一个格子时上一级格子是否受影响已经确定），把它们清空后从周围
+        未受影响的格子重新扩散。
+
+        参数:
+            wall: 新墙所在的格子 (x, y)
+        """
+        self.repairs += 1
+        distances = self.distances
+        neighbors = self.neighbors
+        walls = self._wall_indices()
+        start = wall[1] * self.width + wall[0]
+        if distances[start] == UNREACHABLE:
+            return
+
+        affected = {start}
+        queue = deque([start])
+        while queue:
+            index = queue.popleft()
+            next_value = distances[index] + 1
+            for neighbor in neighbors[index]:
+                if distances[neighbor] != next_value or neighbor in affected or neighbor in walls:
+                    continue
+                # 还有未受影响的上一级格子时距离不变
+                if any(distances[parent] == next_value - 1 and parent not in affected and parent not in walls
+                       for parent in neighbors[neighbor]):
+                    continue
+                affected.add(neighbor)
+                queue.append(neighbor)
+
+        for index in affected:
+            distances[index] = UNREACHABLE
+
+        # 从受影响区域的边界按距离从小到大重新扩散
+        boundary = {
+            neighbor
+            for index in affected if index != start
+            for neighbor in neighbors[index]
+            if distances[neighbor] != UNREACHABLE and neighbor not in walls
+        }
+        self._spread(deque(sorted(boundary, key=distances.__getitem__)), walls)
+        self.visited += len(affected)
+
+    def _spread(self, queue, walls):
+        """广度优先扩散：相邻格子的距离比当前格子大1时更新"""
+        distances = self.distances
+        neighbors = self.neighbors
+        visited = 0
+        while queue:
+            index = queue.popleft()
+            visited += 1
+            next_value = distances[index] + 1
+            for neighbor in neighbors[index]:
+                if next_value < distances[neighbor] and neighbor not in walls:
+                    distances[neighbor] = next_value
+                    queue.append(neighbor)
+        self.visited += visited
+
+    def downhill(self, cell, preferred=None):
+        """
+        获取从格子出发距离下降最快的方向
+
+        参数:
+            cell: 当前格子 (x, y)
+            preferred: 距离相同时优先选择的方向（通常为当前方向）
+
+        返回:
+            tuple: 方向 (dx, dy)，没有更近的相邻格子时返回None
+        """
+        index = cell[1] * self.width + cell[0]
+        distances = self.distances
+        best = distances[index]
+        if best == UNREACHABLE:
+            return None
+        best_direction = None
+        for direction, neighbor in zip(_NEIGHBOR_DIRECTIONS, self.neighbors[index]):
+            value = distances[neighbor]
+            if value < best or (value == best and best_direction is not None and direction == preferred):
+                best = value
+                best_direction = direction
+        return best_direction
+
+
+# 与FlowField.neighbors中相邻格子顺序对应的方向
+_NEIGHBOR_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
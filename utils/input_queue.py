@@ -0,0 +1,68 @@
+"""
+输入指令队列
+缓存玩家的方向指令，蛇每移动一步消耗一个，快速连按时不会丢失转向
+"""
+
+from collections import deque, namedtuple
+from config import INPUT_QUEUE_SIZE
+
+# 方向指令：time为按键时的游戏时间（秒，对战服务器中为指令生效的tick），direction为方向元组
+InputCommand = namedtuple("InputCommand", ["time", "direction"])
+
+
+class InputQueue:
+    """
+    输入指令队列类
+    新指令与队列中最后一个方向（队列为空时为蛇当前方向）比较，
+    重复方向和180度掉头直接丢弃，队列满时丢弃新指令。
+    """
+
+    def __init__(self, capacity=INPUT_QUEUE_SIZE):
+        """
+        初始化输入指令队列
+
+        参数:
+            capacity: 队列最多缓存的指令数
+        """
+        self.capacity = capacity
+        self.commands = deque()
+
+    def push(self, direction, current_direction, time):
+        """
+        加入方向指令
+
+        参数:
+            direction: 方向元组 (dx, dy)
+            current_direction: 蛇当前的移动方向
+            time: 按键时的游戏时间（秒）
+
+        返回:
+            bool: 指令是否被接受
+        """
+        if len(self.commands) >= self.capacity:
+            return False
+
+        last = self.commands[-1].direction if self.commands else current_direction
+        if direction == last or (-direction[0], -direction[1]) == last:
+            return False
+
+        self.commands.append(InputCommand(time, direction))
+        return True
+
+    def pop(self):
+        """
+        取出最早的方向指令
+
+        返回:
+            InputCommand: 方向指令，如果队列为空返回None
+        """
+        if self.commands:
+            return self.commands.popleft()
+        return None
+
+    def clear(self):
+        """清空队列"""
+        self.commands.clear()
+
+    def __len__(self):
+        return len(self.commands)
@@ -0,0 +1,338 @@
+"""
+排行榜
+用SQLite（WAL模式）保存每局成绩，写入在后台线程中批量完成
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from config import LEADERBOARD
+
+# 写入线程的停止信号
+_STOP = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    scene TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_rank ON scores (difficulty, scene, score);
+CREATE INDEX IF NOT EXISTS idx_scores_player ON scores (player, difficulty, scene, score);
+CREATE TABLE IF NOT EXISTS replays (
+    score_id INTEGER PRIMARY KEY REFERENCES scores (id),
+    data BLOB NOT NULL
+);
+"""
+
+
+class Leaderboard:
+    """
+    排行榜类
+    游戏线程提交的成绩放入队列，由写入线程在一个事务中批量插入；
+    排名摘要请求也排在同一个队列里，所以总能看到之前提交的成绩，结果通过回调返回。
+    回放数据单独存放在replays表中，不影响成绩表的扫描速度。
+    """
+
+    def __init__(self, path, batch_size=None):
+        """
+        初始化排行榜
+
+        参数:
+            path: 数据库文件路径
+            batch_size: 每个事务最多插入的成绩数，如果为None则使用配置中的值
+        """
+        self.path = path
+        self.batch_size = batch_size or LEADERBOARD["batch_size"]
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # 每个线程各自的查询连接（sqlite3连接不能跨线程使用）
+        self._local = threading.local()
+
+    def _connect(self):
+        """
+        打开数据库连接并确保表结构存在
+
+        返回:
+            sqlite3.Connection: 数据库连接
+        """
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def _reader(self):
+        """获取当前线程的查询连接"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            self._local.connection = connection
+        return connection
+
+    def _ensure_thread(self):
+        """首次提交时启动写入线程"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="leaderboard-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, player, score, difficulty, scene, length, replay=None):
+        """
+        提交一局成绩（立即返回）
+
+        参数:
+            player: 玩家名称
+            score: 分数
+            difficulty: 难度
+            scene: 场景类型
+            length: 蛇的最终长度
+            replay: 回放数据（bytes），可以为None
+        """
+        self._ensure_thread()
+        self._queue.put(("insert", (player, score, difficulty, scene, length, time.time()), replay))
+
+    def request_summary(self, player, score, difficulty, scene, callback):
+        """
+        请求成绩摘要（立即返回），查询在写入线程中完成后调用callback
+
+        参数:
+            player: 玩家名称
+            score: 本局分数
+            difficulty: 难度
+            scene: 场景类型
+            callback: 回调函数，接收摘要字典 {"best", "percentile", "top"}，在写入线程中调用
+        """
+        self._ensure_thread()
+        self._queue.put(("summary", (player, score, difficulty, scene), callback))
+
+    def flush(self):
+        """等待队列中的请求全部处理完"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """处理完队列中的请求后停止写入线程"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _run(self):
+        """写入线程主循环"""
+        connection = self._connect()
+        try:
+            running = True
+            while running:
+                # 阻塞等待第一个请求，然后尽量多取一些凑成一批
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                try:
+                    running = self._process(connection, batch)
+                except Exception as e:
+                    print(f"排行榜写入失败: {e}")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            connection.close()
+
+    def _process(self, connection, batch):
+        """
+        按顺序处理一批请求，连续的插入合并到一个事务中
+
+        参数:
+            connection: 写入线程的数据库连接
+            batch: 请求列表
+
+        返回:
+            bool: 是否继续运行
+        """
+        inserts = []
+        for request in batch:
+            if request is _STOP:
+                self._insert(connection, inserts)
+                return False
+            if request[0] == "insert":
+                inserts.append(request)
+                continue
+
+            # 摘要请求之前的成绩必须先写入；一个请求出错不影响同一批中的其他请求
+            self._insert(connection, inserts)
+            inserts = []
+            _, (player, score, difficulty, scene), callback = request
+            try:
+                summary = self._summary(connection, player, score, difficulty, scene)
+            except sqlite3.Error as e:
+                print(f"排行榜查询失败: {e}")
+                continue
+            try:
+                callback(summary)
+            except Exception as e:
+                print(f"排行榜回调出错: {e}")
+
+        self._insert(connection, inserts)
+        return True
+
+    @staticmethod
+    def _insert(connection, inserts):
+        """
+        在一个事务中插入多条成绩
+
+        参数:
+            connection: 数据库连接
+            inserts: 插入请求列表
+        """
+        if not inserts:
+            return
+        try:
+            Leaderboard._insert_rows(connection, inserts)
+        except sqlite3.Error as e:
+            print(f"排行榜写入失败，丢弃{len(inserts)}条成绩: {e}")
+
+    @staticmethod
+    def _insert_rows(connection, inserts):
+        """
+        插入成绩和回放（出错时整个事务回滚）
+
+        参数:
+            connection: 数据库连接
+            inserts: 插入请求列表
+        """
+        sql = (
+            "INSERT INTO scores (player, score, difficulty, scene, length, created) "
+            "VALUES (?, ?, ?, ?, ?, ?)"
+        )
+        with connection:
+            # 没有回放的成绩用executemany一次插入，有回放的需要逐条插入以获取成绩id
+            connection.executemany(sql, [row for _, row, replay in inserts if replay is None])
+            for _, row, replay in inserts:
+                if replay is not None:
+                    cursor = connection.execute(sql, row)
+                    connection.execute(
+                        "INSERT INTO replays (score_id, data) VALUES (?, ?)",
+                        (cursor.lastrowid, replay)
+                    )
+
+    def _summary(self, connection, player, score, difficulty, scene):
+        """
+        查询成绩摘要
+
+        返回:
+            dict: {"best": 玩家最高分, "percentile": 本局分数的百分位, "top": 前几名列表}
+        """
+        return {
+            "best": self._player_best(connection, player, difficulty, scene),
+            "percentile": self._percentile_rank(connection, score, difficulty, scene),
+            "top": self._top_scores(connection, difficulty, scene, LEADERBOARD["top_count"])
+        }
+
+    @staticmethod
+    def _top_scores(connection, difficulty, scene, limit):
+        """查询前几名（按(difficulty, scene, score)索引倒序读取）"""
+        rows = connection.execute(
+            "SELECT id, player, score, length, created FROM scores "
+            "WHERE difficulty = ? AND scene = ? ORDER BY score DESC LIMIT ?",
+            (difficulty, scene, limit)
+        ).fetchall()
+        return [
+            {"id": row[0], "player": row[1], "score": row[2], "length": row[3], "created": row[4]}
+            for row in rows
+        ]
+
+    @staticmethod
+    def _percentile_rank(connection, score, difficulty, scene):
+        """查询低于该分数的成绩所占百分比（两次(difficulty, scene, score)索引范围计数）"""
+        (lower,) = connection.execute(
+            "SELECT COUNT(*) FROM scores WHERE difficulty = ? AND scene = ? AND score < ?",
+            (difficulty, scene, score)
+        ).fetchone()
+        (total,) = connection.execute(
+            "SELECT COUNT(*) FROM scores WHERE difficulty = ? AND scene = ?",
+            (difficulty, scene)
+        ).fetchone()
+        if not total:
+            return 100.0
+        return lower * 100.0 / total
+
+    @staticmethod
+    def _player_best(connection, player, difficulty=None, scene=None):
+        """查询玩家最高分（使用玩家索引）"""
+        if difficulty is None or scene is None:
+            row = connection.execute("SELECT MAX(score) FROM scores WHERE player = ?", (player,)).fetchone()
+        else:
+            row = connection.execute(
+                "SELECT MAX(score) FROM scores WHERE player = ? AND difficulty = ? AND scene = ?",
+                (player, difficulty, scene)
+            ).fetchone()
+        return row[0]
+
+    def top_scores(self, difficulty, scene, limit=None):
+        """
+        查询前几名（在调用线程中执行，不要在游戏主循环中调用）
+
+        参数:
+            difficulty: 难度
+            scene: 场景类型
+            limit: 返回条数，如果为None则使用配置中的值
+
+        返回:
+            list: 成绩字典列表，按分数从高到低排列
+        """
+        return self._top_scores(self._reader(), difficulty, scene, limit or LEADERBOARD["top_count"])
+
+    def percentile_rank(self, score, difficulty, scene):
+        """
+        查询分数的百分位排名
+
+        参数:
+            score: 分数
+            difficulty: 难度
+            scene: 场景类型
+
+        返回:
+            float: 低于该分数的成绩所占百分比（没有记录时为100）
+        """
+        return self._percentile_rank(self._reader(), score, difficulty, scene)
+
+    def player_best(self, player, difficulty=None, scene=None):
+        """
+        查询玩家的最高分
+
+        参数:
+            player: 玩家名称
+            difficulty: 难度，如果为None则不限
+            scene: 场景类型，如果为None则不限
+
+        返回:
+            int: 最高分，如果没有记录返回None
+        """
+        return self._player_best(self._reader(), player, difficulty, scene)
+
+    def get_replay(self, score_id):
+        """
+        读取成绩附带的回放数据
+
+        参数:
+            score_id: 成绩id
+
+        返回:
+            bytes: 回放数据，如果没有返回None
+        """
+        row = self._reader().execute("SELECT data FROM replays WHERE score_id = ?", (score_id,)).fetchone()
+        return row[0] if row else None
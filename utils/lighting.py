@@ -0,0 +1,96 @@
+"""
+光照层
+实现夜晚场景的视野受限效果：画面整体变暗，只在光源（蛇头、阳光等）周围保持明亮
+"""
+
+import pygame
+from config import LIGHTING
+
+
+class LightingLayer:
+    """
+    光照层类
+    维护一张可复用的黑暗图层，每帧先用环境光填充，再把缓存的径向渐变光斑
+    取最大值叠加上去，最后以乘法混合覆盖到画面上。整个过程不分配新的Surface。
+    """
+
+    def __init__(self, width, height, ambient=None):
+        """
+        初始化光照层
+
+        参数:
+            width: 图层宽度（像素）
+            height: 图层高度（像素）
+            ambient: 环境光颜色，如果为None则使用配置中的值
+        """
+        self.ambient = tuple(ambient or LIGHTING["ambient"])
+        self.darkness = pygame.Surface((width, height)).convert()
+
+        # 径向渐变光斑缓存 {radius: Surface}
+        self.gradients = {}
+
+        # 本帧的光源列表 [(screen_x, screen_y, radius)]
+        self.lights = []
+
+    def get_gradient(self, radius):
+        """
+        获取指定半径的径向渐变光斑（首次使用时渲染并缓存）
+
+        参数:
+            radius: 光斑半径（像素）
+
+        返回:
+            pygame.Surface: 中心为白色、边缘为环境光的渐变图像
+        """
+        gradient = self.gradients.get(radius)
+        if gradient is not None:
+            return gradient
+
+        gradient = pygame.Surface((radius * 2, radius * 2)).convert()
+        gradient.fill(self.ambient)
+
+        # 从外到内画同心圆，亮度按平方曲线过渡，边缘更柔和
+        step = max(1, radius // 32)
+        for r in range(radius, 0, -step):
+            t = 1.0 - r / radius
+            t = 1.0 - (1.0 - t) * (1.0 - t)
+            color = tuple(int(a + (255 - a) * t) for a in self.ambient)
+            pygame.draw.circle(gradient, color, (radius, radius), r)
+
+        self.gradients[radius] = gradient
+        return gradient
+
+    def begin(self):
+        """开始新的一帧，清空光源列表"""
+        self.lights.clear()
+
+    def add_light(self, x, y, radius):
+        """
+        添加光源
+
+        参数:
+            x: 光源中心屏幕x坐标
+            y: 光源中心屏幕y坐标
+            radius: 光照半径（像素）
+        """
+        width, height = self.darkness.get_size()
+        # 完全在屏幕外的光源不需要绘制
+        if x + radius < 0 or y + radius < 0 or x - radius > width or y - radius > height:
+            return
+        self.lights.append((x, y, radius))
+
+    def apply(self, surface):
+        """
+        把光照叠加到画面上
+
+        参数:
+            surface: 渲染目标表面
+        """
+        self.darkness.fill(self.ambient)
+        for x, y, radius in self.lights:
+            self.darkness.blit(
+                self.get_gradient(radius),
+                (x - radius, y - radius),
+                special_flags=pygame.BLEND_RGBA_MAX
+            )
+        surface.blit(self.darkness, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
@@ -0,0 +1,165 @@
+"""
+棋盘占用网格
+记录每个格子被哪条蛇占据（蛇的id），以及障碍物所在的格子。
+所有蛇的碰撞在每步一次遍历中完成，开销只与蛇的数量有关，与蛇身总长度无关
+"""
+
+from array import array
+
+# 空格子
+EMPTY = 0
+
+# 单人游戏中玩家蛇的id
+PLAYER_OWNER = 1
+
+
+class OccupancyGrid:
+    """
+    棋盘占用网格类
+    蛇身格子保存在一维数组中（值为蛇的id，必须为正整数），蛇每走一步只需要写入新蛇头、
+    清除旧尾巴；障碍物单独保存，每步移动前整体刷新（障碍物数量很少）。
+    支持in运算（格子是否被蛇占据），可以直接作为生成食物和障碍物时的avoid_positions。
+    """
+
+    def __init__(self, width, height):
+        """
+        初始化占用网格
+
+        参数:
+            width: 棋盘宽度（格子数）
+            height: 棋盘高度（格子数）
+        """
+        self.width = width
+        self.height = height
+        self.cells = array("i", [EMPTY]) * (width * height)
+        self.obstacles = set()
+        self.collisions = {}  # 上一次step中死亡的蛇 {蛇的id: (撞上的格子, 原因)}
+
+    def __contains__(self, cell):
+        """格子是否被蛇占据"""
+        x, y = cell
+        return self.cells[y * self.width + x] != EMPTY
+
+    def owner(self, cell):
+        """
+        获取占据格子的蛇的id
+
+        参数:
+            cell: 格子坐标 (x, y)
+
+        返回:
+            int: 蛇的id，空格子返回EMPTY
+        """
+        x, y = cell
+        return self.cells[y * self.width + x]
+
+    def reset(self, snakes):
+        """
+        清空网格并重新放入所有蛇（开局、读档等直接替换蛇身之后调用）
+
+        参数:
+            snakes: {蛇的id: 蛇身坐标序列}
+        """
+        self.cells = array("i", [EMPTY]) * (self.width * self.height)
+        for owner, positions in snakes.items():
+            self.add_snake(owner, positions)
+
+    def add_snake(self, owner, positions):
+        """
+        放入一条蛇
+
+        参数:
+            owner: 蛇的id
+            positions: 蛇身坐标序列
+        """
+        cells, width = self.cells, self.width
+        for x, y in positions:
+            cells[y * width + x] = owner
+
+    def remove_snake(self, owner, positions):
+        """
+        移除一条蛇（只清除仍属于这条蛇的格子）
+
+        参数:
+            owner: 蛇的id
+            positions: 蛇身坐标序列
+        """
+        cells, width = self.cells, self.width
+        for x, y in positions:
+            index = y * width + x
+            if cells[index] == owner:
+                cells[index] = EMPTY
+
+    def set_obstacles(self, obstacles):
+        """
+        刷新障碍物所在的格子
+
+        参数:
+            obstacles: 障碍物列表（需要有position属性）
+        """
+        self.obstacles = {obstacle.position for obstacle in obstacles}
+
+    def step(self, snakes, shielded=()):
+        """
+        所有蛇同时前进一步：判定碰撞并更新网格
+
+        判定规则与蛇依次移动后再检查蛇头相同：撞到自己（包括尾巴）的蛇原地死亡；
+        蛇头撞到其他蛇移动后的身体、与其他蛇头进入同一格或者撞到障碍物（有护盾时除外）的蛇死亡。
+        存活的蛇在网格中已经前进一步，调用者随后对它们调用snake.move()；
+        死亡的蛇由调用者用remove_snake移除。
+        每条死亡的蛇撞上的格子和原因记录在collisions中，原因为"self"（自己的身体）、
+        "snake"（其他蛇的身体）、"head"（与其他蛇头进入同一格）或"obstacle"。
+
+        参数:
+            snakes: {蛇的id: Snake}
+            shielded: 有护盾的蛇的id集合
+
+        返回:
+            set: 死亡的蛇的id集合
+        """
+        cells, width, height = self.cells, self.width, self.height
+        dead = set()
+        moves = []
+        collisions = self.collisions = {}
+
+        # 计算新蛇头；撞到自己的蛇不移动
+        for owner, snake in snakes.items():
+            head_x, head_y = snake.positions[0]
+            dx, dy = snake.next_direction
+            head = ((head_x + dx) % width, (head_y + dy) % height)
+            head_index = head[1] * width + head[0]
+            if len(snake.positions) > 1 and cells[head_index] == owner:
+                dead.add(owner)
+                collisions[owner] = (head, "self")
+                continue
+            moves.append((owner, head, head_index, snake))
+
+        # 移动的蛇先让出尾巴
+        for owner, head, head_index, snake in moves:
+            if snake.growth_pending <= 0:
+                tail_x, tail_y = snake.positions[-1]
+                cells[tail_y * width + tail_x] = EMPTY
+
+        # 蛇头与其他蛇的身体、障碍物以及其他蛇头的碰撞
+        heads = {}
+        for owner, head, head_index, snake in moves:
+            if cells[head_index] != EMPTY:
+                dead.add(owner)
+                collisions[owner] = (head, "snake")
+            elif head in self.obstacles and owner not in shielded:
+                dead.add(owner)
+                collisions[owner] = (head, "obstacle")
+            other = heads.get(head_index)
+            if other is not None:
+                dead.add(owner)
+                dead.add(other)
+                collisions.setdefault(owner, (head, "head"))
+                collisions.setdefault(other, (head, "head"))
+            heads[head_index] = owner
+
+        # 写入存活的蛇的新蛇头
+        for owner, head, head_index, snake in moves:
+            if owner not in dead:
+                cells[head_index] = owner
+
+        return dead
@@ -5,6 +5,7 @@
 
 import os
 import pygame
+from utils.audio_manager import AudioManager, init_mixer
 from config import (
     SOUNDS_DIR, SOUNDS, IMAGES_DIR, IMAGES, 
     SNAKE_IMAGES_DIR, FOOD_IMAGES_DIR, OBSTACLES_IMAGES_DIR, 
@@ -26,9 +27,9 @@ class ResourceLoader:
         self.sfx_volume = 1.0    # 音效音量
         self.game_engine = None  # 游戏引擎引用，将在游戏引擎初始化时设置
         
-        # 确保pygame混音器已初始化
-        if not pygame.mixer.get_init():
-            pygame.mixer.init()
+        # 确保pygame混音器已初始化，并按类别预留音效通道
+        init_mixer()
+        self.audio = AudioManager(self.music_volume)
             
         # 确保pygame显示模块已初始化
         if not pygame.display.get_surface():
@@ -179,7 +180,7 @@ class ResourceLoader:
             name: 音效名称
         """
         if name in self.sounds:
-            self.sounds[name].play()
+            self.audio.play(name, self.sounds[name])
         else:
             print(f"警告: 音效 {name} 未加载")
     
@@ -194,7 +195,7 @@ class ResourceLoader:
             music_path = os.path.join(SOUNDS_DIR, filename)
             if os.path.exists(music_path):
                 pygame.mixer.music.load(music_path)
-                pygame.mixer.music.set_volume(self.music_volume)
+                self.audio.set_music_volume(self.music_volume)
                 self.music = filename
             else:
                 print(f"警告: 音乐文件 {music_path} 不存在")
@@ -233,7 +234,7 @@ class ResourceLoader:
             volume: 音量值，范围0.0-1.0
         """
         self.music_volume = max(0.0, min(1.0, volume))
-        pygame.mixer.music.set_volume(self.music_volume)
+        self.audio.set_music_volume(self.music_volume)
     
     def set_sfx_volume(self, volume):
         """
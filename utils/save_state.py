@@ -0,0 +1,489 @@
+"""
+游戏存档
+把游戏场景的完整状态编码成紧凑的二进制格式，用于暂停恢复、崩溃自动存档和状态复制
+"""
+
+import struct
+import sys
+from array import array
+from collections import deque, namedtuple
+from config import OBSTACLE_TYPES, UP, DOWN, LEFT, RIGHT
+from entities.food_registry import FOOD_TYPE_NAMES
+from entities.obstacle import ZombieObstacle
+from utils.input_queue import InputCommand
+from utils.occupancy import PLAYER_OWNER
+
+# 存档格式
+SAVE_MAGIC = b"PVZS"
+SAVE_VERSION = 3
+
+# 回放格式（开局存档 + 已执行的方向指令）
+REPLAY_MAGIC = b"PVZR"
+REPLAY_VERSION = 3
+
+# 方向编码（2位），蛇身按相邻节之间的方向存储
+DIRECTIONS = (UP, RIGHT, DOWN, LEFT)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+# 障碍物类型编码（食物类型编码来自食物注册表，包括插件注册的类型）
+OBSTACLE_TYPE_NAMES = tuple(OBSTACLE_TYPES)
+
+# 每个字节解出的4个方向编码（低位在前）
+_BYTE_CODES = [tuple((value >> shift) & 3 for shift in (0, 2, 4, 6)) for value in range(256)]
+
+# 二进制结构（小端）
+_HEADER = struct.Struct("<4sBBB")  # 标识, 版本, 场景名长度, 难度名长度
+_WORLD = struct.Struct("<HHI")  # 世界宽, 世界高, 背景种子
+_GAME = struct.Struct("<iIdddBddd")  # 分数, 步数, 移动计时, 食物计时, 动画时间, 是否结束, 结束计时, 障碍物游戏时间, 障碍物生成计时
+_SNAKE = struct.Struct("<HHBBIBiBidfI")  # 蛇头, 方向, 下一方向, 待增长, 护盾, 护盾计时, 加速, 加速计时, 速度倍数, 动画时间, 长度
+_COUNT8 = struct.Struct("<B")
+_COUNT16 = struct.Struct("<H")
+_COMMAND = struct.Struct("<dB")  # 按键时间, 方向
+_FOOD = struct.Struct("<BHHf")  # 类型, x, y, 动画偏移
+_OBSTACLE = struct.Struct("<BHHfBd")  # 类型, x, y, 动画偏移, 方向, 移动计时
+_RNG = struct.Struct("<BBd")  # 版本, 是否有gauss缓存, gauss缓存
+_REPLAY_HEADER = struct.Struct("<4sBIII")  # 标识, 版本, 开局存档长度, 指令数, 结束时的步数
+_REPLAY_COMMAND = struct.Struct("<IdB")  # 执行时的步数, 按键时间, 方向
+
+# 不可变的状态快照（只包含元组和基本类型，可以安全地交给其他线程编码）
+SnakeState = namedtuple("SnakeState", [
+    "positions", "direction", "next_direction", "growth_pending",
+    "shield_active", "shield_timer", "speed_boost_active", "speed_boost_timer",
+    "speed_multiplier", "animation_time"
+])
+
+GameState = namedtuple("GameState", [
+    "scene_type", "difficulty", "world_width", "world_height", "background_seed",
+    "score", "move_tick", "move_timer", "food_spawn_timer", "animation_time",
+    "game_over", "game_over_timer", "obstacle_game_time", "obstacle_spawn_timer",
+    "snake", "input_commands", "foods", "obstacles", "rng_state"
+])
+
+
+def pack_body(positions, width, height):
+    """
+    把蛇身编码成每节相对前一节的方向（每节2位，4节一个字节），不包括蛇头坐标
+
+    参数:
+        positions: 蛇身坐标序列（蛇头在前）
+        width: 世界宽度（格子数），用于处理环绕
+        height: 世界高度（格子数）
+
+    返回:
+        bytes: 编码后的蛇身，长度为 (len(positions) + 2) // 4
+    """
+    delta_codes = {
+        (0, height - 1): 0, (1, 0): 1, (0, 1): 2, (width - 1, 0): 3
+    }
+    body = bytearray((len(positions) + 2) // 4)
+    previous_x, previous_y = positions[0]
+    for i in range(1, len(positions)):
+        x, y = positions[i]
+        code = delta_codes.get(((x - previous_x) % width, (y - previous_y) % height))
+        if code is None:
+            raise ValueError(f"蛇身不连续: {positions[i - 1]} -> {positions[i]}")
+        body[(i - 1) >> 2] |= code << (((i - 1) & 3) << 1)
+        previous_x, previous_y = x, y
+    return bytes(body)
+
+
+def unpack_body(head, length, data, offset, width, height):
+    """
+    解码pack_body编码的蛇身
+
+    参数:
+        head: 蛇头坐标 (x, y)
+        length: 蛇身总节数（包括蛇头）
+        data: 二进制数据
+        offset: 蛇身数据在data中的起始位置
+        width: 世界宽度（格子数）
+        height: 世界高度（格子数）
+
+    返回:
+        tuple: (蛇身坐标元组, 蛇身数据之后的位置)
+    """
+    body_size = (length + 2) // 4
+    if offset + body_size > len(data):
+        raise IndexError("蛇身数据不完整")
+    positions = [head]
+    x, y = head
+    remaining = length - 1
+    for value in data[offset:offset + body_size]:
+        for code in _BYTE_CODES[value][:remaining]:
+            dx, dy = DIRECTIONS[code]
+            x = (x + dx) % width
+            y = (y + dy) % height
+            positions.append((x, y))
+        remaining -= 4
+    return tuple(positions), offset + body_size
+
+
+def capture_state(scene):
+    """
+    从游戏场景复制一份不可变的状态快照（只复制数据，不做编码）
+
+    参数:
+        scene: 游戏场景
+
+    返回:
+        GameState: 状态快照
+    """
+    snake = scene.snake
+    obstacle_manager = scene.obstacle_manager
+    return GameState(
+        scene.scene_type, obstacle_manager.difficulty, scene.world_width, scene.world_height,
+        scene.background_cache.seed if scene.background_cache else 0,
+        scene.score, scene.move_tick, scene.move_timer, scene.food_spawn_timer, scene.animation_time,
+        scene.game_over, scene.game_over_timer,
+        obstacle_manager.game_time, obstacle_manager.spawn_timer,
+        SnakeState(
+            tuple(snake.positions), snake.direction, snake.next_direction, snake.growth_pending,
+            snake.shield_active, snake.shield_timer, snake.speed_boost_active, snake.speed_boost_timer,
+            snake.speed_multiplier, snake.animation_time
+        ),
+        tuple(scene.input_queue.commands),
+        tuple(
+            (food.food_type, food.grid_position, scene.food_manager.clock.to_radians(food.phase))
+            for food in scene.food_manager.foods
+        ),
+        tuple(
+            (
+                "zombie" if isinstance(obstacle, ZombieObstacle) else "tombstone",
+                obstacle.position, obstacle_manager.clock.to_radians(obstacle.phase),
+                getattr(obstacle, "direction", RIGHT), getattr(obstacle, "move_timer", 0)
+            )
+            for obstacle in obstacle_manager.obstacles
+        ),
+        scene.rng.getstate()
+    )
+
+
+def encode_state(state):
+    """
+    把状态快照编码成二进制存档
+
+    参数:
+        state: GameState状态快照
+
+    返回:
+        bytes: 二进制存档
+    """
+    width, height = state.world_width, state.world_height
+    scene_name = state.scene_type.encode("utf-8")
+    difficulty_name = state.difficulty.encode("utf-8")
+    parts = [
+        _HEADER.pack(SAVE_MAGIC, SAVE_VERSION, len(scene_name), len(difficulty_name)),
+        scene_name,
+        difficulty_name,
+        _WORLD.pack(width, height, state.background_seed),
+        _GAME.pack(
+            state.score, state.move_tick, state.move_timer, state.food_spawn_timer, state.animation_time,
+            state.game_over, state.game_over_timer, state.obstacle_game_time, state.obstacle_spawn_timer
+        )
+    ]
+
+    # 蛇：蛇头坐标 + 每节相对前一节的方向（每节2位）
+    snake = state.snake
+    positions = snake.positions
+    head_x, head_y = positions[0]
+    parts.append(_SNAKE.pack(
+        head_x, head_y,
+        DIRECTION_CODES[snake.direction], DIRECTION_CODES[snake.next_direction],
+        snake.growth_pending, snake.shield_active, snake.shield_timer,
+        snake.speed_boost_active, snake.speed_boost_timer, snake.speed_multiplier,
+        snake.animation_time, len(positions)
+    ))
+    parts.append(pack_body(positions, width, height))
+
+    # 输入指令队列
+    parts.append(_COUNT8.pack(len(state.input_commands)))
+    for command in state.input_commands:
+        parts.append(_COMMAND.pack(command.time, DIRECTION_CODES[command.direction]))
+
+    # 食物
+    parts.append(_COUNT16.pack(len(state.foods)))
+    for food_type, (x, y), animation_offset in state.foods:
+        parts.append(_FOOD.pack(FOOD_TYPE_NAMES.index(food_type), x, y, animation_offset))
+
+    # 障碍物
+    parts.append(_COUNT16.pack(len(state.obstacles)))
+    for obstacle_type, (x, y), animation_offset, direction, move_timer in state.obstacles:
+        parts.append(_OBSTACLE.pack(
+            OBSTACLE_TYPE_NAMES.index(obstacle_type), x, y, animation_offset,
+            DIRECTION_CODES[direction], move_timer
+        ))
+
+    # 随机数生成器状态（Mersenne Twister的625个32位整数）
+    rng_version, rng_words, gauss_next = state.rng_state
+    parts.append(_RNG.pack(rng_version, gauss_next is not None, gauss_next or 0.0))
+    words = array("I", rng_words)
+    if sys.byteorder == "big":
+        words.byteswap()
+    parts.append(_COUNT16.pack(len(words)))
+    parts.append(words.tobytes())
+
+    return b"".join(parts)
+
+
+def decode_state(data):
+    """
+    解码二进制存档
+
+    参数:
+        data: 二进制存档
+
+    返回:
+        GameState: 状态快照
+
+    异常:
+        ValueError: 数据不是有效的存档或版本不受支持
+    """
+    try:
+        magic, version, name_length, difficulty_length = _HEADER.unpack_from(data, 0)
+        if magic != SAVE_MAGIC:
+            raise ValueError("不是有效的存档数据")
+        if version != SAVE_VERSION:
+            raise ValueError(f"不支持的存档版本: {version}")
+        offset = _HEADER.size
+        scene_type = bytes(data[offset:offset + name_length]).decode("utf-8")
+        offset += name_length
+        difficulty = bytes(data[offset:offset + difficulty_length]).decode("utf-8")
+        offset += difficulty_length
+
+        width, height, background_seed = _WORLD.unpack_from(data, offset)
+        offset += _WORLD.size
+        game = _GAME.unpack_from(data, offset)
+        offset += _GAME.size
+
+        # 蛇
+        (head_x, head_y, direction, next_direction, growth_pending,
+         shield_active, shield_timer, speed_boost_active, speed_boost_timer,
+         speed_multiplier, snake_animation_time, length) = _SNAKE.unpack_from(data, offset)
+        offset += _SNAKE.size
+        positions, offset = unpack_body((head_x, head_y), length, data, offset, width, height)
+        snake = SnakeState(
+            positions, DIRECTIONS[direction], DIRECTIONS[next_direction], growth_pending,
+            bool(shield_active), shield_timer, bool(speed_boost_active), speed_boost_timer,
+            speed_multiplier, snake_animation_time
+        )
+
+        # 输入指令队列
+        (count,) = _COUNT8.unpack_from(data, offset)
+        offset += _COUNT8.size
+        commands = []
+        for _ in range(count):
+            time, code = _COMMAND.unpack_from(data, offset)
+            offset += _COMMAND.size
+            commands.append(InputCommand(time, DIRECTIONS[code]))
+
+        # 食物
+        (count,) = _COUNT16.unpack_from(data, offset)
+        offset += _COUNT16.size
+        foods = []
+        for _ in range(count):
+            type_code, x, y, animation_offset = _FOOD.unpack_from(data, offset)
+            offset += _FOOD.size
+            foods.append((FOOD_TYPE_NAMES[type_code], (x, y), animation_offset))
+
+        # 障碍物
+        (count,) = _COUNT16.unpack_from(data, offset)
+        offset += _COUNT16.size
+        obstacles = []
+        for _ in range(count):
+            type_code, x, y, animation_offset, direction, move_timer = _OBSTACLE.unpack_from(data, offset)
+            offset += _OBSTACLE.size
+            obstacles.append((
+                OBSTACLE_TYPE_NAMES[type_code], (x, y), animation_offset, DIRECTIONS[direction], move_timer
+            ))
+
+        # 随机数生成器状态
+        rng_version, has_gauss, gauss_next = _RNG.unpack_from(data, offset)
+        offset += _RNG.size
+        (count,) = _COUNT16.unpack_from(data, offset)
+        offset += _COUNT16.size
+        words = array("I")
+        words.frombytes(data[offset:offset + count * words.itemsize])
+        if sys.byteorder == "big":
+            words.byteswap()
+        rng_state = (rng_version, tuple(words), gauss_next if has_gauss else None)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"存档数据已损坏: {e}")
+
+    (score, move_tick, move_timer, food_spawn_timer, animation_time,
+     game_over, game_over_timer, obstacle_game_time, obstacle_spawn_timer) = game
+    return GameState(
+        scene_type, difficulty, width, height, background_seed,
+        score, move_tick, move_timer, food_spawn_timer, animation_time,
+        bool(game_over), game_over_timer, obstacle_game_time, obstacle_spawn_timer,
+        snake, tuple(commands), tuple(foods), tuple(obstacles), rng_state
+    )
+
+
+def apply_state(scene, state):
+    """
+    把状态快照恢复到游戏场景（场景必须已经用相同的场景类型、难度和世界大小进入）
+
+    参数:
+        scene: 游戏场景
+        state: GameState状态快照
+
+    异常:
+        ValueError: 场景类型、难度或世界大小与存档不一致
+    """
+    difficulty = scene.obstacle_manager.difficulty
+    if (state.scene_type, state.difficulty, state.world_width, state.world_height) != (
+            scene.scene_type, difficulty, scene.world_width, scene.world_height):
+        raise ValueError(
+            f"存档场景 {state.scene_type}（{state.difficulty}）{state.world_width}x{state.world_height} "
+            f"与当前场景 {scene.scene_type}（{difficulty}）{scene.world_width}x{scene.world_height} 不一致"
+        )
+
+    # 游戏状态
+    scene.score = state.score
+    scene.move_tick = state.move_tick
+    scene.move_timer = state.move_timer
+    scene.food_spawn_timer = state.food_spawn_timer
+    scene.animation_time = state.animation_time
+    scene.game_over = state.game_over
+    scene.game_over_timer = state.game_over_timer
+    scene.step_accumulator = 0
+    scene.particles.clear()
+
+    # 蛇
+    snake = scene.snake
+    snake_state = state.snake
+    snake.positions = list(snake_state.positions)
+    snake._rebuild_cell_index()
+    snake.direction = snake_state.direction
+    snake.next_direction = snake_state.next_direction
+    snake.growth_pending = snake_state.growth_pending
+    snake.shield_active = snake_state.shield_active
+    snake.shield_timer = int(snake_state.shield_timer)
+    snake.speed_boost_active = snake_state.speed_boost_active
+    snake.speed_boost_timer = int(snake_state.speed_boost_timer)
+    snake.speed_multiplier = snake_state.speed_multiplier
+    snake.animation_time = snake_state.animation_time
+    scene.occupancy.reset({PLAYER_OWNER: snake.positions})
+
+    # 输入指令队列
+    scene.input_queue.clear()
+    scene.input_queue.commands.extend(state.input_commands)
+
+    # 食物
+    food_manager = scene.food_manager
+    food_manager.clear()
+    for food_type, position, animation_offset in state.foods:
+        food = food_manager.add_food(food_type, position)
+        food.phase = food_manager.clock.from_radians(animation_offset)
+
+    # 障碍物
+    obstacle_manager = scene.obstacle_manager
+    obstacle_manager.obstacles = []
+    obstacle_manager.game_time = state.obstacle_game_time
+    obstacle_manager.spawn_timer = state.obstacle_spawn_timer
+    for obstacle_type, position, animation_offset, direction, move_timer in state.obstacles:
+        obstacle = obstacle_manager.spawn_obstacle(obstacle_type, position)
+        obstacle.phase = obstacle_manager.clock.from_radians(animation_offset)
+        if isinstance(obstacle, ZombieObstacle):
+            obstacle.direction = direction
+            obstacle.move_timer = move_timer
+
+    # 背景装饰种子不同时重新生成区块
+    if scene.background_cache and scene.background_cache.seed != state.background_seed:
+        scene.background_cache.seed = state.background_seed
+        scene.background_cache.clear()
+        if scene.ripples:
+            scene.ripples.set_seed(state.background_seed)
+
+    scene.camera.follow(snake.positions[0])
+    scene.sync_abilities()
+
+    # 最后恢复随机数状态（上面创建僵尸时会消耗随机数）
+    scene.rng.setstate(state.rng_state)
+
+
+def encode_replay(initial_state, input_log, final_move_tick):
+    """
+    编码回放数据
+
+    参数:
+        initial_state: 开局时的GameState状态快照
+        input_log: 已执行的方向指令 [(move_tick, InputCommand)]
+        final_move_tick: 游戏结束时蛇已移动的步数
+
+    返回:
+        bytes: 二进制回放数据
+    """
+    state_data = encode_state(initial_state)
+    parts = [
+        _REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, len(state_data), len(input_log), final_move_tick),
+        state_data
+    ]
+    for move_tick, command in input_log:
+        parts.append(_REPLAY_COMMAND.pack(move_tick, command.time, DIRECTION_CODES[command.direction]))
+    return b"".join(parts)
+
+
+def decode_replay(data):
+    """
+    解码回放数据
+
+    参数:
+        data: 二进制回放数据
+
+    返回:
+        tuple: (开局GameState, [(move_tick, InputCommand)], 结束时的步数)
+
+    异常:
+        ValueError: 数据不是有效的回放或版本不受支持
+    """
+    try:
+        magic, version, state_size, count, final_move_tick = _REPLAY_HEADER.unpack_from(data, 0)
+        if magic != REPLAY_MAGIC:
+            raise ValueError("不是有效的回放数据")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"不支持的回放版本: {version}")
+        offset = _REPLAY_HEADER.size
+        initial_state = decode_state(data[offset:offset + state_size])
+        offset += state_size
+        input_log = []
+        for _ in range(count):
+            move_tick, time, code = _REPLAY_COMMAND.unpack_from(data, offset)
+            offset += _REPLAY_COMMAND.size
+            input_log.append((move_tick, InputCommand(time, DIRECTIONS[code])))
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"回放数据已损坏: {e}")
+    return initial_state, input_log, final_move_tick
+
+
+def replay_game(scene, data):
+    """
+    在游戏场景中逐步重现回放（场景必须已经用回放的场景类型、世界大小和难度进入）
+
+    每个方向指令在记录的步数之前放入输入队列，然后按固定步长推进模拟，直到游戏结束。
+    回放过程中产生的事件会被丢弃，不会播放音效、特效或提交成绩。
+
+    参数:
+        scene: 游戏场景
+        data: 二进制回放数据
+
+    返回:
+        GameState: 回放结束时的状态快照
+
+    异常:
+        ValueError: 回放数据无效，或者游戏没有在记录的步数结束（回放与录制时的结果不一致）
+    """
+    initial_state, input_log, final_move_tick = decode_replay(data)
+    apply_state(scene, initial_state)
+
+    commands = deque(input_log)
+    queue = scene.input_queue
+    while not scene.game_over and scene.move_tick <= final_move_tick:
+        if commands and commands[0][0] == scene.move_tick and not queue.commands:
+            queue.commands.append(commands.popleft()[1])
+        scene.simulate_step()
+    scene.events.clear()
+
+    if not scene.game_over or scene.move_tick != final_move_tick:
+        raise ValueError(f"回放不一致: 录制时在第{final_move_tick}步结束，重现时在第{scene.move_tick}步结束")
+    return capture_state(scene)